@@ -4,15 +4,22 @@ Google Gemini API İstemci Modülü.
 
 Bu modül, Google'ın Gemini üretken yapay zeka modelleriyle tüm etkileşimi
 merkezi bir yerden yönetir. İki ana işlevi vardır:
-1.  Metin tabanlı sohbet yanıtları oluşturmak (`get_gemini_response`).
+1.  Metin tabanlı sohbet yanıtları oluşturmak (`get_gemini_response`,
+    geçmişli sohbetler için `get_chat_response`).
 2.  Metinleri anlamsal vektörlere (embeddings) dönüştürmek (`get_gemini_embedding`),
     bu vektörler yapay zekanın uzun süreli hafızası için kullanılır.
+
+İstekler `core.resilience` üzerinden gönderilir; yavaş kalan veya geçici hata
+veren (429, 5xx) istekler zaman aşımına uğrar ve tekrar denenir, Gemini art
+arda hata verirse istekler bir süre gönderilmeden reddedilir.
 """
 import streamlit as st
 import google.generativeai as genai
 import numpy as np
 import requests
 
+from core import resilience
+
 # --- API Anahtarı ve Model Başlatma ---
 # Uygulama başlarken API anahtarını Streamlit secrets'tan okur ve modeli başlatır.
 # Bu, her fonksiyon çağrıldığında tekrar tekrar kurulum yapılmasını engeller.
@@ -48,15 +55,40 @@ def get_gemini_response(prompt: str, system_instruction: str = None) -> str:
     if system_instruction:
         # Sistem talimatı varsa, en iyi sonuçlar için kullanıcı isteminin başına eklenir.
         full_prompt = f"{system_instruction}\n\n{prompt}"
-        response = _gemini_model.generate_content(full_prompt)
+        response = resilience.call(resilience.GEMINI, _gemini_model.generate_content, full_prompt)
     else:
-        response = _gemini_model.generate_content(prompt)
+        response = resilience.call(resilience.GEMINI, _gemini_model.generate_content, prompt)
     
     # Modelin yanıtını `response.text` özelliğinden al ve başındaki/sonundaki
     # boşlukları temizle.
     return response.text.strip() if hasattr(response, "text") else str(response)
 
 
+def get_chat_response(history: list, prompt: str, system_instruction: str,
+                      model_name: str = "models/gemini-1.5-pro-latest") -> str:
+    """
+    Sohbet geçmişiyle birlikte kullanıcının son mesajına yanıt oluşturur.
+
+    `ChatSession.send_message` oturumun geçmişini değiştirdiği için her
+    deneme (zaman aşımı veya geçici hatadan sonraki tekrar) verilen geçmişle
+    yeni bir oturum (`start_chat`) açar; böylece mesaj geçmişe iki kez eklenmez.
+
+    Args:
+        history (list): Gemini formatındaki (`{"role", "parts"}`) önceki mesajlar.
+        prompt (str): Kullanıcının son mesajı.
+        system_instruction (str): Modelin sistem talimatı.
+
+    Returns:
+        str: Model tarafından üretilen yanıt metni.
+    """
+    model = genai.GenerativeModel(model_name=model_name, system_instruction=system_instruction)
+
+    def send():
+        return model.start_chat(history=history).send_message(prompt).text
+
+    return resilience.call(resilience.GEMINI, send)
+
+
 def get_gemini_embedding(text: str) -> np.ndarray:
     """
     Verilen metni, anlamsal bir sayısal vektöre (embedding) dönüştürür.
@@ -81,10 +113,12 @@ def get_gemini_embedding(text: str) -> np.ndarray:
         "content": {"parts": [{"text": text}]}
     }
     
-    response = requests.post(api_url, headers=headers, json=data)
-    response.raise_for_status()  # API'den hata dönerse (örn: 4xx, 5xx) exception fırlat.
-    
-    emb = response.json()["embedding"]["values"]
+    def request():
+        response = requests.post(api_url, headers=headers, json=data)
+        response.raise_for_status()  # API'den hata dönerse (örn: 4xx, 5xx) exception fırlat.
+        return response.json()
+
+    emb = resilience.call(resilience.GEMINI, request, hedge=True)["embedding"]["values"]
     
     # Embedding'i, Pinecone gibi vektör veritabanlarının beklediği
     # format olan float32 tipinde bir numpy array'ine dönüştür.
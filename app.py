@@ -14,6 +14,12 @@ bir kullanıcı deneyimi sunmasını sağlar.
 """
 import streamlit as st
 
+from core.memory import start_queue_workers
+
+# Önceki çalışmadan kalan arka plan hafıza işleri işlenmeye başlasın. İşçiler
+# işlem (process) başına bir kez başlatılır; sonraki çağrılar bir şey yapmaz.
+start_queue_workers()
+
 if "user_id" in st.session_state:
     # Kullanıcı giriş yapmışsa, onu doğrudan Ana Sayfa'ya yönlendir.
     st.switch_page("pages/1_🏠_Ana_Sayfa.py")
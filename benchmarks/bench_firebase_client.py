@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+"""
+Firebase istemcisi için çağrı başına gecikme ölçümü.
+
+İki senaryoyu yerel bir RTDB taklidine (`fake_rtdb.FakeRTDBServer`) karşı
+karşılaştırır:
+
+- **önce:** Her çağrıda yeni bir Pyrebase uygulaması (ve yeni bir HTTP
+  oturumu) oluşturulur. `core.firebase_db`'nin eski davranışı budur.
+- **sonra:** `core.firebase_config.build_firebase_app` ile bir kez oluşturulan,
+  havuzlu ve keep-alive bağlantılı paylaşılan uygulama kullanılır.
+
+Çalıştırma:
+    python benchmarks/bench_firebase_client.py --calls 300 --connect-delay 0.02
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pyrebase  # noqa: E402
+
+from benchmarks.fake_rtdb import FakeRTDBServer  # noqa: E402
+from core.firebase_config import build_firebase_app  # noqa: E402
+
+USER_ID = "bench-user"
+SEED = {"users": {USER_ID: {"profile": {"name": "Bench", "timezone": "UTC"}}}}
+
+
+def _measure(label: str, get_db, calls: int):
+    samples = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        get_db().child(f"users/{USER_ID}/profile").get("token").val()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    p95 = samples[int(len(samples) * 0.95) - 1]
+    print(f"{label:<8} ortalama={statistics.mean(samples):7.2f} ms  "
+          f"medyan={statistics.median(samples):7.2f} ms  p95={p95:7.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--connect-delay", type=float, default=0.02,
+                        help="Her yeni bağlantı için eklenecek gecikme (saniye), TLS el sıkışmasını taklit eder.")
+    args = parser.parse_args()
+
+    with FakeRTDBServer(SEED, connect_delay=args.connect_delay) as server:
+        config = server.firebase_config()
+        print(f"{args.calls} çağrı, bağlantı kurulum gecikmesi {args.connect_delay * 1000:.0f} ms")
+
+        _measure("önce", lambda: pyrebase.initialize_app(dict(config)).database(), args.calls)
+
+        shared_app = build_firebase_app(dict(config))
+        _measure("sonra", shared_app.database, args.calls)
+
+
+if __name__ == "__main__":
+    main()
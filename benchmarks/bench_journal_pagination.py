@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+"""
+Günlük geçmişinin sayfalanmış yüklenmesi için ölçeklenme ölçümü.
+
+Farklı geçmiş büyüklükleri (varsayılan 100, 1.000 ve 10.000 girdi) için yerel
+RTDB taklidine karşı iki senaryoyu karşılaştırır:
+
+- **tümü:** `firebase_db.get_journals` ile tüm geçmişin indirilip ekranda
+  gösterilecek listeye dönüştürülmesi (Günlüğüm sayfasının eski davranışı).
+- **sayfa:** `firebase_db.get_journal_page` ile sadece ilk sayfanın
+  indirilmesi ve listeye dönüştürülmesi.
+
+Her satırda süre ve sunucudan indirilen bayt miktarı raporlanır; sayfalı
+yüklemede ikisinin de geçmiş büyüdükçe sabit kalması beklenir.
+
+Çalıştırma:
+    python benchmarks/bench_journal_pagination.py --sizes 100 1000 10000
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fake_rtdb import FakeRTDBServer  # noqa: E402
+import core.firebase_config as firebase_config  # noqa: E402
+from core import db_backends, firebase_db  # noqa: E402
+
+USER_ID = "bench-user"
+TOKEN = "bench-token"
+
+
+def _seed(entry_count: int) -> dict:
+    journals = {}
+    today = date.today()
+    for i in range(entry_count):
+        day = (today - timedelta(days=i)).isoformat()
+        journals[day] = {f"-entry{i:06d}": {"text": "Bugün güzel bir gündü. " * 10, "timestamp": "21:30"}}
+    return {"users": {USER_ID: {"journals": journals}}}
+
+
+def _entries(journals: dict) -> list:
+    # Sayfanın her yeniden çalıştırmada yaptığı listeye dönüştürme işlemi.
+    entries = [
+        (date.fromisoformat(day), data.get("timestamp", ""), data.get("text", ""))
+        for day, day_entries in journals.items()
+        for data in day_entries.values()
+    ]
+    entries.sort(reverse=True)
+    return entries
+
+
+def _measure(server, load, repeats: int):
+    best, size, count = None, 0, 0
+    for _ in range(repeats):
+        firebase_db.clear_cache()
+        sent_before = server.db.bytes_sent
+        start = time.perf_counter()
+        count = len(_entries(load()))
+        elapsed = (time.perf_counter() - start) * 1000
+        size = server.db.bytes_sent - sent_before
+        best = elapsed if best is None else min(best, elapsed)
+    return best, size, count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'girdi':>7} | {'tümü ms':>9} {'tümü KB':>9} | {'sayfa ms':>9} {'sayfa KB':>9} {'gösterilen':>10}")
+    for size in args.sizes:
+        with FakeRTDBServer(_seed(size)) as server:
+            firebase_config._shared_app = firebase_config.build_firebase_app(server.firebase_config())
+            db_backends.set_backend(db_backends.PyrebaseBackend())
+            full_ms, full_bytes, _ = _measure(
+                server, lambda: firebase_db.get_journals(USER_ID, TOKEN), args.repeats)
+            page_ms, page_bytes, shown = _measure(
+                server, lambda: firebase_db.get_journal_page(USER_ID, TOKEN)[0], args.repeats)
+        print(f"{size:>7} | {full_ms:>9.2f} {full_bytes / 1024:>9.1f} | "
+              f"{page_ms:>9.2f} {page_bytes / 1024:>9.1f} {shown:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+"""
+Hafıza kaydı verim (throughput) ölçümü.
+
+Aynı N metni iki yolla hafızaya kaydeder ve saniyedeki öğe sayısını raporlar:
+
+- **tekil:** Her metin için ayrı bir embedding ve ayrı bir upsert isteği
+  (toplu API'den önceki `save_to_memory` döngüsü).
+- **toplu:** `save_many_to_memory`; istek başına 100 metinlik toplu embedding
+  ve 100 vektörlük upsert.
+
+Gemini ve Pinecone, her istekte sabit bir gidiş-dönüş gecikmesi (`--rtt`) ve
+öğe başına küçük bir işlem süresi (`--per-item`) bekleyen taklitlerle
+değiştirilir; ölçülen fark istek sayısındaki azalmadan gelir.
+
+Çalıştırma:
+    python benchmarks/bench_memory_batching.py --items 500 --rtt 0.08
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import types
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+_SECRETS = """
+[pinecone]
+api_key = "bench"
+
+[google]
+api_key = "bench"
+"""
+
+
+class _FakeIndex:
+    def __init__(self, rtt: float, per_item: float):
+        self.rtt, self.per_item = rtt, per_item
+        self.requests = 0
+
+    def upsert(self, vectors, namespace=None):
+        self.requests += 1
+        time.sleep(self.rtt + self.per_item * len(vectors))
+
+
+def _install_fakes(rtt: float, per_item: float) -> dict:
+    """Pinecone modülünü ve Gemini embedding çağrısını gecikmeli taklitlerle değiştirir."""
+    index = _FakeIndex(rtt, per_item)
+    fake = types.ModuleType("pinecone")
+    fake.Pinecone = lambda api_key: types.SimpleNamespace(
+        list_indexes=lambda: types.SimpleNamespace(names=lambda: ["mymindmate-memory"]),
+        Index=lambda name: index,
+    )
+    fake.ServerlessSpec = lambda **kwargs: None
+    sys.modules["pinecone"] = fake
+
+    import google.generativeai as genai
+    counters = {"embed_requests": 0}
+
+    def embed_content(model, content, task_type=None, **kwargs):
+        counters["embed_requests"] += 1
+        texts = [content] if isinstance(content, str) else list(content)
+        time.sleep(rtt + per_item * len(texts))
+        vectors = [[0.0] * 768 for _ in texts]
+        return {"embedding": vectors[0] if isinstance(content, str) else vectors}
+
+    genai.embed_content = embed_content
+    return {"index": index, "counters": counters}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=500, help="Kaydedilecek metin sayısı.")
+    parser.add_argument("--rtt", type=float, default=0.08, help="İstek başına gecikme (saniye).")
+    parser.add_argument("--per-item", type=float, default=0.0005, help="Öğe başına işlem süresi (saniye).")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp()
+    os.makedirs(os.path.join(workdir, ".streamlit"))
+    with open(os.path.join(workdir, ".streamlit", "secrets.toml"), "w", encoding="utf-8") as f:
+        f.write(_SECRETS)
+    os.chdir(workdir)
+
+    fakes = _install_fakes(args.rtt, args.per_item)
+    from core import embedding_cache, memory
+
+    # İki yol aynı metinleri kaydeder; ikincisinin önbellekten beslenmemesi için önbellek kapatılır.
+    embedding_cache.get_settings()["enabled"] = False
+
+    items = [{"text": f"Bench metni {i}", "metadata": {"role": "user"}} for i in range(args.items)]
+    memory.get_index()  # Index kurulumu ölçüme dahil edilmez.
+
+    print(f"{'yol':<8} {'süre (s)':>9} {'öğe/s':>9} {'embed istek':>12} {'upsert istek':>13}")
+    for name in ("tekil", "toplu"):
+        fakes["counters"]["embed_requests"] = 0
+        fakes["index"].requests = 0
+        start = time.perf_counter()
+        if name == "tekil":
+            for item in items:
+                prepared = memory.prepare_items([item])
+                memory.get_index().upsert(vectors=memory.build_vectors("bench-user", prepared))
+        else:
+            memory.save_many_to_memory("bench-user", items)
+        elapsed = time.perf_counter() - start
+        print(f"{name:<8} {elapsed:>9.2f} {len(items) / elapsed:>9.1f} "
+              f"{fakes['counters']['embed_requests']:>12} {fakes['index'].requests:>13}")
+
+
+if __name__ == "__main__":
+    main()
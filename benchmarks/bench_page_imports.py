@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+"""
+Sayfa başlangıç (import) süresi ölçümü.
+
+Her sayfanın içe aktardığı proje modüllerini (`core`, `ai`, `components`,
+`utils`) yeni bir Python işleminde içe aktarır ve süresini ölçer. Bu, bir
+Streamlit işleminde sayfanın ilk (soğuk) yüklenmesinin modül maliyetidir.
+
+Pinecone, her kontrol düzlemi isteğinde (`list_indexes`, `create_index`,
+`Index`) `--latency` kadar bekleyen bir taklitle değiştirilir. İki durum
+karşılaştırılır:
+
+- **eager:** İçe aktarmanın ardından `memory.get_index()` çağrılır; bu,
+  index'in modül içe aktarılırken kurulduğu önceki davranışla aynı maliyettir.
+- **lazy:** Sadece içe aktarma; index ilk hafıza işlemine kadar kurulmaz.
+
+Çalıştırma:
+    python benchmarks/bench_page_imports.py --latency 0.3 --runs 3
+"""
+import argparse
+import ast
+import glob
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROJECT_PACKAGES = ("core", "ai", "components", "utils")
+
+# Alt işlemde çalışan ölçüm kodu. Argümanlar: gecikme, durum, modüller...
+_DRIVER = """
+import importlib, sys, time, types
+
+latency, mode, modules = float(sys.argv[1]), sys.argv[2], sys.argv[3:]
+
+class _IndexList:
+    def names(self):
+        return ["mymindmate-memory"]
+
+class Pinecone:
+    def __init__(self, api_key):
+        pass
+    def list_indexes(self):
+        time.sleep(latency)
+        return _IndexList()
+    def create_index(self, **kwargs):
+        time.sleep(latency)
+    def Index(self, name):
+        time.sleep(latency)  # Gerçek istemci, index adresini almak için bir istek yapar.
+        return object()
+
+class ServerlessSpec:
+    def __init__(self, **kwargs):
+        pass
+
+fake = types.ModuleType("pinecone")
+fake.Pinecone, fake.ServerlessSpec = Pinecone, ServerlessSpec
+sys.modules["pinecone"] = fake
+
+import streamlit  # Streamlit sunucuda zaten yüklüdür; ölçüme dahil edilmez.
+
+start = time.perf_counter()
+for name in modules:
+    importlib.import_module(name)
+if mode == "eager" and "core.memory" in sys.modules:
+    sys.modules["core.memory"].get_index()
+print(time.perf_counter() - start)
+"""
+
+_SECRETS = """
+[firebase]
+apiKey = "bench"
+authDomain = "bench.firebaseapp.com"
+projectId = "bench"
+storageBucket = "bench.appspot.com"
+messagingSenderId = "0"
+appId = "bench"
+databaseURL = "http://127.0.0.1:9/"
+
+[pinecone]
+api_key = "bench"
+
+[google]
+api_key = "bench"
+"""
+
+
+def page_modules(page_path: str) -> list:
+    """Bir sayfanın üst seviyede içe aktardığı proje modüllerini döndürür."""
+    with open(page_path, encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    modules = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            names = [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.module:
+            # `from core import firebase_db` bir alt modül, `from core.memory import x` bir isim içe aktarır.
+            if node.module in PROJECT_PACKAGES:
+                names = [f"{node.module}.{alias.name}" for alias in node.names]
+            else:
+                names = [node.module]
+        else:
+            continue
+        modules += [name for name in names if name.split(".")[0] in PROJECT_PACKAGES]
+    return list(dict.fromkeys(modules))
+
+
+def measure(modules: list, mode: str, latency: float, workdir: str) -> float:
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    output = subprocess.run(
+        [sys.executable, "-c", _DRIVER, str(latency), mode, *modules],
+        cwd=workdir, env=env, capture_output=True, text=True, check=True,
+    ).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=0.3, help="Pinecone isteği başına gecikme (saniye).")
+    parser.add_argument("--runs", type=int, default=3, help="Her ölçümün tekrar sayısı (medyan alınır).")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        os.makedirs(os.path.join(workdir, ".streamlit"))
+        with open(os.path.join(workdir, ".streamlit", "secrets.toml"), "w", encoding="utf-8") as f:
+            f.write(_SECRETS)
+
+        print(f"{'sayfa':<28} {'eager (ms)':>11} {'lazy (ms)':>10}")
+        for page in sorted(glob.glob(os.path.join(ROOT, "pages", "*.py"))):
+            modules = page_modules(page)
+            results = {}
+            for mode in ("eager", "lazy"):
+                results[mode] = statistics.median(
+                    measure(modules, mode, args.latency, workdir) for _ in range(args.runs)
+                ) * 1000
+            name = os.path.splitext(os.path.basename(page))[0]
+            print(f"{name:<28} {results['eager']:>11.0f} {results['lazy']:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+"""
+Depolama arka uçlarıyla sayfa akışı ölçümü.
+
+Ana Sayfa ve Günlüğüm sayfalarının bir yeniden çalıştırmada yaptığı okumaları
+(`fetch_user_bundle` ve `get_journal_page`) ve bir günlük kaydını, önbellek
+kapalıyken iki arka uca karşı çalıştırır:
+
+- **firebase:** `PyrebaseBackend`, yerel RTDB taklidine (`fake_rtdb`) HTTP
+  üzerinden bağlanır.
+- **local:** `LocalBackend`, aynı veriyi işlem içi SQLite'ta tutar.
+
+Çalıştırma:
+    python benchmarks/bench_storage_backends.py --days 365 --flows 200
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fake_rtdb import FakeRTDBServer  # noqa: E402
+import core.firebase_config as firebase_config  # noqa: E402
+from core import db_backends, firebase_db  # noqa: E402
+
+USER_ID = "bench-user"
+TOKEN = "bench-token"
+
+
+def _seed(days: int) -> dict:
+    today = date.today()
+    journals, goals = {}, {}
+    for i in range(days):
+        day = (today - timedelta(days=i)).isoformat()
+        journals[day] = {f"-entry{i:06d}": {"text": "Bugün güzel bir gündü. " * 10, "timestamp": "21:30"}}
+        goals[day] = {"pending": {f"-goal{i:06d}": {"goal": "Yürüyüş", "type": "daily", "is_checked": i % 2 == 0}}}
+    profile = {"name": "Bench", "timezone": "UTC"}
+    return {"users": {USER_ID: {"profile": profile, "journals": journals, "goals": goals}}}
+
+
+def _flow():
+    today = date.today()
+    week = {"start": (today - timedelta(days=6)).isoformat(), "end": today.isoformat()}
+    firebase_db.fetch_user_bundle(USER_ID, TOKEN, parts=("journals", "goals", "latest_journal"),
+                                  journal_range=week, goal_range=week)
+    firebase_db.list_journal_dates(USER_ID, TOKEN)
+    firebase_db.get_journal_page(USER_ID, TOKEN)
+    firebase_db.save_journal(USER_ID, today.isoformat(), "Benchmark girdisi", TOKEN)
+
+
+def _measure(label: str, flows: int):
+    samples = []
+    for _ in range(flows):
+        firebase_db.clear_cache()
+        start = time.perf_counter()
+        _flow()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    p95 = samples[int(len(samples) * 0.95) - 1]
+    print(f"{label:<9} ortalama={statistics.mean(samples):7.2f} ms  "
+          f"medyan={statistics.median(samples):7.2f} ms  p95={p95:7.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--days", type=int, default=365, help="Tohumlanacak geçmiş gün sayısı.")
+    parser.add_argument("--flows", type=int, default=200)
+    args = parser.parse_args()
+
+    seed = _seed(args.days)
+    print(f"{args.days} günlük geçmiş, {args.flows} sayfa akışı")
+
+    with FakeRTDBServer(seed) as server:
+        firebase_config._shared_app = firebase_config.build_firebase_app(server.firebase_config())
+        db_backends.set_backend(db_backends.PyrebaseBackend())
+        _measure("firebase", args.flows)
+
+    db_backends.set_backend(db_backends.LocalBackend(data=seed))
+    _measure("local", args.flows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,301 @@
+# -*- coding: utf-8 -*-
+"""
+Firebase Realtime Database REST API'sinin yerel, bellek içi bir taklidi.
+
+Benchmark betikleri, canlı bir Firebase projesine ihtiyaç duymadan Pyrebase
+istemcisini gerçek HTTP üzerinden çalıştırabilmek için bu sunucuyu kullanır.
+Desteklenen özellikler:
+
+- `GET`, `PUT`, `PATCH` (çok konumlu güncelleme dahil), `POST` (push) ve `DELETE`.
+- `shallow`, `orderBy="$key"`, `startAt`, `endAt`, `limitToFirst`, `limitToLast`.
+- `{".sv": {"increment": n}}` sunucu değerleri.
+- `Accept: text/event-stream` ile akış (SSE): ilk `put` anlık görüntüsü,
+  ardından yazmalar için `put`/`patch` olayları. `revoke_streams()` açık
+  akışlara `auth_revoked` gönderir.
+
+`connect_delay` parametresi, her yeni TCP bağlantısında (gerçek dünyadaki
+TLS el sıkışmasına benzer şekilde) yapay bir gecikme ekler; `request_delay`
+ise her isteğe sabit bir sunucu gecikmesi ekler.
+"""
+import json
+import queue
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+
+def _split(path: str):
+    return [p for p in path.strip("/").split("/") if p]
+
+
+class FakeRTDB:
+    """Thread-safe, iç içe sözlüklerden oluşan basit bir veri ağacı."""
+
+    def __init__(self, data=None):
+        self.root = data or {}
+        self.lock = threading.Lock()
+        self.request_count = 0
+        self.bytes_sent = 0
+        self.stream_count = 0
+        self.listeners = []
+
+    def get(self, parts):
+        node = self.root
+        for p in parts:
+            if not isinstance(node, dict) or p not in node:
+                return None
+            node = node[p]
+        return node
+
+    def _resolve(self, current, value):
+        if isinstance(value, dict):
+            sv = value.get(".sv")
+            if isinstance(sv, dict) and "increment" in sv:
+                base = current if isinstance(current, (int, float)) else 0
+                return base + sv["increment"]
+            return {
+                k: self._resolve(current.get(k) if isinstance(current, dict) else None, v)
+                for k, v in value.items()
+            }
+        return value
+
+    def set(self, parts, value):
+        if not parts:
+            self.root = self._resolve(self.root, value) or {}
+            return
+        node = self.root
+        for p in parts[:-1]:
+            if not isinstance(node.get(p), dict):
+                node[p] = {}
+            node = node[p]
+        if value is None:
+            node.pop(parts[-1], None)
+        else:
+            node[parts[-1]] = self._resolve(node.get(parts[-1]), value)
+        self._prune(parts[:-1])
+
+    def notify(self, parts, patch_keys=None):
+        """
+        Bir yazmayı, etkilenen akış dinleyicilerine olay olarak iletir.
+
+        Kilit altında çağrılmalıdır; olay verisi o anki ağaçtan serileştirilir.
+        """
+        for listen_parts, events in self.listeners:
+            if parts[:len(listen_parts)] == listen_parts:
+                rel = "/" + "/".join(parts[len(listen_parts):])
+                if patch_keys is None:
+                    events.put(("put", {"path": rel, "data": self.get(parts)}))
+                else:
+                    data = {k: self.get(parts + _split(k)) for k in patch_keys}
+                    events.put(("patch", {"path": rel, "data": data}))
+            elif listen_parts[:len(parts)] == parts:
+                events.put(("put", {"path": "/", "data": self.get(listen_parts)}))
+
+    def _prune(self, parts):
+        # Firebase boş düğümleri saklamaz; boşalan ara düğümleri temizle.
+        for depth in range(len(parts), 0, -1):
+            parent = self.get(parts[:depth - 1])
+            if isinstance(parent, dict) and parent.get(parts[depth - 1]) == {}:
+                parent.pop(parts[depth - 1])
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "FakeRTDB/1.0"
+    # Başlık ve gövde ayrı paketlerde gittiği için Nagle algoritması kapatılır;
+    # aksi halde keep-alive bağlantılarda ~40 ms'lik gecikmeli ACK beklemesi oluşur.
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super().setup()
+        if self.server.connect_delay:
+            time.sleep(self.server.connect_delay)
+
+    def log_message(self, *args):
+        pass
+
+    def _body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"null")
+
+    def _reply(self, payload, status=200):
+        data = payload if isinstance(payload, bytes) else json.dumps(payload).encode("utf-8")
+        if self.server.request_delay:
+            time.sleep(self.server.request_delay)
+        db = self.server.db
+        with db.lock:
+            db.request_count += 1
+            db.bytes_sent += len(data)
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _target(self):
+        url = urlsplit(self.path)
+        path = url.path[:-5] if url.path.endswith(".json") else url.path
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        return _split(path), query
+
+    def do_GET(self):
+        parts, query = self._target()
+        db = self.server.db
+        if "text/event-stream" in (self.headers.get("Accept") or ""):
+            self._stream(parts)
+            return
+        with db.lock:
+            # Yanıt, kilit altında serileştirilir; böylece eşzamanlı yazmalar
+            # yarım kalmış bir ağacın gönderilmesine yol açmaz.
+            payload = json.dumps(self._query(db.get(parts), query)).encode("utf-8")
+        self._reply(payload)
+
+    def _stream(self, parts):
+        db = self.server.db
+        events = queue.Queue()
+        with db.lock:
+            db.stream_count += 1
+            events.put(("put", {"path": "/", "data": db.get(parts)}))
+            db.listeners.append((parts, events))
+        self.close_connection = True
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        try:
+            while not self.server.stopping:
+                try:
+                    event, data = events.get(timeout=0.5)
+                except queue.Empty:
+                    event, data = "keep-alive", None
+                self.wfile.write(f"event: {event}\ndata: {json.dumps(data)}\n\n".encode("utf-8"))
+                self.wfile.flush()
+                if event == "auth_revoked":
+                    break
+        except OSError:
+            pass
+        finally:
+            with db.lock:
+                db.listeners.remove((parts, events))
+
+    @staticmethod
+    def _query(node, query):
+        if query.get("shallow") == "true":
+            return {k: True for k in node} if isinstance(node, dict) else node
+        if "orderBy" not in query or not isinstance(node, dict):
+            return node
+        order_by = json.loads(query["orderBy"])
+        if order_by == "$key":
+            items = sorted(node.items())
+            key_of = lambda item: item[0]
+        else:
+            items = sorted(
+                (item for item in node.items()
+                 if isinstance(item[1], dict) and order_by in item[1]),
+                key=lambda item: (item[1][order_by], item[0]),
+            )
+            key_of = lambda item: item[1][order_by]
+        if "equalTo" in query:
+            target = json.loads(query["equalTo"])
+            items = [i for i in items if key_of(i) == target]
+        if "startAt" in query:
+            start = json.loads(query["startAt"])
+            items = [i for i in items if key_of(i) >= start]
+        if "endAt" in query:
+            end = json.loads(query["endAt"])
+            items = [i for i in items if key_of(i) <= end]
+        if "limitToFirst" in query:
+            items = items[:int(query["limitToFirst"])]
+        if "limitToLast" in query:
+            items = items[-int(query["limitToLast"]):]
+        return dict(items)
+
+    def do_PUT(self):
+        parts, _ = self._target()
+        value = self._body()
+        db = self.server.db
+        with db.lock:
+            db.set(parts, value)
+            result = db.get(parts)
+            db.notify(parts)
+        self._reply(result)
+
+    def do_PATCH(self):
+        parts, _ = self._target()
+        updates = self._body() or {}
+        db = self.server.db
+        with db.lock:
+            for key, value in updates.items():
+                db.set(parts + _split(key), value)
+            db.notify(parts, list(updates))
+        self._reply(updates)
+
+    def do_POST(self):
+        parts, _ = self._target()
+        value = self._body()
+        # Firebase push ID'leri zamana göre sıralanır; aynı özelliği koru.
+        key = "-%013d%s" % (time.time_ns() // 1000, uuid.uuid4().hex[:6])
+        db = self.server.db
+        with db.lock:
+            db.set(parts + [key], value)
+            db.notify(parts + [key])
+        self._reply({"name": key})
+
+    def do_DELETE(self):
+        parts, _ = self._target()
+        db = self.server.db
+        with db.lock:
+            db.set(parts, None)
+            db.notify(parts)
+        self._reply(None)
+
+
+class FakeRTDBServer:
+    """
+    `FakeRTDB`'yi arka planda bir HTTP sunucusu olarak çalıştırır.
+
+    Kullanım:
+        with FakeRTDBServer(data) as server:
+            config = server.firebase_config()
+    """
+
+    def __init__(self, data=None, connect_delay: float = 0.0, request_delay: float = 0.0):
+        self.db = FakeRTDB(data)
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self.httpd.daemon_threads = True
+        self.httpd.db = self.db
+        self.httpd.connect_delay = connect_delay
+        self.httpd.request_delay = request_delay
+        self.httpd.stopping = False
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address
+        return f"http://{host}:{port}/"
+
+    def firebase_config(self) -> dict:
+        """Pyrebase'in bu sunucuya bağlanması için gereken konfigürasyonu döndürür."""
+        return {
+            "apiKey": "fake-api-key",
+            "authDomain": "localhost",
+            "databaseURL": self.url,
+            "storageBucket": "fake-bucket",
+        }
+
+    def revoke_streams(self):
+        """Açık tüm akışlara, token süresi dolmuş gibi `auth_revoked` olayı gönderir."""
+        with self.db.lock:
+            for _, events in self.db.listeners:
+                events.put(("auth_revoked", "token expired"))
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.stopping = True
+        self.httpd.shutdown()
+        self.httpd.server_close()
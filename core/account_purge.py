@@ -0,0 +1,301 @@
+# -*- coding: utf-8 -*-
+"""
+Hesap Silme (Account Purge) Modülü.
+
+Bir hesabın silinmesi üç bağımsız sistemdeki verinin silinmesini gerektirir:
+Firebase Realtime Database'deki kullanıcı ağacı, Pinecone'daki hafıza
+vektörleri ve Firebase Authentication hesabı. Yoğun kullanıcılarda bu işlemler
+bir sayfa isteğinin içinde bitmeyecek kadar uzun sürebilir. Bu modül silme
+işlemini arka planda, adım adım yürütür:
+
+- **Eşzamanlı:** Veritabanı ve hafıza silmeleri aynı anda çalışır. Auth hesabı
+  ise veritabanı silindikten sonra silinir; çünkü veritabanını silmeye yetkili
+  tek kimlik kullanıcının kendi token'ıdır ve hesap silinince bu token artık
+  yenilenemez.
+- **Tekrar Denemeli:** Başarısız adımlar üstel bekleme ile `max_attempts` kez
+  tekrar denenir. Yeniden giriş gerektiren hatalar (örn: süresi dolmuş token)
+  tekrar denenmez.
+- **Sürdürülebilir:** Her adımın durumu bir SQLite dosyasına (checkpoint)
+  yazılır; kullanıcının token'ı ise sadece bellekte tutulur, diske yazılmaz.
+  Uygulama yeniden başlarsa yarıda kalan silme, kullanıcı yeniden giriş
+  yapıp silmeyi tekrar başlattığında (`start_purge`) kaldığı yerden sürer;
+  tamamlanmış adımlar tekrar çalıştırılmaz. `recover_interrupted` bu
+  durumdaki silmeleri "yeniden giriş gerekiyor" olarak işaretler.
+- **İzlenebilir:** `get_purge_status()` her adımın durumunu ve ilerlemesini
+  döndürür; Ayarlar sayfası bunu bir ilerleme göstergesi olarak sunar.
+
+İsteğe bağlı ayarlar `secrets.toml` içinde `[account_purge]` başlığı altında
+verilebilir:
+
+    [account_purge]
+    path = ".mymindmate/account_purge.sqlite3"
+    max_attempts = 5
+"""
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+import streamlit as st
+
+from core import firebase_auth, firebase_db, memory, token_manager
+
+DEFAULT_SETTINGS = {
+    "path": os.path.join(".mymindmate", "account_purge.sqlite3"),
+    "max_attempts": 5,
+}
+STEPS = ("database", "memory", "auth")
+RETRY_BASE_DELAY = 2.0    # Saniye. n. denemeden sonra 2 * 2^n saniye beklenir.
+RETRY_MAX_DELAY = 60.0    # Saniye. Tekrar denemeler arası en uzun bekleme.
+FINISHED_RETENTION = 7 * 24 * 3600.0  # Tamamlanan silmelerin kayıtları bu süre sonra atılır.
+# Bu hatalar tekrar denemeyle düzelmez; kullanıcının yeniden giriş yapması gerekir.
+LOGIN_REQUIRED = "LOGIN_REQUIRED"
+RELOGIN_ERRORS = ("INVALID_ID_TOKEN", "TOKEN_EXPIRED", "CREDENTIAL_TOO_OLD_LOGIN_AGAIN",
+                  "Permission denied", "Auth token is expired", LOGIN_REQUIRED)
+# Hafıza silmesi Pinecone'a sunucu anahtarıyla yapılır; kullanıcının token'ı gerekmez.
+TOKEN_STEPS = ("database", "auth")
+
+_settings: Optional[Dict[str, Any]] = None
+_active = set()
+_active_lock = threading.Lock()
+# Kullanıcı -> silmeyi başlatan oturumun token'ı. Sadece bu işlemin belleğinde tutulur.
+_tokens: Dict[str, str] = {}
+
+
+def get_settings() -> Dict[str, Any]:
+    """Silme ayarlarını döndürür; `[account_purge]` başlığı yoksa varsayılanlar kullanılır."""
+    global _settings
+    if _settings is None:
+        try:
+            overrides = dict(st.secrets.get("account_purge", {}))
+        except FileNotFoundError:
+            overrides = {}
+        _settings = {**DEFAULT_SETTINGS, **overrides}
+    return _settings
+
+
+def _connect() -> sqlite3.Connection:
+    path = get_settings()["path"]
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS purge_steps (
+            user_id TEXT NOT NULL,
+            step TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'pending',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            done INTEGER NOT NULL DEFAULT 0,
+            total INTEGER NOT NULL DEFAULT 0,
+            updated_at REAL NOT NULL,
+            last_error TEXT,
+            PRIMARY KEY (user_id, step)
+        )
+        """
+    )
+    return conn
+
+
+def _update_step(user_id: str, step: str, **fields):
+    fields["updated_at"] = time.time()
+    assignments = ", ".join(f"{name} = ?" for name in fields)
+    conn = _connect()
+    try:
+        conn.execute(f"UPDATE purge_steps SET {assignments} WHERE user_id = ? AND step = ?",
+                     (*fields.values(), user_id, step))
+    finally:
+        conn.close()
+
+
+def _load_step(user_id: str, step: str):
+    conn = _connect()
+    try:
+        return conn.execute(
+            "SELECT status, attempts FROM purge_steps WHERE user_id = ? AND step = ?",
+            (user_id, step),
+        ).fetchone()
+    finally:
+        conn.close()
+
+
+def start_purge(user_id: str, id_token: str):
+    """
+    Kullanıcının hesabını ve tüm verilerini silme işlemini arka planda başlatır.
+
+    Kullanıcı için yarıda kalmış veya başarısız olmuş bir silme varsa, verilen
+    (güncel) token ile kaldığı yerden sürdürülür; tamamlanmış adımlar atlanır.
+    """
+    now = time.time()
+    with _active_lock:
+        _tokens[user_id] = id_token
+    conn = _connect()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        # Bir haftadan eski, tamamlanmış silmelerin kayıtları atılır.
+        conn.execute(
+            """
+            DELETE FROM purge_steps WHERE user_id IN (
+                SELECT user_id FROM purge_steps GROUP BY user_id
+                HAVING SUM(status != 'done') = 0 AND MAX(updated_at) < ?)
+            """,
+            (now - FINISHED_RETENTION,),
+        )
+        for step in STEPS:
+            conn.execute(
+                """
+                INSERT INTO purge_steps (user_id, step, updated_at) VALUES (?, ?, ?)
+                ON CONFLICT (user_id, step) DO UPDATE SET
+                    updated_at = excluded.updated_at,
+                    status = CASE WHEN status = 'done' THEN 'done' ELSE 'pending' END,
+                    attempts = CASE WHEN status = 'done' THEN attempts ELSE 0 END
+                """,
+                (user_id, step, now),
+            )
+        conn.execute("COMMIT")
+    finally:
+        conn.close()
+    _launch(user_id)
+
+
+def _launch(user_id: str):
+    """Kullanıcının silme işlemini, bu işlemde (process) zaten çalışmıyorsa başlatır."""
+    with _active_lock:
+        if user_id in _active:
+            return
+        _active.add(user_id)
+    threading.Thread(target=_run_purge, args=(user_id,), name=f"account-purge-{user_id}",
+                     daemon=True).start()
+
+
+def _run_purge(user_id: str):
+    try:
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="account-purge") as executor:
+            memory_done = executor.submit(_run_step, user_id, "memory")
+            if _run_step(user_id, "database"):
+                _run_step(user_id, "auth")
+            memory_done.result()
+        status = get_purge_status(user_id)
+        if status and status["finished"]:
+            # Tüm adımlar tamamlandı; token'ın bellekte tutulmasına gerek yok.
+            with _active_lock:
+                _tokens.pop(user_id, None)
+    finally:
+        with _active_lock:
+            _active.discard(user_id)
+
+
+def _delete_database(user_id: str, id_token: str, on_progress: Callable[[int, int], None]):
+    firebase_db.delete_all_user_data(user_id, id_token, on_progress=on_progress)
+
+
+def _delete_memory(user_id: str, id_token: str, on_progress: Callable[[int, int], None]):
+    memory.purge_user_memory(user_id)
+    on_progress(1, 1)
+
+
+def _delete_auth(user_id: str, id_token: str, on_progress: Callable[[int, int], None]):
+    firebase_auth.delete_auth_account(user_id, id_token)
+    on_progress(1, 1)
+
+
+_STEP_HANDLERS = {"database": _delete_database, "memory": _delete_memory, "auth": _delete_auth}
+
+
+def _run_step(user_id: str, step: str) -> bool:
+    """Bir adımı tekrar denemelerle çalıştırır. Adım tamamlandıysa True döner."""
+    max_attempts = int(get_settings()["max_attempts"])
+
+    def on_progress(done: int, total: int):
+        _update_step(user_id, step, done=done, total=total)
+
+    while True:
+        row = _load_step(user_id, step)
+        if row is None:
+            return False
+        status, attempts = row
+        if status == "done":
+            return True
+        with _active_lock:
+            id_token = _tokens.get(user_id)
+        if id_token is None and step in TOKEN_STEPS:
+            _update_step(user_id, step, status="failed", last_error=LOGIN_REQUIRED)
+            return False
+        attempts += 1
+        _update_step(user_id, step, status="running", attempts=attempts)
+        try:
+            _STEP_HANDLERS[step](user_id, token_manager.current_token(user_id, id_token), on_progress)
+        except Exception as e:
+            err = str(e)
+            needs_login = any(marker in err for marker in RELOGIN_ERRORS)
+            if needs_login or attempts >= max_attempts:
+                _update_step(user_id, step, status="failed", last_error=err)
+                return False
+            _update_step(user_id, step, status="pending", last_error=err)
+            time.sleep(min(RETRY_BASE_DELAY * (2 ** attempts), RETRY_MAX_DELAY))
+            continue
+        _update_step(user_id, step, status="done", last_error=None)
+        return True
+
+
+def get_purge_status(user_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Kullanıcının silme işleminin durumunu döndürür; silme başlatılmadıysa None.
+
+    Returns:
+        dict: `steps` (her adım için `status`, `attempts`, `done`, `total`,
+        `error`), `finished` (tüm adımlar tamamlandı mı), `failed` (bir adım
+        vazgeçilerek durdu mu) ve `needs_login` (devam etmek için yeniden giriş
+        gerekiyor mu).
+    """
+    conn = _connect()
+    try:
+        rows = conn.execute(
+            "SELECT step, status, attempts, done, total, last_error FROM purge_steps WHERE user_id = ?",
+            (user_id,),
+        ).fetchall()
+    finally:
+        conn.close()
+    if not rows:
+        return None
+    steps = {step: {"status": status, "attempts": attempts, "done": done, "total": total, "error": error}
+             for step, status, attempts, done, total, error in rows}
+    failed = [info for info in steps.values() if info["status"] == "failed"]
+    return {
+        "steps": {step: steps[step] for step in STEPS if step in steps},
+        "finished": all(info["status"] == "done" for info in steps.values()),
+        "failed": bool(failed),
+        "needs_login": any(info["error"] and any(m in info["error"] for m in RELOGIN_ERRORS)
+                           for info in failed),
+    }
+
+
+def recover_interrupted(user_id: str) -> bool:
+    """
+    Uygulama yeniden başladığı için yarıda kalmış bir silmeyi işaretler.
+
+    Silme bu işlemde çalışmıyorsa ve token'ı bellekte yoksa, bekleyen veya
+    çalışıyor görünen adımları "yeniden giriş gerekiyor" hatasıyla başarısız
+    olarak işaretler; kullanıcı yeniden giriş yapıp `start_purge` ile devam
+    ettirebilir. Ayarlar sayfası bunu silme durumunu göstermeden önce çağırır.
+
+    Returns:
+        bool: Bir silme işaretlendiyse True.
+    """
+    with _active_lock:
+        if user_id in _active or user_id in _tokens:
+            return False
+    conn = _connect()
+    try:
+        cursor = conn.execute(
+            "UPDATE purge_steps SET status = 'failed', last_error = ?, updated_at = ? "
+            "WHERE user_id = ? AND status IN ('pending', 'running')",
+            (LOGIN_REQUIRED, time.time(), user_id),
+        )
+        return cursor.rowcount > 0
+    finally:
+        conn.close()
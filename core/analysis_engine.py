@@ -27,9 +27,11 @@ def generate_character_report(user_id: str, id_token: str):
     """
     # 1. Veri Toplama Aşaması
     # -----------------------
-    # Kullanıcıya ait tüm günlük ve hedef verilerini veritabanından güvenli bir şekilde çek.
-    journals = firebase_db.get_journals(user_id, id_token)
-    goals = firebase_db.get_goals(user_id, id_token)
+    # Kullanıcıya ait tüm günlük ve hedef verilerini veritabanından güvenli bir şekilde,
+    # iki okumayı paralel yaparak çek.
+    bundle = firebase_db.fetch_user_bundle(user_id, id_token, parts=("journals", "goals"))
+    journals = bundle.journals
+    goals = bundle.goals
 
     # 2. Veri Ön İşleme Aşaması
     # --------------------------
@@ -96,7 +98,9 @@ def generate_character_report(user_id: str, id_token: str):
     # ekranında kullanılmak üzere kullanıcının profiline kaydet.
     if character_report:
         today_str = datetime.date.today().isoformat()
-        firebase_db.update_user_profile_field(user_id, "character_report", character_report, id_token)
-        firebase_db.update_user_profile_field(user_id, "last_analysis_date", today_str, id_token)
+        # İki alan tek bir atomik istekle birlikte güncellenir.
+        with firebase_db.batch(user_id, id_token) as b:
+            b.update_profile_field("character_report", character_report)
+            b.update_profile_field("last_analysis_date", today_str)
 
     print(f"Karakter analizi tamamlandı ve {user_id} için kaydedildi.")
@@ -0,0 +1,480 @@
+# -*- coding: utf-8 -*-
+"""
+Veritabanı Depolama Arka Uçları (Storage Backends) Modülü.
+
+`core.firebase_db`, verilere doğrudan Pyrebase üzerinden değil, bu modüldeki
+`StorageBackend` arayüzü üzerinden erişir. Böylece aynı `users/{uid}/...`
+ağaç yapısı ve aynı fonksiyonlar, farklı depolama katmanlarıyla
+kullanılabilir:
+
+- **PyrebaseBackend:** Varsayılan arka uç. Firebase Realtime Database'e
+  paylaşılan, havuzlu bağlantı üzerinden REST istekleri gönderir.
+- **LocalBackend:** Aynı ağaç semantiğini işlem içi (in-process) bir SQLite
+  veritabanında taklit eder. Ağ gerektirmediği için sayfa akışlarının
+  benchmark ve yük testlerinde veya deterministik test verisi olarak
+  kullanılabilir. Güvenlik kurallarını uygulamaz; `id_token` parametreleri
+  yok sayılır.
+
+Arka uç, `secrets.toml` içinde `[storage]` başlığı altında seçilir:
+
+    [storage]
+    backend = "local"            # "firebase" (varsayılan) veya "local"
+    path = ":memory:"            # Sadece "local" için; bir dosya yolu da olabilir.
+
+Testler ve benchmark'lar `set_backend` ile arka ucu doğrudan değiştirebilir.
+"""
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, List, Optional
+
+import streamlit as st
+
+from core import resilience
+from core.firebase_config import get_firebase_app
+
+DEFAULT_BACKEND = "firebase"
+DEFAULT_LOCAL_PATH = ":memory:"
+
+_backend_lock = threading.Lock()
+_backend: Optional["StorageBackend"] = None
+
+
+class StorageBackend(ABC):
+    """
+    `core.firebase_db`'nin ihtiyaç duyduğu veritabanı işlemlerinin arayüzü.
+
+    Tüm yollar (`path`) kökten itibaren `/` ile ayrılmış göreli yollardır
+    (örn: `users/{uid}/journals`). Okuma fonksiyonları Pyrebase'in `.val()`
+    ile döndürdüğü gibi düz Python değerleri döndürür; düğüm yoksa `None`.
+    Yazmalarda `{".sv": {"increment": n}}` sunucu değeri desteklenir.
+    """
+
+    @abstractmethod
+    def get(self, path: str, id_token: str) -> Any:
+        """Bir düğümü tüm alt ağacıyla birlikte okur."""
+
+    @abstractmethod
+    def get_range(self, path: str, id_token: str, start: Optional[str] = None,
+                  end: Optional[str] = None, limit_last: Optional[int] = None) -> Any:
+        """
+        Bir düğümün çocuklarını anahtara göre filtreleyerek okur.
+
+        `start`/`end` kapsayıcıdır; `limit_last` aralıktaki en büyük N anahtarı seçer.
+        """
+
+    @abstractmethod
+    def shallow_keys(self, path: str, id_token: str) -> List[str]:
+        """Bir düğümün sadece çocuk anahtarlarını, alt ağaçlarını indirmeden döndürür."""
+
+    @abstractmethod
+    def set(self, path: str, value: Any, id_token: str):
+        """Bir düğümün değerini tamamen değiştirir; `None` düğümü siler."""
+
+    @abstractmethod
+    def update(self, path: str, updates: Dict[str, Any], id_token: str):
+        """Çok konumlu (multi-location) güncellemeyi atomik olarak uygular."""
+
+    @abstractmethod
+    def remove(self, path: str, id_token: str):
+        """Bir düğümü tüm alt ağacıyla birlikte siler."""
+
+    @abstractmethod
+    def generate_key(self) -> str:
+        """Zamana göre sıralanan, benzersiz bir push ID'si üretir."""
+
+
+class PyrebaseBackend(StorageBackend):
+    """
+    Firebase Realtime Database'i Pyrebase üzerinden kullanan arka uç.
+
+    İstekler `core.resilience` üzerinden gönderilir. Okumalar idempotent
+    olduğu için yavaş kaldıklarında yedek istek gönderilebilir; sunucu
+    taraflı artırma (`.sv`) içeren güncellemeler ise, iki kez uygulanmamaları
+    için tekrar denenmez.
+    """
+
+    @staticmethod
+    def _db():
+        # Pyrebase'in `Database` nesnesi sorgu durumunu kendi üzerinde tuttuğu
+        # için her işlemde yenisi oluşturulur; HTTP bağlantıları ise paylaşılan
+        # uygulama nesnesinin havuzundan yeniden kullanılır.
+        return get_firebase_app().database()
+
+    @staticmethod
+    def _read(request: Callable[[], Any]) -> Any:
+        return resilience.call(resilience.FIREBASE, request, hedge=True)
+
+    def get(self, path, id_token):
+        return self._read(lambda: self._db().child(path).get(id_token).val())
+
+    def get_range(self, path, id_token, start=None, end=None, limit_last=None):
+        def request():
+            query = self._db().child(path)
+            if start is not None or end is not None or limit_last is not None:
+                query = query.order_by_key()
+                if start is not None:
+                    query = query.start_at(start)
+                if end is not None:
+                    query = query.end_at(end)
+                if limit_last is not None:
+                    query = query.limit_to_last(limit_last)
+            return query.get(id_token).val()
+        return self._read(request)
+
+    def shallow_keys(self, path, id_token):
+        keys = self._read(lambda: self._db().child(path).shallow().get(id_token).val())
+        return list(keys) if keys else []
+
+    def set(self, path, value, id_token):
+        resilience.call(resilience.FIREBASE, lambda: self._db().child(path).set(value, id_token))
+
+    def update(self, path, updates, id_token):
+        resilience.call(resilience.FIREBASE, lambda: self._db().child(path).update(updates, id_token),
+                        retry=not _has_server_increment(updates))
+
+    def remove(self, path, id_token):
+        resilience.call(resilience.FIREBASE, lambda: self._db().child(path).remove(id_token))
+
+    def generate_key(self):
+        return self._db().generate_key()
+
+
+def _has_server_increment(updates: Dict[str, Any]) -> bool:
+    return any(isinstance(value, dict) and ".sv" in value for value in updates.values())
+
+
+# Yollar veritabanında bu karakterle birleştirilerek saklanır. Firebase
+# anahtarlarında kontrol karakterleri kullanılamadığı ve bu karakter tüm
+# geçerli karakterlerden küçük olduğu için, satırların sıralaması anahtar
+# demetlerinin (tuple) sözlük sırasıyla birebir aynı olur.
+_SEP = "\x01"
+_SEP_END = "\x02"
+_MAX_PATH = "\U0010ffff"  # Tüm geçerli yollardan büyük bir üst sınır.
+# `shallow_keys`, bu kadar satırdan küçük alt ağaçları tek sorguyla tarar.
+SHALLOW_SCAN_ROWS = 5000
+_PUSH_CHARS = "-0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ_abcdefghijklmnopqrstuvwxyz"
+
+
+def _split(path: str) -> List[str]:
+    return [part for part in path.strip("/").split("/") if part]
+
+
+def _has_server_value(value: Any) -> bool:
+    if isinstance(value, dict):
+        return ".sv" in value or any(_has_server_value(v) for v in value.values())
+    return False
+
+
+def resolve_server_values(current: Any, value: Any) -> Any:
+    """`{".sv": {"increment": n}}` değerlerini mevcut değere göre hesaplar."""
+    if isinstance(value, dict):
+        server_value = value.get(".sv")
+        if isinstance(server_value, dict) and "increment" in server_value:
+            base = current if isinstance(current, (int, float)) and not isinstance(current, bool) else 0
+            return base + server_value["increment"]
+        return {
+            k: resolve_server_values(current.get(k) if isinstance(current, dict) else None, v)
+            for k, v in value.items()
+        }
+    return value
+
+
+def _flatten(parts: List[str], value: Any, rows: List[tuple]):
+    """İç içe bir değeri `(yol, JSON değer)` yaprak satırlarına dönüştürür."""
+    if isinstance(value, dict):
+        for key, child in value.items():
+            _flatten(parts + [str(key)], child, rows)
+    elif isinstance(value, (list, tuple)):
+        # Firebase dizileri, indeksleri anahtar olan düğümler olarak saklar.
+        for index, child in enumerate(value):
+            _flatten(parts + [str(index)], child, rows)
+    elif value is not None:
+        rows.append((_SEP.join(parts), json.dumps(value)))
+
+
+def _arrayify(node: Any) -> Any:
+    """Firebase gibi, anahtarları ağırlıklı olarak ardışık tam sayı olan düğümleri listeye çevirir."""
+    if not isinstance(node, dict):
+        return node
+    # Ağaç `_build` tarafından yeni oluşturulduğu için yerinde değiştirilir.
+    for k, v in node.items():
+        if isinstance(v, dict):
+            node[k] = _arrayify(v)
+    if node and all(k.isdigit() and (k == "0" or not k.startswith("0")) for k in node):
+        indices = [int(k) for k in node]
+        if max(indices) < 2 * len(indices):
+            array = [None] * (max(indices) + 1)
+            for k, v in node.items():
+                array[int(k)] = v
+            return array
+    return node
+
+
+class LocalBackend(StorageBackend):
+    """
+    Firebase ağaç semantiğini SQLite üzerinde taklit eden işlem içi arka uç.
+
+    Ağaçtaki her yaprak değer, tam yoluyla birlikte tek bir satır olarak
+    saklanır. Yol sütunu üzerindeki birincil anahtar indeksi sayesinde alt
+    ağaç okumaları, anahtar aralığı sorguları ve `limit_last` sorguları
+    verinin tamamı taranmadan yapılır.
+
+    Anahtarlar sözlük sırasıyla karşılaştırılır; Firebase'in tam sayı
+    görünümlü anahtarları öne alan sıralaması uygulanmaz (uygulamadaki
+    tarih ve push ID anahtarları için iki sıralama aynıdır).
+
+    Args:
+        path (str): SQLite dosya yolu; `":memory:"` ise veri sadece bellekte tutulur.
+        data (dict, optional): Başlangıçta köke yazılacak veri ağacı.
+    """
+
+    def __init__(self, path: str = DEFAULT_LOCAL_PATH, data: Optional[Dict[str, Any]] = None):
+        if path != ":memory:":
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("CREATE TABLE IF NOT EXISTS nodes (path TEXT PRIMARY KEY, value TEXT NOT NULL) WITHOUT ROWID")
+        self._lock = threading.RLock()
+        self._last_push_time = 0
+        self._last_rand_chars: List[int] = []
+        if data:
+            self.set("", data, None)
+
+    # --- Okuma ---
+
+    @staticmethod
+    def _bounds(parts: List[str], start: Optional[str] = None, end: Optional[str] = None):
+        """Bir düğümün çocuk satırlarını (isteğe bağlı anahtar aralığıyla) kapsayan `[low, high)` aralığı."""
+        prefix = _SEP.join(parts) + _SEP if parts else ""
+        low = prefix + (start if start is not None else "")
+        if end is not None:
+            high = prefix + end + _SEP_END
+        else:
+            high = _SEP.join(parts) + _SEP_END if parts else _MAX_PATH
+        return low, high
+
+    def _rows(self, parts: List[str], start: Optional[str] = None, end: Optional[str] = None):
+        """Bir düğümün alt ağacındaki satırları, isteğe bağlı çocuk anahtarı aralığıyla döndürür."""
+        return self._conn.execute(
+            "SELECT path, value FROM nodes WHERE path >= ? AND path < ? ORDER BY path",
+            self._bounds(parts, start, end),
+        )
+
+    @staticmethod
+    def _build(parts: List[str], rows) -> Any:
+        """Yaprak satırlarından iç içe bir sözlük ağacı oluşturur."""
+        rows = rows.fetchall() if hasattr(rows, "fetchall") else list(rows)
+        if not rows:
+            return None
+        # Yaprak değerleri tek bir JSON dizisi olarak, tek seferde çözülür;
+        # satır başına `json.loads` çağrısı büyük alt ağaçlarda okumanın
+        # çoğunu oluşturuyordu.
+        values = json.loads("[" + ",".join(value for _, value in rows) + "]")
+        offset = len(_SEP.join(parts)) + 1 if parts else 0
+        tree: Dict[str, Any] = {}
+        # Ardışık satırlar genellikle aynı üst düğümü paylaşır (örn: bir
+        # girdinin `text` ve `timestamp` alanları); son üst düğüm yeniden
+        # aranmadan kullanılır.
+        last_parent, last_node = None, tree
+        for (path, _), value in zip(rows, values):
+            parent, _, leaf = path[offset:].rpartition(_SEP)
+            if parent != last_parent:
+                node = tree
+                if parent:
+                    for key in parent.split(_SEP):
+                        node = node.setdefault(key, {})
+                last_parent, last_node = parent, node
+            last_node[leaf] = value
+        return _arrayify(tree)
+
+    def _read(self, parts: List[str]) -> Any:
+        if parts:
+            row = self._conn.execute("SELECT value FROM nodes WHERE path = ?", (_SEP.join(parts),)).fetchone()
+            if row is not None:
+                return json.loads(row[0])
+        return self._build(parts, self._rows(parts))
+
+    def get(self, path, id_token):
+        with self._lock:
+            return self._read(_split(path))
+
+    def get_range(self, path, id_token, start=None, end=None, limit_last=None):
+        parts = _split(path)
+        with self._lock:
+            if start is None and end is None and limit_last is None:
+                return self._read(parts)
+            if limit_last is not None:
+                start = self._limit_last_start(parts, start, end, limit_last)
+                if start is None:
+                    return None
+            return self._build(parts, self._rows(parts, start, end))
+
+    def _limit_last_start(self, parts: List[str], start: Optional[str], end: Optional[str],
+                          limit_last: int) -> Optional[str]:
+        """Aralıktaki en büyük `limit_last` çocuk anahtarının en küçüğünü bulur."""
+        if limit_last <= 0:
+            return None
+        depth = len(parts)
+        found = None
+        count = 0
+        # Satırlar anahtar sırasıyla gruplandığı için sondan geriye doğru
+        # yürüyerek N farklı anahtar bulunur; aralığın geri kalanı okunmaz.
+        cursor = self._conn.execute(
+            "SELECT path FROM nodes WHERE path >= ? AND path < ? ORDER BY path DESC",
+            self._bounds(parts, start, end),
+        )
+        for (row_path,) in cursor:
+            key = row_path.split(_SEP)[depth]
+            if key != found:
+                if count == limit_last:
+                    break
+                found = key
+                count += 1
+        return found
+
+    def shallow_keys(self, path, id_token):
+        parts = _split(path)
+        prefix = _SEP.join(parts) + _SEP if parts else ""
+        depth = len(parts)
+        keys = []
+        with self._lock:
+            # Küçük alt ağaçlarda (örn: günlük tarihleri) tüm satırlar tek bir
+            # sorguyla okunup anahtarlara göre gruplanır; her anahtar için ayrı
+            # bir sorgu göndermekten çok daha hızlıdır.
+            rows = self._conn.execute(
+                "SELECT substr(path, ?) FROM nodes WHERE path >= ? AND path < ? ORDER BY path LIMIT ?",
+                (len(prefix) + 1, *self._bounds(parts), SHALLOW_SCAN_ROWS + 1),
+            ).fetchall()
+            if len(rows) <= SHALLOW_SCAN_ROWS:
+                for (rest,) in rows:
+                    key = rest.split(_SEP, 1)[0]
+                    if not keys or keys[-1] != key:
+                        keys.append(key)
+                return keys
+            # Alt ağaç büyükse her çocuk anahtarından sadece ilk satır okunur,
+            # ardından indeks üzerinde bir sonraki anahtara atlanır.
+            low = prefix
+            while True:
+                row = self._conn.execute(
+                    "SELECT path FROM nodes WHERE path >= ? ORDER BY path LIMIT 1", (low,)
+                ).fetchone()
+                if row is None or not row[0].startswith(prefix):
+                    break
+                key = row[0].split(_SEP)[depth]
+                keys.append(key)
+                low = prefix + key + _SEP_END
+        return keys
+
+    # --- Yazma ---
+
+    def _write(self, parts: List[str], value: Any):
+        """Tek bir yola yazar; çağıran taraf transaction ve kilidi yönetir."""
+        if _has_server_value(value):
+            value = resolve_server_values(self._read(parts), value)
+        encoded = _SEP.join(parts)
+        if parts:
+            # Düğümün eski alt ağacını ve yolu kapatan yaprak ataları sil.
+            self._conn.execute(
+                "DELETE FROM nodes WHERE path = ? OR (path > ? AND path < ?)",
+                (encoded, encoded + _SEP, encoded + _SEP_END),
+            )
+            ancestors = [_SEP.join(parts[:i]) for i in range(1, len(parts))]
+            if ancestors:
+                placeholders = ",".join("?" for _ in ancestors)
+                self._conn.execute(f"DELETE FROM nodes WHERE path IN ({placeholders})", ancestors)
+        else:
+            self._conn.execute("DELETE FROM nodes")
+        rows: List[tuple] = []
+        _flatten(parts, value, rows)
+        self._conn.executemany("INSERT INTO nodes (path, value) VALUES (?, ?)", rows)
+
+    def _transaction(self, writes: List[tuple]):
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                for parts, value in writes:
+                    self._write(parts, value)
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def set(self, path, value, id_token):
+        self._transaction([(_split(path), value)])
+
+    def update(self, path, updates, id_token):
+        parts = _split(path)
+        self._transaction([(parts + _split(key), value) for key, value in updates.items()])
+
+    def remove(self, path, id_token):
+        self._transaction([(_split(path), None)])
+
+    def generate_key(self):
+        # Firebase'in push ID algoritması: 8 karakter zaman damgası ve aynı
+        # milisaniyede üretilen ID'lerin sırasını koruyan 12 rastgele karakter.
+        with self._lock:
+            now = int(time.time() * 1000)
+            if now == self._last_push_time:
+                for i in range(11, -1, -1):
+                    if self._last_rand_chars[i] != 63:
+                        self._last_rand_chars[i] += 1
+                        break
+                    self._last_rand_chars[i] = 0
+            else:
+                self._last_rand_chars = [random.randrange(64) for _ in range(12)]
+            self._last_push_time = now
+            time_chars = []
+            for _ in range(8):
+                time_chars.append(_PUSH_CHARS[now % 64])
+                now //= 64
+            return "".join(reversed(time_chars)) + "".join(_PUSH_CHARS[i] for i in self._last_rand_chars)
+
+
+def create_backend(settings: Dict[str, Any]) -> StorageBackend:
+    """
+    Ayarlara göre bir arka uç oluşturur.
+
+    Raises:
+        ValueError: Bilinmeyen bir arka uç adı verilirse.
+    """
+    name = settings.get("backend", DEFAULT_BACKEND)
+    if name == "firebase":
+        return PyrebaseBackend()
+    if name == "local":
+        return LocalBackend(settings.get("path", DEFAULT_LOCAL_PATH))
+    raise ValueError(f"Bilinmeyen depolama arka ucu: {name}")
+
+
+def get_backend() -> StorageBackend:
+    """
+    Uygulama genelinde kullanılan arka ucu döndürür.
+
+    Arka uç ilk çağrıda `[storage]` ayarlarına göre (thread-safe olarak) bir
+    kez oluşturulur; başlık yoksa Firebase kullanılır.
+    """
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                try:
+                    settings = dict(st.secrets.get("storage", {}))
+                except FileNotFoundError:
+                    settings = {}
+                _backend = create_backend(settings)
+    return _backend
+
+
+def set_backend(backend: Optional[StorageBackend]):
+    """
+    Kullanılan arka ucu değiştirir; `None` verilirse bir sonraki
+    `get_backend` çağrısında ayarlardan yeniden oluşturulur.
+    """
+    global _backend
+    with _backend_lock:
+        _backend = backend
@@ -0,0 +1,232 @@
+# -*- coding: utf-8 -*-
+"""
+Kalıcı Embedding Önbelleği Modülü.
+
+Aynı metnin embedding'i (örn: tekrar kaydedilen bir günlük veya aynı arama
+sorgusu) her seferinde Gemini'ye sorulmaz; daha önce alınmış embedding'ler
+diskteki bir SQLite dosyasında saklanır.
+
+Özellikler:
+- **Kalıcı ve Paylaşımlı:** Önbellek uygulama yeniden başlasa da korunur;
+  aynı dosyayı kullanan tüm Streamlit işlemleri (process) birbirinin aldığı
+  embedding'lerden yararlanır.
+- **İçerik Anahtarlı:** Kayıtlar `(model, task_type, sha256(metin))` ile
+  anahtarlanır; metnin kendisi önbellekte tutulmaz.
+- **Sınırlı:** Vektörler `float32` olarak saklanır. Toplam boyut `max_bytes`'ı
+  aşarsa en uzun süredir kullanılmayan (LRU) kayıtlar silinir.
+- **İzlenebilir:** `get_cache_stats()` isabet oranını, kayıt sayısını ve
+  kullanılan bayt miktarını döndürür.
+
+İsteğe bağlı ayarlar `secrets.toml` içinde `[embedding_cache]` başlığı altında
+verilebilir:
+
+    [embedding_cache]
+    enabled = true
+    path = ".mymindmate/embeddings.sqlite3"
+    max_bytes = 268435456
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+import streamlit as st
+
+DEFAULT_SETTINGS = {
+    "enabled": True,
+    "path": os.path.join(".mymindmate", "embeddings.sqlite3"),
+    "max_bytes": 256 * 1024 * 1024,
+}
+# Bir kaydın son kullanım zamanı en fazla bu aralıkla güncellenir; her
+# isabette diske yazmamak için LRU sırası bu hassasiyetle tutulur.
+TOUCH_INTERVAL = 60.0
+# Sınır aşıldığında, her seferinde sınırın bu oranı kadar yer açılır; böylece
+# her yeni kayıtta tekrar silme yapılmaz.
+EVICT_FRACTION = 0.1
+
+_settings: Optional[Dict[str, Any]] = None
+_local = threading.local()
+_counters = {"hits": 0, "misses": 0, "evicted": 0}
+_counters_lock = threading.Lock()
+
+
+def get_settings() -> Dict[str, Any]:
+    """Önbellek ayarlarını döndürür; `[embedding_cache]` başlığı yoksa varsayılanlar kullanılır."""
+    global _settings
+    if _settings is None:
+        try:
+            overrides = dict(st.secrets.get("embedding_cache", {}))
+        except FileNotFoundError:
+            overrides = {}
+        _settings = {**DEFAULT_SETTINGS, **overrides}
+    return _settings
+
+
+def is_enabled() -> bool:
+    return bool(get_settings()["enabled"])
+
+
+def _connect() -> sqlite3.Connection:
+    """Bu thread'e ait bağlantıyı döndürür; ilk çağrıda açar ve tabloları oluşturur."""
+    conn = getattr(_local, "conn", None)
+    if conn is not None:
+        return conn
+    path = get_settings()["path"]
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS embeddings (
+            key BLOB PRIMARY KEY,
+            vector BLOB NOT NULL,
+            last_used REAL NOT NULL
+        ) WITHOUT ROWID
+        """
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS embeddings_lru ON embeddings (last_used)")
+    # Toplam boyut her yazmada SUM() ile hesaplanmamak için burada tutulur.
+    conn.execute("CREATE TABLE IF NOT EXISTS totals (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+    conn.execute("INSERT OR IGNORE INTO totals (name, value) VALUES ('bytes', 0)")
+    _local.conn = conn
+    return conn
+
+
+def _key(model: str, task_type: str, text: str) -> bytes:
+    digest = hashlib.sha256(text.encode("utf-8")).digest()
+    return hashlib.sha256(f"{model}\x00{task_type}\x00".encode("utf-8") + digest).digest()
+
+
+def _count(name: str, amount: int = 1):
+    with _counters_lock:
+        _counters[name] += amount
+
+
+def get_many(model: str, task_type: str, texts: Sequence[str]) -> List[Optional[List[float]]]:
+    """
+    Metinlerin önbellekteki embedding'lerini döndürür.
+
+    Returns:
+        list: Metinlerle aynı sırada; önbellekte olmayan metinler için None.
+    """
+    if not texts:
+        return []
+    try:
+        return _get_many(model, task_type, texts)
+    except sqlite3.Error as e:
+        # Önbellek hatası embedding almayı engellememeli; tüm metinler ıskalanmış sayılır.
+        print(f"Embedding önbelleği okunamadı: {e}")
+        return [None] * len(texts)
+
+
+def _get_many(model: str, task_type: str, texts: Sequence[str]) -> List[Optional[List[float]]]:
+    conn = _connect()
+    keys = [_key(model, task_type, text) for text in texts]
+    found = {}
+    unique = list(dict.fromkeys(keys))
+    # SQLite'ın parametre sınırına takılmamak için anahtarlar parça parça sorgulanır.
+    for i in range(0, len(unique), 500):
+        chunk = unique[i:i + 500]
+        placeholders = ",".join("?" for _ in chunk)
+        for key, vector, last_used in conn.execute(
+            f"SELECT key, vector, last_used FROM embeddings WHERE key IN ({placeholders})", chunk
+        ):
+            found[key] = (vector, last_used)
+
+    now = time.time()
+    stale = [key for key, (_, last_used) in found.items() if now - last_used > TOUCH_INTERVAL]
+    if stale:
+        conn.executemany("UPDATE embeddings SET last_used = ? WHERE key = ?", [(now, key) for key in stale])
+
+    hits = sum(1 for key in keys if key in found)
+    _count("hits", hits)
+    _count("misses", len(keys) - hits)
+    return [np.frombuffer(found[key][0], dtype=np.float32).tolist() if key in found else None
+            for key in keys]
+
+
+def put_many(model: str, task_type: str, texts: Sequence[str], vectors: Sequence[Sequence[float]]):
+    """Metinlerin embedding'lerini önbelleğe yazar ve gerekirse eski kayıtları siler."""
+    if not texts:
+        return
+    now = time.time()
+    rows = {_key(model, task_type, text): np.asarray(vector, dtype=np.float32).tobytes()
+            for text, vector in zip(texts, vectors)}
+    try:
+        conn = _connect()
+    except sqlite3.Error as e:
+        print(f"Embedding önbelleğine yazılamadı: {e}")
+        return
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        added = 0
+        for key, blob in rows.items():
+            old = conn.execute("SELECT length(vector) FROM embeddings WHERE key = ?", (key,)).fetchone()
+            conn.execute("INSERT OR REPLACE INTO embeddings (key, vector, last_used) VALUES (?, ?, ?)",
+                         (key, blob, now))
+            added += len(blob) - (old[0] if old else 0)
+        conn.execute("UPDATE totals SET value = value + ? WHERE name = 'bytes'", (added,))
+        _evict(conn)
+        conn.execute("COMMIT")
+    except sqlite3.Error as e:
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
+        print(f"Embedding önbelleğine yazılamadı: {e}")
+
+
+def _evict(conn: sqlite3.Connection):
+    """Toplam boyut sınırı aşıldıysa en uzun süredir kullanılmayan kayıtları siler."""
+    max_bytes = int(get_settings()["max_bytes"])
+    (total,) = conn.execute("SELECT value FROM totals WHERE name = 'bytes'").fetchone()
+    if total <= max_bytes:
+        return
+    target = max_bytes * (1 - EVICT_FRACTION)
+    freed, victims = 0, []
+    for key, size in conn.execute("SELECT key, length(vector) FROM embeddings ORDER BY last_used"):
+        if total - freed <= target:
+            break
+        victims.append((key,))
+        freed += size
+    conn.executemany("DELETE FROM embeddings WHERE key = ?", victims)
+    conn.execute("UPDATE totals SET value = value - ? WHERE name = 'bytes'", (freed,))
+    _count("evicted", len(victims))
+
+
+def get_cache_stats() -> Dict[str, Any]:
+    """
+    Önbelleğin anlık durumunu döndürür.
+
+    Returns:
+        dict: Bu işlemdeki `hits`/`misses`/`hit_rate`/`evicted` sayaçları ile
+        tüm işlemlerin paylaştığı dosyadaki `entries` ve `bytes` değerleri.
+    """
+    conn = _connect()
+    (entries,) = conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()
+    (total,) = conn.execute("SELECT value FROM totals WHERE name = 'bytes'").fetchone()
+    with _counters_lock:
+        counters = dict(_counters)
+    lookups = counters["hits"] + counters["misses"]
+    return {
+        **counters,
+        "hit_rate": counters["hits"] / lookups if lookups else 0.0,
+        "entries": entries,
+        "bytes": total,
+        "max_bytes": int(get_settings()["max_bytes"]),
+    }
+
+
+def clear():
+    """Önbellekteki tüm kayıtları ve bu işlemdeki sayaçları sıfırlar."""
+    conn = _connect()
+    conn.execute("BEGIN IMMEDIATE")
+    conn.execute("DELETE FROM embeddings")
+    conn.execute("UPDATE totals SET value = 0 WHERE name = 'bytes'")
+    conn.execute("COMMIT")
+    with _counters_lock:
+        for name in _counters:
+            _counters[name] = 0
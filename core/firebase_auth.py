@@ -4,13 +4,32 @@ Firebase Kimlik Doğrulama (Authentication) İşlemleri Modülü.
 
 Bu modül, kullanıcıların uygulamaya kaydolması (register), giriş yapması (login)
 ve hesaplarını silmesi (delete) gibi tüm kimlik doğrulama işlemlerini yönetir.
-Tüm fonksiyonlar, `core.firebase_config` üzerinden temiz bir Firebase bağlantısı
-alarak çalışır.
+Tüm fonksiyonlar, `core.firebase_config` üzerinden paylaşılan Firebase uygulama
+nesnesini kullanarak çalışır.
+
+Giriş ve kayıt yanıtlarındaki token'lar `core.token_manager`'a kaydedilir;
+böylece oturum, `idToken`'ın bir saatlik süresi dolduğunda yeniden giriş
+gerektirmeden yenilenir.
 """
 
 import streamlit as st
-from core.firebase_config import initialize_firebase_app
+from core.firebase_config import get_firebase_app
 from core import firebase_db
+from core import token_manager
+
+def _start_session(user: dict, email: str):
+    """
+    Giriş/kayıt yanıtındaki token'ları kaydeder ve Streamlit session state'i kurar.
+
+    Firebase'in giriş ve kayıt yanıtları kullanıcının UID'sini (`localId`)
+    zaten içerdiği için ek bir `get_account_info` isteğine gerek yoktur.
+    """
+    uid = user['localId']
+    token_manager.register(uid, user['idToken'], user['refreshToken'], user['expiresIn'])
+    st.session_state["user_id"] = uid
+    st.session_state["user_email"] = email
+    st.session_state["user_id_token"] = user['idToken'] # Bu token, güvenli DB işlemleri için kritik.
+    return uid
 
 def firebase_login(email: str, password: str):
     """
@@ -23,29 +42,23 @@ def firebase_login(email: str, password: str):
     Returns:
         tuple[bool, str | None]: (Başarı durumu, Hata mesajı veya None)
     """
-    firebase_app = initialize_firebase_app()
+    firebase_app = get_firebase_app()
     auth = firebase_app.auth()
     try:
-        # 1. Firebase'e giriş yapmayı dene
+        # 1. Firebase'e giriş yapmayı dene. Yanıt, UID'yi (`localId`) de içerir.
         user = auth.sign_in_with_email_and_password(email, password)
-        id_token = user['idToken']
-
-        # 2. Firebase'den kullanıcının UID (unique ID) bilgisini al
-        info = auth.get_account_info(id_token)
-        uid = info['users'][0]['localId']
+        uid = user['localId']
 
-        # 3. Veritabanından diğer kullanıcı detaylarını (örn: isim) çek
+        # 2. Veritabanından diğer kullanıcı detaylarını (örn: isim) çek
         # Bu işlem için `id_token` yetkilendirme amacıyla kullanılır.
-        user_details = firebase_db.get_user_details(uid, id_token)
+        user_details = firebase_db.get_user_details(uid, user['idToken'])
         user_name = user_details.get("name", "Kullanıcı") # İsim yoksa varsayılan ata
 
-        # 4. Başarılı girişte Streamlit session state'i kur
+        # 3. Başarılı girişte Streamlit session state'i kur
         # Bu bilgiler, uygulama boyunca kullanıcıyı tanımak için kullanılır.
-        st.session_state["user_id"] = uid
-        st.session_state["user_email"] = email
+        _start_session(user, email)
         st.session_state["user_name"] = user_name
-        st.session_state["user_id_token"] = id_token # Bu token, güvenli DB işlemleri için kritik.
-        
+
         return True, None
     except Exception as e:
         # Hata durumunda, kullanıcıya anlaşılır bir mesaj döndür.
@@ -62,11 +75,11 @@ def firebase_login(email: str, password: str):
 
 def firebase_register(email: str, password: str):
     """
-    Firebase Authentication sisteminde yeni bir kullanıcı oluşturur.
+    Firebase Authentication sisteminde yeni bir kullanıcı oluşturur ve oturumu açar.
 
-    Not: Bu fonksiyon sadece kullanıcıyı Auth sistemine kaydeder,
-    otomatik olarak giriş yapmaz veya veritabanına profil oluşturmaz.
-    Bu adımlar, bu fonksiyon çağrıldıktan sonra arayüz katmanında yönetilir.
+    Kayıt yanıtı bir `idToken` içerdiği için ayrıca giriş yapılmaz; session
+    state doğrudan kurulur. Veritabanına profil oluşturma adımı, bu fonksiyon
+    çağrıldıktan sonra arayüz katmanında yönetilir.
 
     Args:
         email (str): Yeni kullanıcının e-posta adresi.
@@ -75,12 +88,12 @@ def firebase_register(email: str, password: str):
     Returns:
         tuple[bool, str]: (Başarı durumu, Kullanıcı ID'si veya Hata mesajı)
     """
-    firebase_app = initialize_firebase_app()
+    firebase_app = get_firebase_app()
     auth = firebase_app.auth()
     try:
         # Firebase'de e-posta/şifre ile yeni bir kullanıcı hesabı oluştur.
         user = auth.create_user_with_email_and_password(email, password)
-        uid = user['localId']
+        uid = _start_session(user, email)
         return True, uid
     except Exception as e:
         # Yaygın kayıt hatalarını yakala ve kullanıcıya bildir.
@@ -94,6 +107,21 @@ def firebase_register(email: str, password: str):
         else:
             return False, "Kayıt sırasında bir hata oluştu."
 
+def delete_auth_account(user_id: str, id_token: str):
+    """
+    Kullanıcının Firebase Authentication hesabını siler; hata durumunda fırlatır.
+
+    Hesap zaten silinmişse (örn: yarıda kalan bir silme işlemi sürdürülürken)
+    işlem başarılı sayılır.
+    """
+    auth = get_firebase_app().auth()
+    try:
+        auth.delete_user_account(token_manager.current_token(user_id, id_token))
+    except Exception as e:
+        if "USER_NOT_FOUND" not in str(e):
+            raise
+    token_manager.forget(user_id)
+
 def delete_firebase_user():
     """
     Oturumu açık olan kullanıcının hesabını Firebase Authentication'dan kalıcı olarak siler.
@@ -103,17 +131,15 @@ def delete_firebase_user():
     Returns:
         tuple[bool, str]: (Başarı durumu, Bilgi veya Hata mesajı)
     """
-    firebase_app = initialize_firebase_app()
-    auth = firebase_app.auth()
     try:
         # Silme işlemi için session'da saklanan `id_token` kullanılır.
         # Bu, sadece mevcut kullanıcının kendi hesabını silebilmesini sağlar.
         id_token = st.session_state.get("user_id_token")
         if id_token:
-            auth.delete_user_account(id_token)
+            delete_auth_account(st.session_state.get("user_id"), id_token)
             return True, "Kullanıcı başarıyla silindi."
         else:
             # Eğer bir şekilde token yoksa, güvenlik için işlemi durdur.
             return False, "Oturum token'ı bulunamadı. Silme işlemi için yeniden giriş yapmanız gerekebilir."
     except Exception as e:
-        return False, f"Hesap silinirken bir hata oluştu: {e}"
\ No newline at end of file
+        return False, f"Hesap silinirken bir hata oluştu: {e}"
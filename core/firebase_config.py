@@ -5,23 +5,133 @@ Firebase Konfigürasyon ve Başlatma Modülü.
 Bu modül, Firebase uygulamasının merkezi olarak başlatılmasından sorumludur.
 Projenin herhangi bir yerinden Firebase'e erişim gerektiğinde, bu modüldeki
 fonksiyonlar kullanılır. Bu, konfigürasyonun tek bir yerden yönetilmesini sağlar.
+
+Bağlantı Havuzu:
+Uygulama genelinde tek bir Pyrebase uygulama nesnesi (`get_firebase_app`)
+paylaşılır. Bu nesnenin HTTP oturumu, bağlantıları açık tutan (keep-alive)
+bir bağlantı havuzu ve varsayılan bir zaman aşımı ile yapılandırılır. Böylece
+her okuma/yazma işleminde yeniden TLS el sıkışması yapılmaz.
+
+İsteğe bağlı ayarlar `secrets.toml` içinde `[firebase_client]` başlığı altında
+verilebilir:
+
+    [firebase_client]
+    timeout = 10        # Saniye cinsinden istek zaman aşımı.
+    pool_size = 10      # Havuzda tutulacak en fazla bağlantı sayısı.
 """
 
+import threading
+
 import streamlit as st
 import pyrebase
+import requests
+from requests.adapters import HTTPAdapter
+
+DEFAULT_TIMEOUT = 10      # Saniye. Yanıt vermeyen bir isteğin sayfayı kilitlemesini engeller.
+DEFAULT_POOL_SIZE = 10    # Aynı anda açık tutulabilecek bağlantı sayısı.
+
+_app_lock = threading.Lock()
+_shared_app = None
+
+
+class _PooledSession(requests.Session):
+    """
+    Her isteğe varsayılan bir zaman aşımı ekleyen `requests.Session`.
+
+    Pyrebase, veritabanı isteklerinde `timeout` parametresi göndermez; bu
+    sınıf, çağrıda açıkça bir değer verilmediyse yapılandırılmış zaman
+    aşımını uygular.
+    """
+
+    def __init__(self, timeout: float):
+        super().__init__()
+        self.timeout = timeout
+
+    def request(self, *args, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        return super().request(*args, **kwargs)
+
 
 def get_firebase_config():
     """Streamlit secrets'tan Firebase konfigürasyonunu çeker."""
     return dict(st.secrets["firebase"])
 
+
+def get_client_settings() -> dict:
+    """
+    Bağlantı havuzu ayarlarını (`timeout`, `pool_size`) döndürür.
+
+    `secrets.toml` içinde `[firebase_client]` başlığı yoksa varsayılan
+    değerler kullanılır.
+    """
+    try:
+        overrides = dict(st.secrets.get("firebase_client", {}))
+    except FileNotFoundError:
+        overrides = {}
+    return {
+        "timeout": float(overrides.get("timeout", DEFAULT_TIMEOUT)),
+        "pool_size": int(overrides.get("pool_size", DEFAULT_POOL_SIZE)),
+    }
+
+
+def build_firebase_app(config: dict, timeout: float = DEFAULT_TIMEOUT, pool_size: int = DEFAULT_POOL_SIZE):
+    """
+    Verilen konfigürasyonla, havuzlu bir HTTP oturumu kullanan Pyrebase
+    uygulama nesnesi oluşturur.
+
+    Args:
+        config (dict): Pyrebase konfigürasyonu (`apiKey`, `databaseURL` vb.).
+        timeout (float): Her HTTP isteği için varsayılan zaman aşımı (saniye).
+        pool_size (int): Host başına havuzda tutulacak en fazla bağlantı sayısı.
+
+    Returns:
+        pyrebase.pyrebase.Firebase: Havuzlu oturumla yapılandırılmış uygulama nesnesi.
+    """
+    firebase_app = pyrebase.initialize_app(config)
+    session = _PooledSession(timeout)
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    for scheme in ("http://", "https://"):
+        session.mount(scheme, adapter)
+    # Pyrebase'in kendi oluşturduğu oturumu havuzlu oturumla değiştir.
+    firebase_app.requests.close()
+    firebase_app.requests = session
+    return firebase_app
+
+
+def get_firebase_app():
+    """
+    Uygulama genelinde paylaşılan Firebase uygulama nesnesini döndürür.
+
+    Nesne ilk çağrıda (thread-safe olarak) bir kez oluşturulur ve sonraki
+    tüm çağrılarda aynı nesne, dolayısıyla aynı bağlantı havuzu kullanılır.
+    `database()` ve `auth()` her çağrıda yeni ve durumsuz servis nesneleri
+    döndürdüğü için, paylaşılan uygulama nesnesi farklı kullanıcıların
+    işlemleri arasında state taşımaz.
+
+    Returns:
+        pyrebase.pyrebase.Firebase: Paylaşılan Firebase uygulama nesnesi.
+    """
+    global _shared_app
+    if _shared_app is None:
+        with _app_lock:
+            if _shared_app is None:
+                settings = get_client_settings()
+                _shared_app = build_firebase_app(
+                    get_firebase_config(),
+                    timeout=settings["timeout"],
+                    pool_size=settings["pool_size"],
+                )
+    return _shared_app
+
+
 def initialize_firebase_app():
     """
     Yeni ve temiz bir Firebase uygulama bağlantısı başlatır.
 
     Bu fonksiyon, her çağrıldığında `secrets.toml` dosyasındaki
     konfigürasyon bilgilerini kullanarak taze bir Pyrebase uygulama
-    nesnesi oluşturur. Bu, özellikle kimlik doğrulama gibi hassas
-    işlemlerde state'in karışmasını engeller.
+    nesnesi oluşturur. Uygulama içi işlemler için paylaşılan ve havuzlu
+    bağlantı kullanan `get_firebase_app` tercih edilmelidir.
 
     Returns:
         pyrebase.pyrebase.Firebase: Yeni başlatılmış Firebase uygulama nesnesi.
@@ -10,46 +10,439 @@ Güvenlik Notu:
 Tüm fonksiyonlar, kullanıcının kimliğini doğrulamak ve veritabanı kurallarına
 uymak için bir `id_token` parametresi alır. Bu token olmadan hiçbir işlem
 yapılamaz. Bu, bir kullanıcının sadece kendi verilerine erişebilmesini sağlar.
+Verilen token, `core.token_manager` ile kullanıcının güncel token'ına
+çevrilir; böylece oturumda saklanan token'ın süresi dolsa bile işlemler
+arka planda yenilenen token ile yapılır.
+
+Önbellek:
+Profil, günlük ve hedef okumaları, Streamlit'in her yeniden çalıştırmasında
+veritabanına gitmemek için kullanıcı bazlı, TTL'li bir önbellekten sunulur.
+Yazma fonksiyonları önbellekteki ilgili kopyayı günceller veya geçersiz kılar.
+İsabet oranı `get_cache_stats()` ile izlenebilir.
+
+Canlı Ayna:
+`[live_mirror]` ayarı etkinse, okumalar önbellek ve ağ yerine `core.live_mirror`
+tarafından akış (SSE) ile güncel tutulan kullanıcı aynasından yapılır.
+
+Depolama Arka Ucu:
+Veritabanı istekleri doğrudan Pyrebase'e değil, `core.db_backends` içindeki
+arka uca gönderilir. Varsayılan arka uç Firebase'dir; `[storage]` ayarı ile
+aynı ağaç yapısını taklit eden yerel bir SQLite arka ucu seçilebilir.
 """
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field as dataclass_field
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Callable, Iterable, Iterator, List, Tuple
+
+from core import live_mirror
+from core import token_manager
+from core.db_backends import StorageBackend, get_backend
+
+def get_db_instance() -> StorageBackend:
+    """
+    Veritabanı işlemlerinin gönderileceği depolama arka ucunu döndürür.
+
+    Varsayılan arka uç, Firebase'e paylaşılan ve havuzlu bağlantı üzerinden
+    istek gönderir; `[storage]` ayarıyla yerel arka uç seçilebilir.
+    """
+    return get_backend()
+
+# --- OKUMA ÖNBELLEĞİ (READ-THROUGH CACHE) ---
+
+# Her veri türü için önbellekte tutulma süresi (saniye).
+CACHE_TTLS = {"profile": 300, "journals": 60, "goals": 60, "stats": 60}
+# Önbellekte aynı anda tutulabilecek en fazla kayıt sayısı (kullanıcı x veri türü).
+CACHE_MAX_ENTRIES = 512
+
+
+class _UserDataCache:
+    """
+    Kullanıcı verileri için TTL'li ve boyutu sınırlı bir LRU önbellek.
+
+    Kayıtlar `(user_id, kind, variant)` ile anahtarlanır; `variant`, aynı veri
+    türünün farklı sorgularını (örn: tarih aralıkları) ayırt eder. Her kayıt
+    onu üreten `id_token`'a bağlanır: farklı bir token ile yapılan okuma
+    önbellekten değil veritabanından yapılır. Böylece önbellek, güvenlik
+    kurallarını atlatmadan pratikte oturum kapsamlı çalışır. Yazma
+    fonksiyonları ilgili kayıtları günceller veya siler.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, str, Any], Tuple[float, str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_id: str, kind: str, id_token: str, variant: Any = None) -> Tuple[bool, Any]:
+        key = (user_id, kind, variant)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, token, value = entry
+                if token == id_token and time.monotonic() < expires_at:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return True, value
+                del self._entries[key]
+            self.misses += 1
+            return False, None
+
+    def put(self, user_id: str, kind: str, id_token: str, value: Any, variant: Any = None):
+        key = (user_id, kind, variant)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + CACHE_TTLS[kind], id_token, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def patch(self, user_id: str, kind: str, updater: Callable[[Any], Any]):
+        """Önbellekteki kaydı, TTL'ini değiştirmeden `updater`'ın döndürdüğü değerle değiştirir."""
+        key = (user_id, kind, None)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, token, value = entry
+                self._entries[key] = (expires_at, token, updater(value))
+
+    def invalidate(self, user_id: str, kind: Optional[str] = None):
+        """Kullanıcının belirtilen türdeki (verilmezse tüm) kayıtlarını, tüm sorgu varyantlarıyla siler."""
+        with self._lock:
+            stale = [key for key in self._entries
+                     if key[0] == user_id and (kind is None or key[1] == kind)]
+            for key in stale:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
 
-from core.firebase_config import initialize_firebase_app
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "entries": len(self._entries),
+            }
 
-def get_db_instance():
+
+_cache = _UserDataCache(CACHE_MAX_ENTRIES)
+
+
+def get_cache_stats() -> Dict[str, Any]:
+    """Önbellek isabet (hit) ve ıskalama (miss) sayaçlarını ve isabet oranını döndürür."""
+    return _cache.stats()
+
+
+def clear_cache():
+    """Önbellekteki tüm kayıtları ve sayaçları sıfırlar."""
+    _cache.clear()
+
+
+def _cache_get(user_id: str, kind: str, id_token: str, variant: Any = None) -> Tuple[bool, Any]:
     """
-    Yeni bir Firebase veritabanı bağlantı nesnesi döndürür.
+    Önbellekten okur; kullanıcının canlı aynası hazırsa önbelleği atlar.
 
-    Her işlem öncesi çağrılarak, işlemlerin birbirinden izole ve
-    temiz bir bağlantı üzerinden yapılması sağlanır.
+    Ayna her zaman en güncel veriyi tuttuğu için, TTL süresince eski
+    kalabilecek önbellek kopyası yerine aynadan okunması tercih edilir.
     """
-    firebase_app = initialize_firebase_app()
-    return firebase_app.database()
+    if live_mirror.is_live(user_id, id_token):
+        return False, None
+    return _cache.get(user_id, kind, id_token, variant)
+
+# --- SORGU YARDIMCILARI ---
+
+def _get_by_key_range(path: str, id_token: str, start: Optional[str] = None,
+                      end: Optional[str] = None, limit_last: Optional[int] = None):
+    """
+    Bir düğümün çocuklarını anahtara göre (`orderBy="$key"`) filtreleyerek çeker.
+
+    Tarih anahtarları (`YYYY-MM-DD`) sözlük sırasıyla kronolojik olduğu için
+    `start`/`end` ile tarih aralığı, `limit_last` ile en yeni N gün sunucu
+    tarafında seçilir; ağacın geri kalanı hiç indirilmez. Hiçbir filtre
+    verilmezse düğümün tamamı çekilir. Kullanıcının canlı aynası hazırsa
+    okuma aynadan yapılır.
+    """
+    found, value = live_mirror.read(path, id_token, start, end, limit_last)
+    if found:
+        return value
+    return get_db_instance().get_range(path, id_token, start, end, limit_last)
+
+# --- TOPLU YAZMA (BATCHED WRITES) ---
+
+class WriteBatch:
+    """
+    Bir kullanıcının verisine yapılacak yazmaları toplayıp tek seferde gönderir.
+
+    Toplanan tüm değişiklikler, `users/{uid}` düğümüne tek bir çok konumlu
+    (multi-location) `update` (PATCH) isteği olarak gönderilir. Firebase bu
+    isteği atomik olarak uygular: ya tüm yollar güncellenir ya da hiçbiri.
+    Doğrudan kullanılmak yerine `batch()` bağlam yöneticisi ile kullanılır.
+
+    Günlük ve hedef yazmaları, `stats/daily/{tarih}` altındaki aktivite
+    sayaçlarını da aynı istek içinde sunucu taraflı artırma
+    (`{".sv": {"increment": n}}`) ile günceller. Hedef yazmaları ayrıca
+    `goals_index` altındaki hedef indeksini günceller.
+    """
+
+    def __init__(self, user_id: str, id_token: str):
+        self.user_id = user_id
+        self.id_token = id_token
+        self.updates: Dict[str, Any] = {}
+        self._profile_fields: Dict[str, Any] = {}
+        self._increments: Dict[str, int] = {}
+        self._touched_kinds = set()
+        self._after_commit: List[Callable[[], None]] = []
+
+    def set(self, path: str, value: Any, kind: Optional[str] = None):
+        """
+        `users/{uid}` altındaki göreli bir yola değer yazar; `None` değeri yolu siler.
+
+        `kind` verilirse ("journals", "goals" vb.), commit sonrasında o türün
+        önbellek kayıtları geçersiz kılınır.
+        """
+        self.updates[path] = value
+        if kind:
+            self._touched_kinds.add(kind)
+
+    def increment(self, path: str, amount: int = 1):
+        """
+        `users/{uid}` altındaki sayısal bir değeri sunucu tarafında artırır.
+
+        Aynı yola yapılan artırmalar toplanır ve tek bir değer olarak gönderilir.
+        """
+        self._increments[path] = self._increments.get(path, 0) + amount
+        self._touched_kinds.add("stats")
+
+    def _count(self, date: str, counter: str, amount: int = 1):
+        self.increment(f"stats/daily/{date}/{counter}", amount)
+
+    def add_journal(self, date: str, text: str, timestamp: Optional[str] = None,
+                    source: Optional[str] = None) -> str:
+        """
+        Yeni bir günlük girdisi ekler ve istemci tarafında üretilen ID'sini döndürür.
+
+        `timestamp` ("SS:DD") verilmezse şu anki saat kullanılır. `source`
+        verilirse (örn: içe aktarılan girdiler için) girdiyle birlikte saklanır.
+        """
+        entry_id = get_db_instance().generate_key()
+        timestamp = timestamp or datetime.now().strftime("%H:%M")
+        entry = {"text": text, "timestamp": timestamp}
+        if source:
+            entry["source"] = source
+        self.set(f"journals/{date}/{entry_id}", entry, kind="journals")
+        self._count(date, "journals")
+        return entry_id
+
+    def add_goal(self, date: str, goal: str, goal_type: str) -> str:
+        """Yeni bir hedef ekler ve istemci tarafında üretilen ID'sini döndürür."""
+        goal_id = get_db_instance().generate_key()
+        # Tüm hedefler başlangıçta "pending" (beklemede) olarak kaydedilir.
+        self.set(f"goals/{date}/pending/{goal_id}",
+                 {"goal": goal, "type": goal_type, "is_checked": False}, kind="goals")
+        self.set(_goal_index_path(goal_type, "open", date, goal_id), {"goal": goal}, kind="goals")
+        self._count(date, "goals_created")
+        return goal_id
+
+    def set_goal_checked(self, goal_id: str, date_str: str, checked: bool,
+                         goal: Optional[Dict[str, Any]] = None):
+        """
+        Bir hedefin tamamlanma durumunu (`is_checked`) günceller.
+
+        Hedef, indekste açık (`open`) ve tamamlanmış (`done`) bölümleri
+        arasında taşınır; bunun için hedefin türü ve metni gerekir. Çağıran
+        taraf elindeki hedef sözlüğünü (`{"type": ..., "goal": ...}`) `goal`
+        olarak verirse ek bir okuma yapılmaz, verilmezse hedef okunur.
+
+        Hedef zaten istenen durumdaysa (örn: çift tıklama veya eski bir hedef
+        listesiyle tekrar çağrıldığında) hiçbir şey yazılmaz; böylece
+        tamamlanan hedef sayacı ve indeks sadece durum gerçekten değiştiğinde
+        güncellenir. Durum, verilen veya okunan hedef sözlüğündeki
+        `is_checked` alanından anlaşılır. Verilen sözlük (genellikle
+        önbellekteki kopya) sadece yazma başarıyla gönderildikten sonra
+        güncellenir; başarısız bir gönderimden sonraki tekrar deneme atlanmaz.
+        """
+        if goal is None:
+            goal = get_db_instance().get(
+                f"users/{self.user_id}/goals/{date_str}/pending/{goal_id}", self.id_token) or {}
+            if not goal:
+                return  # Hedef silinmiş.
+        if bool(goal.get("is_checked")) == checked:
+            return
+        self.set(f"goals/{date_str}/pending/{goal_id}/is_checked", checked, kind="goals")
+        self._count(date_str, "goals_completed", 1 if checked else -1)
+        goal_type = goal.get("type")
+        if goal_type:
+            status, previous = ("done", "open") if checked else ("open", "done")
+            self.set(_goal_index_path(goal_type, status, date_str, goal_id),
+                     {"goal": goal.get("goal", "")}, kind="goals")
+            self.set(_goal_index_path(goal_type, previous, date_str, goal_id), None, kind="goals")
+        self._after_commit.append(lambda: goal.__setitem__("is_checked", checked))
+
+    def delete_goal(self, goal_id: str, date_str: str):
+        """
+        Bir hedefi siler.
+
+        Sayaçların doğru güncellenmesi için hedef önce okunur: zaten silinmiş
+        bir hedef (örn: çift tıklama veya eski bir hedef listesi) için hiçbir
+        şey yazılmaz, tamamlanmış bir hedef silinirken tamamlanan hedef sayacı
+        da düşürülür.
+        """
+        goal = get_db_instance().get(
+            f"users/{self.user_id}/goals/{date_str}/pending/{goal_id}", self.id_token)
+        if not goal:
+            return
+        self.set(f"goals/{date_str}/pending/{goal_id}", None, kind="goals")
+        # Tür bilinmeden silinebilmesi için hedef, indeksin tüm bölümlerinden kaldırılır.
+        for goal_type in GOAL_TYPES:
+            for status in GOAL_STATUSES:
+                self.set(_goal_index_path(goal_type, status, date_str, goal_id), None, kind="goals")
+        self._count(date_str, "goals_created", -1)
+        if isinstance(goal, dict) and goal.get("is_checked") is True:
+            self._count(date_str, "goals_completed", -1)
+
+    def update_profile_field(self, field: str, value: Any):
+        """Kullanıcı profilindeki tek bir alanı günceller."""
+        self.updates[f"profile/{field}"] = value
+        self._profile_fields[field] = value
+
+    def commit(self):
+        """Toplanan değişiklikleri tek bir istekle gönderir ve önbelleği günceller."""
+        for path, amount in self._increments.items():
+            if amount:
+                self.updates[path] = {".sv": {"increment": amount}}
+        if not self.updates:
+            return
+        path = f"users/{self.user_id}"
+        # Uzun süren bir blokta token yenilenmiş olabilir; gönderimde güncel token kullanılır.
+        self.id_token = token_manager.current_token(self.user_id, self.id_token)
+        with live_mirror.local_write(path, self.updates):
+            get_db_instance().update(path, self.updates, self.id_token)
+        for kind in self._touched_kinds:
+            _cache.invalidate(self.user_id, kind)
+        if self._profile_fields:
+            fields = dict(self._profile_fields)
+            # Önbellekteki profil kopyasını yeniden çekmek yerine yerinde güncelle.
+            _cache.patch(self.user_id, "profile", lambda profile: {**profile, **fields})
+        for callback in self._after_commit:
+            callback()
+        self.updates = {}
+        self._profile_fields = {}
+        self._increments = {}
+        self._touched_kinds = set()
+        self._after_commit = []
+
+
+@contextmanager
+def batch(user_id: str, id_token: str) -> Iterator[WriteBatch]:
+    """
+    Blok içinde yapılan yazmaları toplayıp blok sonunda tek bir istekle gönderir.
+
+    Blok içinde bir hata oluşursa hiçbir değişiklik gönderilmez.
+
+    Kullanım:
+        with firebase_db.batch(user_id, id_token) as b:
+            b.update_profile_field("character_report", report)
+            b.update_profile_field("last_analysis_date", today_str)
+    """
+    write_batch = WriteBatch(user_id, id_token)
+    yield write_batch
+    write_batch.commit()
 
 # --- GÜNLÜK (JOURNAL) İŞLEMLERİ ---
 
+JOURNAL_PAGE_SIZE = 10  # Günlük geçmişinde bir sayfada gösterilecek gün sayısı.
+
 def save_journal(user_id: str, date: str, text: str, id_token: str) -> Optional[str]:
     """
     Belirtilen tarihe yeni bir günlük girdisi kaydeder ve kaydın ID'sini döndürür.
     """
-    db = get_db_instance()
-    path = f"users/{user_id}/journals/{date}"
-    now = datetime.now().strftime("%H:%M")
-    # `push` metodu, oluşturulan kaydın bilgilerini bir sözlük olarak döndürür.
-    result = db.child(path).push({"text": text, "timestamp": now}, id_token)
-    # Bu sözlüğün 'name' anahtarı, kaydın benzersiz ID'sini içerir.
-    return result.get('name') if isinstance(result, dict) else None
+    with batch(user_id, id_token) as b:
+        entry_id = b.add_journal(date, text)
+    return entry_id
 
 
-def get_journals(user_id: str, id_token: str) -> dict:
-    """Bir kullanıcının tüm günlük girdilerini tarihe göre gruplanmış olarak çeker."""
-    db = get_db_instance()
+def get_journals(user_id: str, id_token: str, start: Optional[str] = None,
+                 end: Optional[str] = None, limit_last: Optional[int] = None) -> dict:
+    """
+    Bir kullanıcının günlük girdilerini tarihe göre gruplanmış olarak çeker.
+
+    Args:
+        start (str, optional): Dahil edilecek ilk tarih (`YYYY-MM-DD`).
+        end (str, optional): Dahil edilecek son tarih (`YYYY-MM-DD`).
+        limit_last (int, optional): Sadece en yeni N günün girdilerini getirir.
+
+    Filtre verilmezse kullanıcının tüm günlükleri çekilir.
+    """
+    id_token = token_manager.current_token(user_id, id_token)
+    variant = (start, end, limit_last)
+    found, cached = _cache_get(user_id, "journals", id_token, variant)
+    if found:
+        return cached
     path = f"users/{user_id}/journals"
-    data = db.child(path).get(id_token).val()
-    if not data:
-        return {}
-    # Firebase'den gelebilecek bozuk veya beklenmedik formatlı verileri temizle.
+    data = _get_by_key_range(path, id_token, start, end, limit_last)
+    clean = _clean_journals(data)
+    _cache.put(user_id, "journals", id_token, clean, variant)
+    return clean
+
+
+def get_journal_page(user_id: str, id_token: str, before: Optional[str] = None,
+                     page_size: int = JOURNAL_PAGE_SIZE, start: Optional[str] = None,
+                     end: Optional[str] = None) -> Tuple[dict, Optional[str]]:
+    """
+    Günlükleri en yeniden eskiye doğru, sayfa sayfa (gün bazında) çeker.
+
+    İlk sayfa için `before` verilmez; sonraki sayfalar için bir önceki
+    çağrının döndürdüğü imleç (cursor) `before` olarak verilir. Sorgu
+    `limitToLast` ve `endAt` ile kurulduğu için, kullanıcının geçmişi ne
+    kadar büyük olursa olsun her çağrıda sadece bir sayfa indirilir.
+
+    Args:
+        before (str, optional): Önceki sayfanın imleci; bu tarih ve sonrası hariç tutulur.
+        page_size (int): Bir sayfada bulunacak en fazla gün sayısı.
+        start (str, optional): Sayfalamanın ineceği en eski tarih (`YYYY-MM-DD`).
+        end (str, optional): İlk sayfanın başlayacağı en yeni tarih (`YYYY-MM-DD`).
+
+    Returns:
+        tuple[dict, str | None]: (Tarihe göre gruplanmış günlükler, sonraki sayfanın
+        imleci veya daha eski kayıt yoksa None)
+    """
+    id_token = token_manager.current_token(user_id, id_token)
+    variant = ("page", before, page_size, start, end)
+    found, cached = _cache_get(user_id, "journals", id_token, variant)
+    if found:
+        return cached
+    path = f"users/{user_id}/journals"
+    # `endAt` kapsayıcı olduğu için imleç günü de gelir; onu atmak ve bir
+    # sonraki sayfanın var olup olmadığını anlamak için fazladan kayıt istenir.
+    extra = 2 if before is not None else 1
+    data = _get_by_key_range(path, id_token, start=start,
+                             end=before if before is not None else end,
+                             limit_last=page_size + extra)
+    clean = _clean_journals(data)
+    clean.pop(before, None)
+    days = sorted(clean)
+    has_more = len(days) > page_size
+    days = days[-page_size:]
+    page = {day: clean[day] for day in days}
+    next_cursor = days[0] if has_more and days else None
+    _cache.put(user_id, "journals", id_token, (page, next_cursor), variant)
+    return page, next_cursor
+
+
+def _clean_journals(data) -> dict:
+    """Firebase'den gelebilecek bozuk veya beklenmedik formatlı günlük verilerini temizler."""
     clean = {}
+    if not data:
+        return clean
     for day, entries in data.items():
         if isinstance(entries, dict):
             # Sadece sözlük (dict) formatındaki girdileri kabul et.
@@ -58,37 +451,298 @@ def get_journals(user_id: str, id_token: str) -> dict:
                 clean[day] = filtered
     return clean
 
+def list_journal_dates(user_id: str, id_token: str) -> List[str]:
+    """
+    Kullanıcının günlük yazdığı tüm tarihleri (`YYYY-MM-DD`) eskiden yeniye sıralı döndürür.
+
+    REST API'nin `shallow=true` modu kullanıldığı için sadece tarih anahtarları
+    indirilir; günlük metinleri hiç çekilmez. Yıl/ay filtreleri gibi sadece
+    tarihlere ihtiyaç duyan arayüzler için uygundur.
+    """
+    id_token = token_manager.current_token(user_id, id_token)
+    found, cached = _cache_get(user_id, "journals", id_token, "dates")
+    if found:
+        return cached
+    path = f"users/{user_id}/journals"
+    found, keys = live_mirror.read(path, id_token, shallow=True)
+    if not found:
+        keys = get_db_instance().shallow_keys(path, id_token)
+    dates = sorted(keys)
+    _cache.put(user_id, "journals", id_token, dates, "dates")
+    return dates
+
 # --- HEDEF (GOAL) İŞLEMLERİ ---
 
 def save_goal(user_id: str, date: str, goal: str, goal_type: str, id_token: str) -> Optional[str]:
     """
     Belirtilen tarihe yeni bir hedef kaydeder ve kaydın ID'sini döndürür.
     """
-    db = get_db_instance()
-    # Tüm hedefler başlangıçta "pending" (beklemede) olarak kaydedilir.
-    path = f"users/{user_id}/goals/{date}/pending"
-    result = db.child(path).push({"goal": goal, "type": goal_type, "is_checked": False}, id_token)
-    return result.get('name') if isinstance(result, dict) else None
+    with batch(user_id, id_token) as b:
+        goal_id = b.add_goal(date, goal, goal_type)
+    return goal_id
 
 
-def get_goals(user_id: str, id_token: str) -> dict:
-    """Bir kullanıcının tüm hedeflerini (bekleyen ve tamamlanan) çeker."""
-    db = get_db_instance()
+def get_goals(user_id: str, id_token: str, start: Optional[str] = None,
+              end: Optional[str] = None, limit_last: Optional[int] = None) -> dict:
+    """
+    Bir kullanıcının hedeflerini (bekleyen ve tamamlanan) tarihe göre gruplanmış olarak çeker.
+
+    `start`, `end` ve `limit_last` parametreleri `get_journals` ile aynı
+    şekilde çalışır. Filtre verilmezse kullanıcının tüm hedefleri çekilir.
+    """
+    id_token = token_manager.current_token(user_id, id_token)
+    variant = (start, end, limit_last)
+    found, cached = _cache_get(user_id, "goals", id_token, variant)
+    if found:
+        return cached
     path = f"users/{user_id}/goals"
-    data = db.child(path).get(id_token).val()
-    return data if data else {}
+    data = _get_by_key_range(path, id_token, start, end, limit_last)
+    data = dict(data) if data else {}
+    _cache.put(user_id, "goals", id_token, data, variant)
+    return data
 
-def update_goal_check(user_id: str, goal_id: str, date_str: str, checked: bool, id_token: str):
-    """Bir hedefin tamamlanma durumunu (`is_checked`) günceller."""
-    db = get_db_instance()
-    path = f"users/{user_id}/goals/{date_str}/pending/{goal_id}"
-    db.child(path).update({"is_checked": checked}, id_token)
+def update_goal_check(user_id: str, goal_id: str, date_str: str, checked: bool, id_token: str,
+                      goal: Optional[Dict[str, Any]] = None):
+    """
+    Bir hedefin tamamlanma durumunu (`is_checked`) günceller.
+
+    `goal`, hedefin türünü ve metnini içeren sözlüktür; verilirse indeksin
+    güncellenmesi için hedefin yeniden okunması gerekmez.
+    """
+    with batch(user_id, id_token) as b:
+        b.set_goal_checked(goal_id, date_str, checked, goal)
+
+def complete_goals(user_id: str, goals: Iterable[Tuple], id_token: str):
+    """
+    Birden fazla hedefi tek bir atomik istekle tamamlandı olarak işaretler.
+
+    Args:
+        goals: `(goal_id, date_str)` veya `(goal_id, date_str, goal)` demetlerinden
+            oluşan liste; `goal`, `update_goal_check`'teki gibi hedef sözlüğüdür.
+    """
+    with batch(user_id, id_token) as b:
+        for goal_id, date_str, *goal in goals:
+            b.set_goal_checked(goal_id, date_str, True, *goal)
 
 def delete_goal_by_id(user_id: str, goal_id: str, date_str: str, id_token: str):
     """Belirli bir hedefi ID'sine göre veritabanından siler."""
+    with batch(user_id, id_token) as b:
+        b.delete_goal(goal_id, date_str)
+
+# --- HEDEF İNDEKSİ (GOAL INDEX) ---
+# Hedefler eklendikleri günün altında (`goals/{tarih}/pending/{id}`) saklanır;
+# tamamlananlar da `is_checked` ile aynı yerde kalır. Açık uzun vadeli
+# hedefleri bulmak için tüm günleri taramamak adına, hedef yazmaları ayrıca
+# `goals_index/{tür}/{durum}/{tarih}/{id} -> {"goal": metin}` indeksini
+# günceller. Durum `open` veya `done` olur. Tarih anahtarı sayesinde bir
+# günün açık hedefleri de tek bir küçük düğüm okumasıyla çekilir.
+
+GOAL_TYPES = ("daily", "longterm")
+GOAL_STATUSES = ("open", "done")
+
+# İndeksin kullanıcının tüm hedeflerinden oluşturulduğunu gösteren işaret
+# (`goals_index/built`). İşaret yoksa indeks sadece indeksin tutulmaya
+# başlanmasından sonra eklenen hedefleri içeriyor olabilir; boş bir indeks
+# "hedef yok" anlamına gelmez.
+GOAL_INDEX_MARKER = "built"
+
+# Bu işlemde indeksinin hazır olduğu doğrulanmış kullanıcılar.
+_indexed_users = set()
+_indexed_users_lock = threading.Lock()
+
+def _goal_index_path(goal_type: str, status: str, date_str: str, goal_id: str) -> str:
+    return f"goals_index/{goal_type}/{status}/{date_str}/{goal_id}"
+
+def _ensure_goal_index(user_id: str, id_token: str):
+    """
+    Kullanıcının hedef indeksi hiç oluşturulmamışsa mevcut hedeflerden oluşturur.
+
+    `manage.py build-goal-index` çalıştırılmamış kullanıcıların eski hedefleri
+    indekste bulunmaz; bu kullanıcılar için indeks ilk okumada bir kez
+    oluşturulur. Yazma, mevcut indeks kayıtlarını silmeyen çok konumlu bir
+    güncellemedir; böylece bu sırada sayfadan eklenen hedefler kaybolmaz.
+    """
+    with _indexed_users_lock:
+        if user_id in _indexed_users:
+            return
+    db = get_db_instance()
+    if not db.get(f"users/{user_id}/goals_index/{GOAL_INDEX_MARKER}", id_token):
+        goals = db.get(f"users/{user_id}/goals", id_token) or {}
+        with batch(user_id, id_token) as b:
+            for goal_type, by_status in compute_goal_index(goals).items():
+                for status, by_date in by_status.items():
+                    for date_str, entries in by_date.items():
+                        for goal_id, entry in entries.items():
+                            b.set(_goal_index_path(goal_type, status, date_str, goal_id), entry, kind="goals")
+            b.set(f"goals_index/{GOAL_INDEX_MARKER}", True, kind="goals")
+    with _indexed_users_lock:
+        _indexed_users.add(user_id)
+
+def get_open_goals(user_id: str, id_token: str, goal_type: str,
+                   date: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Belirli türdeki tamamlanmamış hedefleri indeksten tek bir okumayla çeker.
+
+    Kullanıcının indeksi henüz oluşturulmamışsa önce oluşturulur (bkz.
+    `_ensure_goal_index`).
+
+    Args:
+        goal_type (str): "daily" veya "longterm".
+        date (str, optional): Verilirse sadece o güne (`YYYY-MM-DD`) ait hedefler getirilir.
+
+    Returns:
+        list: Eskiden yeniye sıralı `{"id", "date", "type", "goal", "is_checked"}` sözlükleri.
+    """
+    id_token = token_manager.current_token(user_id, id_token)
+    variant = ("open", goal_type, date)
+    found, cached = _cache_get(user_id, "goals", id_token, variant)
+    if found:
+        return cached
+    _ensure_goal_index(user_id, id_token)
+    path = f"users/{user_id}/goals_index/{goal_type}/open"
+    data = _get_by_key_range(path, id_token, start=date, end=date) or {}
+    goals = []
+    for day in sorted(data):
+        if not isinstance(data[day], dict):
+            continue
+        for goal_id, entry in data[day].items():
+            if isinstance(entry, dict):
+                goals.append({"id": goal_id, "date": day, "type": goal_type,
+                              "goal": entry.get("goal", ""), "is_checked": False})
+    _cache.put(user_id, "goals", id_token, goals, variant)
+    return goals
+
+def compute_goal_index(goals: dict) -> Dict[str, Any]:
+    """Tam hedef ağacından `goals_index` düğümünün içeriğini hesaplar."""
+    index: Dict[str, Any] = {}
+    for day, day_goals in (goals or {}).items():
+        pending = day_goals.get("pending") if isinstance(day_goals, dict) else None
+        if not isinstance(pending, dict):
+            continue
+        for goal_id, details in pending.items():
+            if not isinstance(details, dict) or details.get("type") not in GOAL_TYPES:
+                continue
+            status = "done" if details.get("is_checked") is True else "open"
+            (index.setdefault(details["type"], {})
+                  .setdefault(status, {})
+                  .setdefault(day, {}))[goal_id] = {"goal": details.get("goal", "")}
+    return index
+
+def build_goal_index(user_id: str, id_token: Optional[str]) -> Dict[str, Any]:
+    """
+    Bir kullanıcının hedef indeksini mevcut hedeflerinden yeniden oluşturur.
+
+    İndeksin tutulmaya başlanmasından önce eklenmiş hedefler için bir kez
+    çalıştırılır; kullanıcı etkin değilken çalıştırılmalıdır.
+    """
+    db = get_db_instance()
+    goals = db.get(f"users/{user_id}/goals", id_token)
+    index = compute_goal_index(goals or {})
+    db.set(f"users/{user_id}/goals_index", {**index, GOAL_INDEX_MARKER: True}, id_token)
+    _cache.invalidate(user_id, "goals")
+    with _indexed_users_lock:
+        _indexed_users.add(user_id)
+    return index
+
+# --- AKTİVİTE SAYAÇLARI (DAILY STATS) ---
+# `users/{uid}/stats/daily/{tarih}` düğümleri, o güne ait günlük sayısını
+# (`journals`), eklenen hedef sayısını (`goals_created`) ve tamamlanan hedef
+# sayısını (`goals_completed`) tutar. Hedefler, kaydedildikleri tarihin
+# sayaçlarına işlenir. Sayaçlar yazma fonksiyonları tarafından güncellenir;
+# böylece özet ekranları günlük ve hedef ağaçlarını taramak yerine birkaç
+# küçük düğüm okur.
+
+STATS_COUNTERS = ("journals", "goals_created", "goals_completed")
+
+def get_daily_stats(user_id: str, id_token: str, start: Optional[str] = None,
+                    end: Optional[str] = None) -> Dict[str, Dict[str, int]]:
+    """
+    Kullanıcının günlük aktivite sayaçlarını tarihe göre döndürür.
+
+    Returns:
+        dict: `{tarih: {"journals": n, "goals_created": n, "goals_completed": n}}`;
+        sayacı olmayan günler sonuçta yer almaz, eksik sayaçlar 0 kabul edilir.
+    """
+    id_token = token_manager.current_token(user_id, id_token)
+    variant = (start, end)
+    found, cached = _cache_get(user_id, "stats", id_token, variant)
+    if found:
+        return cached
+    path = f"users/{user_id}/stats/daily"
+    data = _get_by_key_range(path, id_token, start, end)
+    stats = {}
+    if data:
+        for day, counters in data.items():
+            if isinstance(counters, dict):
+                stats[day] = {name: int(counters.get(name) or 0) for name in STATS_COUNTERS}
+    _cache.put(user_id, "stats", id_token, stats, variant)
+    return stats
+
+def compute_daily_stats(journals: dict, goals: dict) -> Dict[str, Dict[str, int]]:
+    """Tam günlük ve hedef ağaçlarından günlük aktivite sayaçlarını hesaplar."""
+    stats: Dict[str, Dict[str, int]] = {}
+
+    def counters(day: str) -> Dict[str, int]:
+        return stats.setdefault(day, {name: 0 for name in STATS_COUNTERS})
+
+    for day, entries in _clean_journals(journals).items():
+        counters(day)["journals"] += len(entries)
+    for day, day_goals in (goals or {}).items():
+        pending = day_goals.get("pending") if isinstance(day_goals, dict) else None
+        if not isinstance(pending, dict):
+            continue
+        for goal_details in pending.values():
+            if isinstance(goal_details, dict):
+                counters(day)["goals_created"] += 1
+                if goal_details.get("is_checked") is True:
+                    counters(day)["goals_completed"] += 1
+    return stats
+
+def backfill_daily_stats(user_id: str, id_token: Optional[str]) -> Dict[str, Dict[str, int]]:
+    """
+    Bir kullanıcının aktivite sayaçlarını mevcut günlük ve hedeflerinden
+    yeniden hesaplayıp `stats/daily` düğümüne yazar.
+
+    Sayaçların tutulmaya başlanmasından önce oluşturulmuş veriler için bir
+    kez çalıştırılır. Hesaplama sırasında yapılan yazmaların üzerine
+    yazılmaması için kullanıcı etkin değilken çalıştırılmalıdır.
+    """
     db = get_db_instance()
-    path = f"users/{user_id}/goals/{date_str}/pending/{goal_id}"
-    db.child(path).remove(id_token)
+    journals = db.get(f"users/{user_id}/journals", id_token)
+    goals = db.get(f"users/{user_id}/goals", id_token)
+    stats = compute_daily_stats(journals or {}, goals or {})
+    db.set(f"users/{user_id}/stats/daily", stats or None, id_token)
+    _cache.invalidate(user_id, "stats")
+    return stats
+
+STREAM_CHUNK_DAYS = 50  # `iter_user_days`'in tek bir istekte okuduğu en fazla gün sayısı.
+
+def iter_user_days(user_id: str, node: str, id_token: Optional[str], after: Optional[str] = None,
+                   chunk_days: int = STREAM_CHUNK_DAYS) -> Iterator[Tuple[str, dict]]:
+    """
+    `users/{uid}/{node}` altındaki günleri (`journals`, `goals`) eskiden yeniye döndürür.
+
+    Önce sadece tarih anahtarları (`shallow=true`) çekilir, ardından günler
+    `chunk_days`'lik tarih aralıkları hâlinde okunur; böylece kullanıcının
+    tüm geçmişi tek seferde belleğe alınmaz. `after` verilirse bu tarih ve
+    öncesi atlanır. Bakım komutları içindir; önbellek ve canlı ayna kullanılmaz.
+
+    Yields:
+        tuple[str, dict]: (Tarih, o günün verisi)
+    """
+    db = get_db_instance()
+    path = f"users/{user_id}/{node}"
+    days = sorted(day for day in db.shallow_keys(path, id_token) if after is None or day > after)
+    for i in range(0, len(days), chunk_days):
+        chunk = days[i:i + chunk_days]
+        data = db.get_range(path, id_token, start=chunk[0], end=chunk[-1]) or {}
+        for day in chunk:
+            if isinstance(data.get(day), dict):
+                yield day, data[day]
+
+def list_user_ids(id_token: Optional[str]) -> List[str]:
+    """Veritabanındaki tüm kullanıcı ID'lerini döndürür; yönetici yetkisi gerektirir."""
+    return get_db_instance().shallow_keys("users", id_token)
 
 # --- KULLANICI PROFİLİ (USER PROFILE) İŞLEMLERİ ---
 
@@ -97,32 +751,147 @@ def save_user_details_from_dict(user_id: str, user_data: dict, id_token: str):
     Kullanıcı profili bilgilerini bir sözlükten toplu olarak kaydeder/günceller.
     Genellikle kayıt sırasında veya profil ayarlarında kullanılır.
     """
-    db = get_db_instance()
+    id_token = token_manager.current_token(user_id, id_token)
     path = f"users/{user_id}/profile"
     if "created_at" not in user_data:
         user_data["created_at"] = datetime.now().isoformat()
     # `set` metodu, belirtilen yoldaki tüm veriyi silip yenisini yazar.
-    db.child(path).set(user_data, id_token)
+    with live_mirror.local_write(path, {"": user_data}):
+        get_db_instance().set(path, user_data, id_token)
+    _cache.put(user_id, "profile", id_token, dict(user_data))
 
 def get_user_details(user_id: str, id_token: str) -> dict:
     """Bir kullanıcının profil detaylarını (isim, e-posta vb.) çeker."""
-    db = get_db_instance()
+    id_token = token_manager.current_token(user_id, id_token)
+    found, cached = _cache_get(user_id, "profile", id_token)
+    if found:
+        return cached
     path = f"users/{user_id}/profile"
-    data = db.child(path).get(id_token).val()
-    return data if data else {}
+    data = _get_by_key_range(path, id_token)
+    data = dict(data) if data else {}
+    _cache.put(user_id, "profile", id_token, data)
+    return data
 
 def update_user_profile_field(user_id: str, field: str, value, id_token: str):
     """Kullanıcı profilindeki tek bir alanı (örn: 'name' veya 'timezone') günceller."""
-    db = get_db_instance()
-    path = f"users/{user_id}/profile"
-    # `update` metodu, belirtilen yoldaki sadece ilgili alanı değiştirir, diğerlerine dokunmaz.
-    db.child(path).update({field: value}, id_token)
+    # Güncelleme sadece ilgili alanı değiştirir, profildeki diğer alanlara dokunmaz.
+    with batch(user_id, id_token) as b:
+        b.update_profile_field(field, value)
+
+PURGE_CHUNK_SIZE = 200  # Hesap silinirken tek bir istekte silinecek en fazla gün sayısı.
+# Zamanla büyüyen, gün bazlı düğümler; hesap silinirken parça parça silinir.
+PURGE_CHUNKED_NODES = ("journals", "goals")
 
-def delete_all_user_data(user_id: str, id_token: str):
+def delete_all_user_data(user_id: str, id_token: str,
+                         on_progress: Optional[Callable[[int, int], None]] = None):
     """
     Bir kullanıcıya ait TÜM verileri (profil, günlükler, hedefler) veritabanından siler.
     Bu işlem geri alınamaz ve genellikle hesap silme işlemiyle birlikte çağrılır.
+
+    Çok büyük bir alt ağacı tek istekte silmek zaman aşımına uğrayabileceği
+    için günlükler ve hedefler önce `PURGE_CHUNK_SIZE` günlük parçalar hâlinde,
+    sonra kalan düğüm tek istekle silinir. Yarıda kalan bir silme tekrar
+    çağrılarak kaldığı yerden sürdürülebilir; silinmiş parçalar zaten yoktur.
+
+    Args:
+        on_progress (callable, optional): Her parçadan sonra `(silinen, toplam)`
+            gün sayısıyla çağrılır.
     """
+    id_token = token_manager.current_token(user_id, id_token)
     db = get_db_instance()
     path = f"users/{user_id}"
-    db.child(path).remove(id_token)
+    days = [f"{node}/{day}" for node in PURGE_CHUNKED_NODES
+            for day in db.shallow_keys(f"{path}/{node}", id_token)]
+    for i in range(0, len(days), PURGE_CHUNK_SIZE):
+        chunk = {day: None for day in days[i:i + PURGE_CHUNK_SIZE]}
+        with live_mirror.local_write(path, chunk):
+            db.update(path, chunk, id_token)
+        if on_progress:
+            on_progress(min(i + PURGE_CHUNK_SIZE, len(days)), len(days))
+    with live_mirror.local_write(path, {"": None}):
+        db.remove(path, id_token)
+    _cache.invalidate(user_id)
+    with _indexed_users_lock:
+        _indexed_users.discard(user_id)
+    if on_progress:
+        on_progress(len(days), len(days))
+
+# --- TOPLU OKUMA (USER BUNDLE) ---
+
+BUNDLE_MAX_WORKERS = 4  # Aynı anda yapılacak en fazla okuma sayısı.
+BUNDLE_PARTS = ("profile", "journals", "goals", "latest_journal", "daily_stats", "open_goals")
+
+_bundle_executor: Optional[ThreadPoolExecutor] = None
+_bundle_executor_lock = threading.Lock()
+
+
+@dataclass
+class UserBundle:
+    """`fetch_user_bundle` tarafından döndürülen, bir kullanıcının sayfa verileri."""
+    profile: Dict[str, Any] = dataclass_field(default_factory=dict)
+    journals: Dict[str, Any] = dataclass_field(default_factory=dict)
+    goals: Dict[str, Any] = dataclass_field(default_factory=dict)
+    latest_journal: Dict[str, Any] = dataclass_field(default_factory=dict)
+    daily_stats: Dict[str, Any] = dataclass_field(default_factory=dict)
+    open_goals: List[Dict[str, Any]] = dataclass_field(default_factory=list)
+
+
+def _get_bundle_executor() -> ThreadPoolExecutor:
+    global _bundle_executor
+    if _bundle_executor is None:
+        with _bundle_executor_lock:
+            if _bundle_executor is None:
+                _bundle_executor = ThreadPoolExecutor(
+                    max_workers=BUNDLE_MAX_WORKERS, thread_name_prefix="firebase-bundle"
+                )
+    return _bundle_executor
+
+
+def fetch_user_bundle(user_id: str, id_token: str,
+                      parts: Iterable[str] = ("profile", "journals", "goals"),
+                      journal_range: Optional[Dict[str, Any]] = None,
+                      goal_range: Optional[Dict[str, Any]] = None,
+                      stats_range: Optional[Dict[str, Any]] = None,
+                      open_goals_filter: Optional[Dict[str, Any]] = None) -> UserBundle:
+    """
+    Bir kullanıcının birbirinden bağımsız verilerini paralel olarak çeker.
+
+    İstenen her parça sınırlı bir thread havuzunda aynı anda okunur; böylece
+    sayfa yükleme süresi okumaların toplamı yerine en yavaş okumanın süresi
+    kadar olur. Okumalar normal getter'lar üzerinden yapıldığı için önbellek
+    de kullanılır.
+
+    Args:
+        parts: Çekilecek parçalar; `BUNDLE_PARTS` içindeki isimlerden oluşur.
+            `latest_journal`, sadece en son günlük yazılan günü getirir.
+        journal_range (dict, optional): `get_journals`'a iletilecek
+            `start`/`end`/`limit_last` filtreleri.
+        goal_range (dict, optional): `get_goals`'a iletilecek filtreler.
+        stats_range (dict, optional): `get_daily_stats`'a iletilecek `start`/`end` filtreleri.
+        open_goals_filter (dict, optional): `get_open_goals`'a iletilecek
+            `goal_type` ve `date`; `open_goals` parçası için gereklidir.
+
+    Returns:
+        UserBundle: İstenmeyen parçalar boş kalır.
+
+    Raises:
+        ValueError: Bilinmeyen bir parça istenirse.
+    """
+    id_token = token_manager.current_token(user_id, id_token)
+    fetchers = {
+        "profile": lambda: get_user_details(user_id, id_token),
+        "journals": lambda: get_journals(user_id, id_token, **(journal_range or {})),
+        "goals": lambda: get_goals(user_id, id_token, **(goal_range or {})),
+        "latest_journal": lambda: get_journals(user_id, id_token, limit_last=1),
+        "daily_stats": lambda: get_daily_stats(user_id, id_token, **(stats_range or {})),
+        "open_goals": lambda: get_open_goals(user_id, id_token, **(open_goals_filter or {})),
+    }
+    parts = list(dict.fromkeys(parts))
+    unknown = [part for part in parts if part not in BUNDLE_PARTS]
+    if unknown:
+        raise ValueError(f"Bilinmeyen veri parçası: {', '.join(unknown)}")
+
+    executor = _get_bundle_executor()
+    futures = {part: executor.submit(fetchers[part]) for part in parts}
+    # `result()` okumalardan birinde oluşan hatayı çağırana iletir.
+    return UserBundle(**{part: future.result() for part, future in futures.items()})
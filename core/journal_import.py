@@ -0,0 +1,307 @@
+# -*- coding: utf-8 -*-
+"""
+Günlük Arşivi İçe Aktarma (Journal Import) Modülü.
+
+Başka bir uygulamadan gelen kullanıcılar yıllarca tutulmuş günlüklerini
+Markdown dosyaları veya JSON dışa aktarımları olarak getirir. Bu girdileri
+Günlüğüm formuyla tek tek kaydetmek, her biri için ayrı bir Firebase yazması
+ve ayrı bir embedding isteği demektir. Bu modül arşivi toplu olarak aktarır:
+
+- **Akışlı Ayrıştırma:** Dosyalar satır satır (Markdown) veya nesne nesne
+  (JSON) okunur ve girdiler bir üreteç (generator) ile tek tek döndürülür;
+  arşivin boyutu ne olursa olsun bellekte sadece bir parça girdi tutulur.
+- **Toplu Yazma:** Girdiler `IMPORT_CHUNK_SIZE`'lık parçalar hâlinde
+  `firebase_db.batch` ile tek bir çok konumlu güncellemeyle yazılır; günlük
+  aktivite sayaçları da aynı istekte güncellenir.
+- **Toplu Embedding:** Her parçanın embedding'i tek bir Gemini isteğiyle,
+  `memory_reindex` ile aynı hız sınırına uyarak alınır ve vektörler toplu
+  olarak yüklenir. Vektör ID'leri, Günlüğüm sayfasında olduğu gibi girdilerin
+  Firebase ID'leridir.
+- **Ayırt Edilebilir:** Aktarılan girdiler hem Firebase'de hem de hafızada
+  `source = IMPORT_SOURCE` ile işaretlenir; gerekirse ayrıca bulunup
+  silinebilirler.
+
+Bir parçanın embedding'i alınamazsa o parça Firebase'e de yazılmaz. İlerleme
+raporundaki `position`, Firebase'e yazılmış (veya atlanmış) girdi sayısıdır;
+yarıda kalan bir aktarım `skip=position` ile kaldığı yerden sürdürülebilir.
+Firebase'e yazılıp hafızaya yüklenemeyen girdiler `manage.py reindex-memory`
+ile tamamlanabilir.
+
+Desteklenen biçimler:
+    - Markdown (`.md`, `.markdown`, `.txt`): Tarih dosya adından
+      (`2024-01-05.md`) veya ön bilgideki (front matter) `date:` satırından
+      alınır. Dosya içindeki tarihli başlıklar (`## 2024-01-05`) yeni bir
+      girdi başlatır.
+    - JSON (`.json`): Girdi nesnelerinden oluşan bir dizi veya Day One
+      biçiminde `{"entries": [...]}`.
+    - JSON Lines (`.jsonl`): Her satırda bir girdi nesnesi.
+    - Bu dosyaları içeren bir klasör veya `.zip` arşivi.
+
+JSON girdilerinde metin `text`, `content`, `body` veya `entry`; tarih ise
+`date`, `creationDate`, `created_at` veya `created` alanından okunur.
+"""
+import datetime
+import io
+import json
+import os
+import re
+import time
+import zipfile
+from typing import IO, Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+from core import firebase_db, memory, memory_reindex
+
+IMPORT_SOURCE = "İçe Aktarma"  # Aktarılan girdilerin `source` alanı.
+IMPORT_CHUNK_SIZE = memory.EMBED_BATCH_SIZE  # Tek bir Firebase güncellemesi ve embedding isteğindeki girdi sayısı.
+READ_SIZE = 64 * 1024  # JSON dosyalarından bir seferde okunan karakter sayısı.
+MARKDOWN_EXTENSIONS = (".md", ".markdown", ".txt")
+JSON_EXTENSIONS = (".json", ".jsonl")
+UPLOAD_TYPES = ["md", "markdown", "txt", "json", "jsonl", "zip"]  # Ayarlar sayfasındaki yükleme alanı için.
+TEXT_FIELDS = ("text", "content", "body", "entry")
+DATE_FIELDS = ("date", "creationDate", "created_at", "created")
+
+_DATE_RE = re.compile(r"(\d{4}-\d{2}-\d{2})")
+_HEADING_DATE_RE = re.compile(r"^#{1,6}\s+(\d{4}-\d{2}-\d{2})\b")
+_TIME_RE = re.compile(r"^\d{4}-\d{2}-\d{2}[T ](\d{2}:\d{2})")
+_ENTRIES_KEY_RE = re.compile(r'"entries"\s*:\s*\[')
+
+
+def _parse_date(value: Any) -> Optional[str]:
+    """Metnin başındaki ISO tarihini ("YYYY-AA-GG") döndürür; geçerli değilse None."""
+    if not isinstance(value, str):
+        return None
+    try:
+        return datetime.date.fromisoformat(value[:10]).isoformat()
+    except ValueError:
+        return None
+
+
+def _date_from_name(name: str) -> Optional[str]:
+    match = _DATE_RE.search(os.path.basename(name))
+    return _parse_date(match.group(1)) if match else None
+
+
+# --- AYRIŞTIRICILAR (PARSERS) ---
+# Her ayrıştırıcı `{"date", "text", "timestamp"}` sözlükleri üretir. Tarihi
+# belirlenemeyen girdilerin `date` alanı None'dır; bunlar aktarılmaz ama
+# raporda sayılır.
+
+def iter_markdown(lines: Iterable[str], default_date: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """Bir Markdown dosyasının satırlarından günlük girdileri üretir."""
+    lines = iter(lines)
+    current_date = default_date
+    buffer: List[str] = []
+
+    first = next(lines, None)
+    if first is not None and first.strip() == "---":
+        # Ön bilgiden sadece `date:` satırı kullanılır.
+        for line in lines:
+            if line.strip() == "---":
+                break
+            key, _, value = line.partition(":")
+            if key.strip().lower() == "date":
+                current_date = _parse_date(value.strip().strip("\"'")) or current_date
+    elif first is not None:
+        buffer.append(first)
+
+    for line in lines:
+        match = _HEADING_DATE_RE.match(line)
+        if match and _parse_date(match.group(1)):
+            text = "".join(buffer).strip()
+            if text:
+                yield {"date": current_date, "text": text, "timestamp": None}
+            current_date, buffer = match.group(1), []
+            continue
+        buffer.append(line)
+    text = "".join(buffer).strip()
+    if text:
+        yield {"date": current_date, "text": text, "timestamp": None}
+
+
+def _normalize_json_entry(value: Any) -> Optional[Dict[str, Any]]:
+    if not isinstance(value, dict):
+        return None
+    text = next((value[field] for field in TEXT_FIELDS if isinstance(value.get(field), str)), "").strip()
+    if not text:
+        return None
+    raw_date = next((value[field] for field in DATE_FIELDS if value.get(field)), None)
+    time_match = _TIME_RE.match(raw_date) if isinstance(raw_date, str) else None
+    return {"date": _parse_date(raw_date), "text": text,
+            "timestamp": time_match.group(1) if time_match else None}
+
+
+def _iter_json_array(stream: IO[str], buffer: str) -> Iterator[Any]:
+    """
+    Bir JSON dizisinin elemanlarını tek tek çözer.
+
+    `buffer`, dizinin açılış köşeli parantezinden sonra okunmuş kısımdır.
+    Bellekte en fazla `READ_SIZE` karakter ve bir eleman tutulur.
+    """
+    decoder = json.JSONDecoder()
+    pos = 0
+    while True:
+        while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+            pos += 1
+        if pos < len(buffer) and buffer[pos] == "]":
+            return
+        try:
+            value, pos = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            # Eleman henüz tamamen okunmadı; çözülmüş kısmı atıp yeni veri ekle.
+            chunk = stream.read(READ_SIZE)
+            if not chunk:
+                raise ValueError("JSON dosyası eksik veya hatalı.")
+            buffer, pos = buffer[pos:] + chunk, 0
+            continue
+        yield value
+
+
+def iter_json(stream: IO[str]) -> Iterator[Dict[str, Any]]:
+    """Bir JSON dizisinden veya Day One dışa aktarımından günlük girdileri üretir."""
+    buffer = stream.read(READ_SIZE).lstrip()
+    if buffer.startswith("["):
+        values = _iter_json_array(stream, buffer[1:])
+    else:
+        # `{"metadata": ..., "entries": [...]}`: dizinin başına kadar ilerle.
+        match = _ENTRIES_KEY_RE.search(buffer)
+        while not match:
+            chunk = stream.read(READ_SIZE)
+            if not chunk:
+                raise ValueError("JSON dosyasında girdi dizisi ('entries') bulunamadı.")
+            # Anahtar iki okumanın sınırına denk gelebilir; önceki okumanın sonu korunur.
+            buffer = buffer[-64:] + chunk
+            match = _ENTRIES_KEY_RE.search(buffer)
+        values = _iter_json_array(stream, buffer[match.end():])
+    for value in values:
+        entry = _normalize_json_entry(value)
+        if entry:
+            yield entry
+
+
+def iter_json_lines(lines: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    """Her satırında bir girdi nesnesi bulunan bir dosyadan günlük girdileri üretir."""
+    for line in lines:
+        if line.strip():
+            entry = _normalize_json_entry(json.loads(line))
+            if entry:
+                yield entry
+
+
+# --- KAYNAKLAR (SOURCES) ---
+
+def _iter_file(name: str, open_binary: Callable[[], IO[bytes]]) -> Iterator[Dict[str, Any]]:
+    """Dosyayı uzantısına göre ayrıştırır; desteklenmeyen dosyalar atlanır."""
+    extension = os.path.splitext(name)[1].lower()
+    if extension not in MARKDOWN_EXTENSIONS + JSON_EXTENSIONS:
+        return
+    with io.TextIOWrapper(open_binary(), encoding="utf-8-sig", errors="replace") as stream:
+        if extension in MARKDOWN_EXTENSIONS:
+            yield from iter_markdown(stream, _date_from_name(name))
+        elif extension == ".jsonl":
+            yield from iter_json_lines(stream)
+        else:
+            yield from iter_json(stream)
+
+
+def _is_hidden(name: str) -> bool:
+    return any(part.startswith((".", "__MACOSX")) for part in name.replace("\\", "/").split("/"))
+
+
+def _iter_zip(archive: zipfile.ZipFile) -> Iterator[Dict[str, Any]]:
+    for info in sorted(archive.infolist(), key=lambda info: info.filename):
+        if not info.is_dir() and not _is_hidden(info.filename):
+            yield from _iter_file(info.filename, lambda: archive.open(info))
+
+
+def iter_archive(path: str) -> Iterator[Dict[str, Any]]:
+    """Bir klasördeki, `.zip` arşivindeki veya tek bir dosyadaki günlük girdileri sırayla üretir."""
+    if os.path.isdir(path):
+        for root, dirs, files in os.walk(path):
+            dirs[:] = sorted(d for d in dirs if not _is_hidden(d))
+            for name in sorted(files):
+                if not _is_hidden(name):
+                    full_path = os.path.join(root, name)
+                    yield from _iter_file(full_path, lambda: open(full_path, "rb"))
+    elif zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as archive:
+            yield from _iter_zip(archive)
+    else:
+        yield from _iter_file(path, lambda: open(path, "rb"))
+
+
+def iter_upload(name: str, file: IO[bytes]) -> Iterator[Dict[str, Any]]:
+    """Ayarlar sayfasından yüklenen bir dosyadaki günlük girdileri sırayla üretir."""
+    if name.lower().endswith(".zip"):
+        with zipfile.ZipFile(file) as archive:
+            yield from _iter_zip(archive)
+    else:
+        yield from _iter_file(name, lambda: file)
+
+
+# --- İÇE AKTARMA (IMPORT) ---
+
+def _write_chunk(user_id: str, id_token: str, entries: List[Dict[str, Any]],
+                 limiter: memory_reindex.RateLimiter) -> List[Dict[str, Any]]:
+    """Parçayı Firebase'e yazar ve hafızaya yüklenecek vektörleri döndürür."""
+    with firebase_db.batch(user_id, id_token) as b:
+        items = [
+            {"text": entry["text"],
+             "vector_id": b.add_journal(entry["date"], entry["text"], entry["timestamp"], source=IMPORT_SOURCE),
+             # Metaveri, Günlüğüm sayfasının kaydettiğiyle aynıdır; sadece kaynak farklıdır.
+             "metadata": {"type": "journal_entry", "date": entry["date"], "source": IMPORT_SOURCE}}
+            for entry in entries
+        ]
+        # Embedding alınamazsa blok hatayla çıkar ve parça Firebase'e yazılmaz.
+        vectors = memory_reindex.embed_with_limit(limiter, user_id, memory.prepare_items(items))
+    return vectors
+
+
+def import_entries(user_id: str, id_token: Optional[str], entries: Iterable[Dict[str, Any]], skip: int = 0,
+                   requests_per_minute: Optional[float] = None,
+                   on_progress: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+    """
+    Ayrıştırılmış günlük girdilerini parçalar hâlinde Firebase'e ve hafızaya yazar.
+
+    Args:
+        entries: `iter_archive` veya `iter_upload` tarafından üretilen girdiler.
+        skip: Atlanacak ilk girdi sayısı (yarıda kalan bir aktarımın `position` değeri).
+        requests_per_minute: Verilmezse `[memory_reindex]` ayarındaki değer kullanılır.
+        on_progress: Her parçadan sonra raporun bir kopyasıyla çağrılır.
+
+    Returns:
+        dict: `position` (Firebase'e yazılmış girdi sayısı, atlananlar dahil),
+        `imported` (aktarılan girdiler), `undated` (tarihi belirlenemediği
+        için aktarılmayanlar), `elapsed` (saniye) ve `entries_per_second`.
+    """
+    limiter = memory_reindex.RateLimiter(
+        float(requests_per_minute or memory_reindex.get_settings()["requests_per_minute"]))
+    report = {"position": 0, "imported": 0, "undated": 0, "elapsed": 0.0, "entries_per_second": 0.0}
+    started = time.monotonic()
+    chunk: List[Dict[str, Any]] = []
+    read = 0
+
+    def flush():
+        vectors = _write_chunk(user_id, id_token, chunk, limiter) if chunk else []
+        report["imported"] += len(chunk)
+        chunk.clear()
+        # Parça Firebase'e yazıldıktan sonra ilerleme bildirilir; hafızaya
+        # yükleme başarısız olsa bile aktarım bu noktadan sürdürülmelidir.
+        report["position"] = read
+        report["elapsed"] = time.monotonic() - started
+        report["entries_per_second"] = report["imported"] / report["elapsed"] if report["elapsed"] else 0.0
+        if on_progress:
+            on_progress(dict(report))
+        memory.upsert_vectors(vectors)
+
+    for entry in entries:
+        read += 1
+        if read <= skip:
+            continue
+        if entry["date"]:
+            chunk.append(entry)
+        else:
+            report["undated"] += 1
+        if len(chunk) >= IMPORT_CHUNK_SIZE:
+            flush()
+    flush()
+    return report
@@ -0,0 +1,453 @@
+# -*- coding: utf-8 -*-
+"""
+Canlı Veri Aynası (Live Mirror) Modülü.
+
+Sayfalar normalde her yeniden çalıştırmada verileri Firebase'den (veya kısa
+süreli önbellekten) tekrar okur. Bu modül, isteğe bağlı olarak her etkin
+kullanıcının `users/{uid}` düğümünün bellekte bir kopyasını (aynasını) tutar
+ve bu kopyayı Realtime Database'in REST akış (Server-Sent Events) uç noktası
+üzerinden gelen `put` ve `patch` olaylarıyla güncel tutar. Ayna hazır
+olduğunda `core.firebase_db` okumaları ağa gitmeden aynadan yapılır.
+
+Özellikler:
+- **Tembel Abonelik:** Bir kullanıcı için ayna, o kullanıcının ilk okumasında
+  arka planda başlatılır; ilk anlık görüntü (snapshot) gelene kadar okumalar
+  normal yoldan yapılır.
+- **Yeniden Bağlanma:** Bağlantı koptuğunda üstel beklemeyle yeniden
+  bağlanılır. Bağlantı yokken ayna "hazır değil" sayılır; yeniden bağlanınca
+  gelen tam anlık görüntü aradaki değişiklikleri telafi eder.
+- **Token Yenileme:** Sayfalar okumalarda güncel `id_token`'ı verir. Token
+  değiştiğinde veya sunucu `auth_revoked` gönderdiğinde akış yeni token ile
+  yeniden açılır. Aynadan sadece akışı açan (sunucunun doğruladığı) token ile
+  okuma yapılabilir.
+- **Sınırlı Bellek:** En fazla `max_users` kullanıcı aynalanır (en uzun süre
+  kullanılmayan kapatılır); `max_bytes_per_user`'ı aşan kullanıcıların aynası
+  kapatılır ve okumaları normal yoldan yapılır. `idle_seconds` boyunca
+  okunmayan aynalar da kapatılır.
+
+Sadece Firebase arka ucuyla çalışır. `secrets.toml` içinde `[live_mirror]`
+başlığı altında etkinleştirilir:
+
+    [live_mirror]
+    enabled = true
+    max_users = 100
+    max_bytes_per_user = 2000000
+    idle_seconds = 900
+"""
+import copy
+import http.client
+import json
+import socket
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlencode, urljoin, urlsplit
+
+import streamlit as st
+
+from core.db_backends import PyrebaseBackend, get_backend, resolve_server_values
+from core.firebase_config import get_firebase_app
+
+DEFAULT_SETTINGS = {
+    "enabled": False,
+    "max_users": 100,
+    "max_bytes_per_user": 2_000_000,
+    "idle_seconds": 900,
+}
+READ_TIMEOUT = 60.0        # Saniye. Firebase her 30 saniyede bir keep-alive gönderir.
+RECONNECT_BASE_DELAY = 1.0
+RECONNECT_MAX_DELAY = 30.0
+MAX_REDIRECTS = 5
+
+_settings: Optional[Dict[str, Any]] = None
+_mirrors: "OrderedDict[str, UserMirror]" = OrderedDict()
+_registry_lock = threading.Lock()
+
+
+def get_settings() -> Dict[str, Any]:
+    """Ayna ayarlarını döndürür; `[live_mirror]` başlığı yoksa varsayılanlar kullanılır."""
+    global _settings
+    if _settings is None:
+        try:
+            overrides = dict(st.secrets.get("live_mirror", {}))
+        except FileNotFoundError:
+            overrides = {}
+        _settings = {**DEFAULT_SETTINGS, **overrides}
+    return _settings
+
+
+def _split(path: str) -> List[str]:
+    return [part for part in path.strip("/").split("/") if part]
+
+
+class UserMirror:
+    """
+    Tek bir kullanıcının `users/{uid}` düğümünü akış üzerinden güncel tutan ayna.
+
+    Akış arka planda bir thread'de okunur; ağaç, okumalar ve olaylar
+    arasında bir kilitle korunur. Okumalar ağacın kopyasını döndürür.
+    """
+
+    def __init__(self, user_id: str, id_token: str, database_url: str, max_bytes: int):
+        self.user_id = user_id
+        self.database_url = database_url
+        self.max_bytes = max_bytes
+        self.state = "connecting"   # connecting | live | reconnecting | oversize | cancelled | closed
+        self.last_access = time.monotonic()
+        self.reconnects = 0
+        self._token = id_token
+        self._stream_token: Optional[str] = None   # Akışı açan, sunucunun doğruladığı token.
+        self._tree: Any = None
+        self._size = 0
+        self._lock = threading.Lock()
+        self._token_changed = threading.Event()
+        self._stopped = threading.Event()
+        self._conn: Optional[http.client.HTTPConnection] = None
+        self._sock: Optional[socket.socket] = None
+        self._thread = threading.Thread(target=self._run, name=f"live-mirror-{user_id[:8]}", daemon=True)
+
+    # --- Yaşam döngüsü ---
+
+    def start(self):
+        self._thread.start()
+
+    def close(self, state: str = "closed"):
+        self.state = state
+        self._stopped.set()
+        self._token_changed.set()
+        self._disconnect()
+
+    @property
+    def size(self) -> int:
+        """Aynadaki verinin JSON olarak yaklaşık boyutu (bayt)."""
+        return self._size
+
+    @property
+    def stopped(self) -> bool:
+        return self._stopped.is_set()
+
+    def update_token(self, id_token: str):
+        """Sayfanın kullandığı güncel token'ı bildirir; değiştiyse akış yeni token ile yeniden açılır."""
+        self.last_access = time.monotonic()
+        if id_token and id_token != self._token:
+            self._token = id_token
+            self._token_changed.set()
+            self._disconnect()
+
+    def is_live(self, id_token: str) -> bool:
+        return self.state == "live" and id_token == self._stream_token
+
+    # --- Okuma ---
+
+    def read(self, parts: List[str], id_token: str, start: Optional[str] = None,
+             end: Optional[str] = None, limit_last: Optional[int] = None,
+             shallow: bool = False) -> Tuple[bool, Any]:
+        """
+        `users/{uid}` altındaki göreli bir yolu aynadan okur.
+
+        Returns:
+            tuple[bool, Any]: (Ayna okumayı karşılayabildi mi, değer). Ayna hazır
+            değilse veya token akışı açan token değilse `(False, None)` döner.
+        """
+        with self._lock:
+            if not self.is_live(id_token):
+                return False, None
+            node = self._tree
+            for part in parts:
+                node = node.get(part) if isinstance(node, dict) else None
+            if shallow:
+                return True, list(node) if isinstance(node, dict) else []
+            if isinstance(node, dict) and (start is not None or end is not None or limit_last is not None):
+                keys = sorted(k for k in node
+                              if (start is None or k >= start) and (end is None or k <= end))
+                if limit_last is not None:
+                    keys = keys[-limit_last:] if limit_last > 0 else []
+                return True, {k: copy.deepcopy(node[k]) for k in keys} or None
+            return True, copy.deepcopy(node)
+
+    # --- Yerel yazmalar ---
+
+    def resync(self):
+        """Aynayı hazır olmaktan çıkarır ve tam anlık görüntü için akışı yeniden açar."""
+        self._stream_token = None
+        self._token_changed.set()
+        self._disconnect()
+
+    def apply_update(self, parts: List[str], updates: Dict[str, Any]):
+        """Uygulamanın kendi yazmalarını, akıştan gelmesini beklemeden aynaya uygular."""
+        with self._lock:
+            if self.state != "live":
+                return  # Ayna hazır olduğunda gelecek tam anlık görüntü bu yazmayı içerir.
+            for key, value in updates.items():
+                self._set(parts + _split(key), value, resolve=True)
+
+    # --- Akış ---
+
+    def _run(self):
+        delay = RECONNECT_BASE_DELAY
+        while not self.stopped:
+            token = self._token
+            self._token_changed.clear()
+            try:
+                outcome = self._listen(token)
+            except (OSError, http.client.HTTPException, ValueError) as e:
+                # Token değişince bağlantı bilerek kapatılır; bu bir hata sayılmaz.
+                outcome = "token" if self._token_changed.is_set() else "error"
+                if outcome == "error" and not self.stopped:
+                    print(f"Canlı ayna bağlantı hatası ({self.user_id}): {e}")
+            self._stream_token = None
+            if self.stopped:
+                break
+            if outcome == "cancelled":
+                self.close("cancelled")
+                break
+            if self.state != "oversize":
+                self.state = "reconnecting"
+            self.reconnects += 1
+            if outcome == "auth":
+                # Token geçersiz; sayfadan yeni bir token gelene kadar bekle.
+                if not self._token_changed.wait(get_settings()["idle_seconds"]):
+                    self.close()
+                continue
+            if outcome == "token":
+                delay = RECONNECT_BASE_DELAY
+                continue
+            self._stopped.wait(delay)
+            delay = min(delay * 2, RECONNECT_MAX_DELAY)
+            if outcome == "ok":
+                delay = RECONNECT_BASE_DELAY
+
+    def _listen(self, token: str) -> str:
+        """
+        Akışı açar ve olayları işler.
+
+        Returns:
+            str: Akışın neden bittiği: "ok" (bağlantı kapandı), "token" (token
+            değişti), "auth" (yetki hatası), "cancelled" (erişim iptal edildi).
+        """
+        url = urljoin(self.database_url, f"users/{self.user_id}.json") + "?" + urlencode({"auth": token})
+        response = None
+        for _ in range(MAX_REDIRECTS):
+            parsed = urlsplit(url)
+            conn_class = http.client.HTTPSConnection if parsed.scheme == "https" else http.client.HTTPConnection
+            self._conn = conn_class(parsed.netloc, timeout=READ_TIMEOUT)
+            if self.stopped or self._token_changed.is_set():
+                self._disconnect()
+                return "token"
+            target = parsed.path + ("?" + parsed.query if parsed.query else "")
+            # `http.client`, bağlantı kapanışla sonlanan yanıtlarda soketi
+            # bırakır; akışı dışarıdan kesebilmek için soket ayrıca tutulur.
+            self._conn.connect()
+            self._sock = self._conn.sock
+            self._conn.request("GET", target, headers={"Accept": "text/event-stream",
+                                                       "Accept-Encoding": "identity"})
+            response = self._conn.getresponse()
+            if response.status in (301, 302, 307, 308):
+                url = urljoin(url, response.getheader("Location"))
+                self._disconnect()
+                continue
+            break
+        if response is None or response.status != 200:
+            status = response.status if response is not None else None
+            self._disconnect()
+            return "auth" if status in (401, 403) else "error"
+
+        event, data_lines = None, []
+        while True:
+            line = response.readline()
+            if not line:
+                return "token" if self._token_changed.is_set() else "ok"
+            line = line.decode("utf-8").rstrip("\r\n")
+            if line.startswith("event:"):
+                event = line[6:].strip()
+            elif line.startswith("data:"):
+                data_lines.append(line[5:].strip())
+            elif not line and event:
+                outcome = self._handle(event, "\n".join(data_lines), token)
+                event, data_lines = None, []
+                if not outcome and self._token_changed.is_set():
+                    outcome = "token"
+                if outcome:
+                    self._disconnect()
+                    return outcome
+
+    def _handle(self, event: str, raw: str, token: str) -> Optional[str]:
+        if event == "keep-alive":
+            return None
+        if event == "auth_revoked":
+            return "auth"
+        if event == "cancel":
+            return "cancelled"
+        if event not in ("put", "patch"):
+            return None
+        message = json.loads(raw)
+        parts = _split(message.get("path", "/"))
+        data = message.get("data")
+        with self._lock:
+            if event == "put":
+                self._set(parts, data)
+            else:
+                for key, value in (data or {}).items():
+                    self._set(parts + _split(key), value)
+            if not parts and event == "put":
+                # Tam anlık görüntü: ayna artık hazır ve bu token doğrulandı.
+                self._size = len(json.dumps(self._tree)) if self._tree is not None else 0
+                self._stream_token = token
+                self.state = "live"
+            else:
+                self._size += len(raw)
+            if self._size > self.max_bytes:
+                self._size = len(json.dumps(self._tree)) if self._tree is not None else 0
+                if self._size > self.max_bytes:
+                    self._tree = None
+                    self._stream_token = None
+                    self.close("oversize")
+                    return "ok"
+        return None
+
+    def _set(self, parts: List[str], value: Any, resolve: bool = False):
+        """Ağaçta bir yola değer yazar; `None` yolu siler ve boşalan düğümleri temizler."""
+        if not parts:
+            self._tree = resolve_server_values(self._tree, value) if resolve else value
+            return
+        if not isinstance(self._tree, dict):
+            self._tree = {}
+        node = self._tree
+        trail = []
+        for part in parts[:-1]:
+            if not isinstance(node.get(part), dict):
+                if value is None:
+                    return
+                node[part] = {}
+            trail.append((node, part))
+            node = node[part]
+        if value is None:
+            node.pop(parts[-1], None)
+            for parent, key in reversed(trail):
+                if parent[key]:
+                    break
+                del parent[key]
+        else:
+            node[parts[-1]] = resolve_server_values(node.get(parts[-1]), value) if resolve else value
+
+    def _disconnect(self):
+        # Bloklanmış `readline`'ı hemen sonlandırmak için soket kapatılır.
+        sock, conn = self._sock, self._conn
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        if conn is not None:
+            conn.close()
+
+
+def _enabled() -> bool:
+    return bool(get_settings()["enabled"]) and isinstance(get_backend(), PyrebaseBackend)
+
+
+def _user_path(path: str) -> Tuple[Optional[str], List[str]]:
+    parts = _split(path)
+    if len(parts) >= 2 and parts[0] == "users":
+        return parts[1], parts[2:]
+    return None, []
+
+
+def get_mirror(user_id: str, id_token: str) -> Optional[UserMirror]:
+    """
+    Kullanıcının aynasını döndürür; yoksa (ayna etkinse) arka planda başlatır.
+
+    Ayna kapalıysa, kullanıcı bellek sınırını aştıysa veya erişim iptal
+    edildiyse None döner.
+    """
+    if not id_token or not _enabled():
+        return None
+    settings = get_settings()
+    now = time.monotonic()
+    with _registry_lock:
+        for uid, idle in list(_mirrors.items()):
+            if uid != user_id and now - idle.last_access > settings["idle_seconds"]:
+                _mirrors.pop(uid).close()
+        mirror = _mirrors.get(user_id)
+        if mirror is not None and mirror.stopped and mirror.state == "closed":
+            mirror = None
+        if mirror is None:
+            mirror = UserMirror(user_id, id_token, get_firebase_app().database_url,
+                                int(settings["max_bytes_per_user"]))
+            _mirrors[user_id] = mirror
+            mirror.start()
+            while len(_mirrors) > int(settings["max_users"]):
+                _mirrors.popitem(last=False)[1].close()
+        _mirrors.move_to_end(user_id)
+    if mirror.stopped:
+        return None
+    mirror.update_token(id_token)
+    return mirror
+
+
+def is_live(user_id: str, id_token: str) -> bool:
+    """Kullanıcının okumalarının aynadan karşılanıp karşılanamayacağını döndürür."""
+    mirror = get_mirror(user_id, id_token)
+    return mirror is not None and mirror.is_live(id_token)
+
+
+def read(path: str, id_token: str, start: Optional[str] = None, end: Optional[str] = None,
+         limit_last: Optional[int] = None, shallow: bool = False) -> Tuple[bool, Any]:
+    """
+    `users/{uid}/...` altındaki bir yolu, ayna hazırsa aynadan okur.
+
+    Returns:
+        tuple[bool, Any]: (Okuma aynadan yapıldı mı, değer).
+    """
+    user_id, parts = _user_path(path)
+    if user_id is None:
+        return False, None
+    mirror = get_mirror(user_id, id_token)
+    if mirror is None:
+        return False, None
+    return mirror.read(parts, id_token, start, end, limit_last, shallow)
+
+
+@contextmanager
+def local_write(path: str, updates: Dict[str, Any]):
+    """
+    Bir yazmayı, veritabanına gönderilmeden önce ilgili kullanıcının aynasına uygular.
+
+    Yazma bu bağlam içinde gönderilir. Sunucunun akışla geri gönderdiği
+    olaylar kesin değerler içerdiği için (örn: artırılmış sayaç), önce yerel
+    uygulama yapılması aynı artırmanın iki kez sayılmasını önler. Yazma
+    başarısız olursa ayna tam anlık görüntüyle yeniden eşitlenir.
+
+    Args:
+        path (str): Güncellemelerin uygulandığı kök yol (örn: `users/{uid}`).
+        updates (dict): Göreli yol -> değer eşlemeleri; `""` kök yolun kendisidir.
+    """
+    user_id, parts = _user_path(path)
+    with _registry_lock:
+        mirror = _mirrors.get(user_id) if user_id is not None else None
+    if mirror is not None and not mirror.stopped:
+        mirror.apply_update(parts, updates)
+    try:
+        yield
+    except Exception:
+        if mirror is not None and not mirror.stopped:
+            mirror.resync()
+        raise
+
+
+def get_mirror_stats() -> Dict[str, Any]:
+    """Aynalanan kullanıcıların durumunu, yaklaşık boyutunu ve yeniden bağlanma sayısını döndürür."""
+    with _registry_lock:
+        return {
+            uid: {"state": m.state, "bytes": m.size, "reconnects": m.reconnects}
+            for uid, m in _mirrors.items()
+        }
+
+
+def close_all():
+    """Tüm aynaları kapatır."""
+    with _registry_lock:
+        while _mirrors:
+            _mirrors.popitem()[1].close()
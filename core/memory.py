@@ -10,24 +10,46 @@ yapay zeka, geçmiş konuşmaları "hatırlayabilir" ve daha bağlamsal yanıtla
 
 İşleyiş:
 1.  Metinler, `get_gemini_embedding` ile sayısal vektörlere çevrilir.
-2.  Bu vektörler, kullanıcı ID'si ile etiketlenerek Pinecone'a kaydedilir (`save_to_memory`).
+2.  Bu vektörler, kullanıcı ID'si ile etiketlenerek Pinecone'a kaydedilir
+    (`save_to_memory`; birden fazla metin için toplu embedding ve toplu upsert
+    kullanan `save_many_to_memory`).
 3.  Yeni bir sohbette, kullanıcının mesajına anlamsal olarak en yakın geçmiş
-    konuşmalar Pinecone'dan aranır (`search_memory`).
+    konuşmalar Pinecone'dan aranır (`search_memory`). Sohbet sayfası arama
+    ile mesajın kaydını tek embedding isteğinde birleştiren
+    `start_chat_turn`'ü kullanır. Sohbet mesajları kaydedilmeden önce bilgi
+    taşımayan veya son kayıtların tekrarı olan mesajları eleyen bir yazma
+    kabul filtresinden geçer (`get_admission_stats`).
 4.  Bulunan bu "hatıralar", yapay zekaya ek bağlam olarak sunulur.
+
+Gemini ve Pinecone istekleri `core.resilience` üzerinden zaman aşımı, tekrar
+deneme ve devre kesici politikasıyla yapılır.
 """
 import streamlit as st
 import numpy as np
 from pinecone import Pinecone, ServerlessSpec
+import google.ai.generativelanguage as glm
 import google.generativeai as genai
-from typing import List, Dict, Any, Optional
+from google.generativeai.client import get_default_generative_client
+from google.generativeai.embedding import to_task_type
+from google.generativeai.types import content_types
+from typing import List, Dict, Any, Iterable, Optional, Tuple
+import re
+import threading
 import uuid
+from collections import OrderedDict, deque
+
+from core import embedding_cache, resilience, vector_stores, write_queue
+from core.vector_stores import VectorStore
 
 # --- GÜVENLİ KONFİGÜRASYON VE BAŞLATMA ---
 
 try:
-    PINECONE_API_KEY = st.secrets["pinecone"]["api_key"]
     GOOGLE_API_KEY = st.secrets["google"]["api_key"]
     genai.configure(api_key=GOOGLE_API_KEY)
+    # Pinecone anahtarı sadece Pinecone kullanan bir vektör deposu seçildiğinde gereklidir.
+    _pinecone_secrets = st.secrets.get("pinecone", {})
+    PINECONE_API_KEY = _pinecone_secrets.get("api_key")
+    AUTO_CREATE_INDEX = bool(_pinecone_secrets.get("auto_create_index", True))
 except (KeyError, AttributeError):
     raise RuntimeError(
         "Pinecone veya Google API anahtarı bulunamadı. "
@@ -36,14 +58,45 @@ except (KeyError, AttributeError):
 
 # --- PINECONE INDEX KURULUMU ---
 
+EMBED_MODEL = "models/embedding-001"  # Embedding'lerin alındığı Gemini modeli.
 EMBED_DIM = 768  # Gemini 'embedding-001' modelinin vektör boyutu.
 INDEX_NAME = "mymindmate-memory"  # Pinecone'daki index'imizin adı.
+EMBED_BATCH_SIZE = 100   # Gemini'nin toplu embedding isteği başına en fazla metin sayısı.
+UPSERT_BATCH_SIZE = 100  # Tek bir Pinecone upsert isteğiyle gönderilecek en fazla vektör sayısı.
+
+# Pinecone istemcisi ve index bağlantısı, modül içe aktarılırken değil, ilk
+# hafıza işleminde oluşturulur ve işlem (process) boyunca paylaşılır. Böylece
+# hafızayı kullanmayan sayfa yüklemeleri Pinecone'a istek göndermek zorunda kalmaz.
+_pinecone_client: Optional[Pinecone] = None
+_pinecone_index = None
+_pinecone_lock = threading.Lock()
+
+def _get_pinecone_client() -> Pinecone:
+    global _pinecone_client
+    if _pinecone_client is None:
+        if not PINECONE_API_KEY:
+            raise RuntimeError(
+                "Pinecone API anahtarı bulunamadı. `[pinecone]` ayarlarını ekleyin veya "
+                "`[vector_store]` ayarlarında `backend = \"local\"` seçin."
+            )
+        _pinecone_client = Pinecone(api_key=PINECONE_API_KEY)
+    return _pinecone_client
 
-pc = Pinecone(api_key=PINECONE_API_KEY)
+def ensure_index() -> bool:
+    """
+    Pinecone'da index'imiz yoksa oluşturur.
+
+    Uygulama bunu ilk hafıza işleminde kendiliğinden bir kez çağırır. Bu
+    kontrol istenmiyorsa `[pinecone]` ayarlarına `auto_create_index = false`
+    eklenir ve index `python manage.py setup-memory-index` ile bir kez
+    oluşturulur.
 
-# Uygulama ilk kez çalıştırıldığında, Pinecone'da index'imiz yoksa oluştur.
-# Bu, manuel kurulum ihtiyacını ortadan kaldırır.
-if INDEX_NAME not in pc.list_indexes().names():
+    Returns:
+        bool: Index bu çağrıda oluşturulduysa True, zaten varsa False.
+    """
+    pc = _get_pinecone_client()
+    if INDEX_NAME in pc.list_indexes().names():
+        return False
     pc.create_index(
         name=INDEX_NAME,
         dimension=EMBED_DIM,
@@ -53,19 +106,126 @@ if INDEX_NAME not in pc.list_indexes().names():
             region="us-east-1"  # Pinecone ücretsiz katmanının standart bölgesi.
         )
     )
+    return True
+
+def get_index():
+    """
+    Pinecone index bağlantısını döndürür; ilk çağrıda oluşturur.
+
+    İlk çağrıda (ayar kapatılmadıysa) index'in varlığı kontrol edilir. Sonraki
+    tüm çağrılar, aynı bağlantıyı ağa gitmeden döndürür.
+    """
+    global _pinecone_index
+    if _pinecone_index is None:
+        with _pinecone_lock:
+            if _pinecone_index is None:
+                if AUTO_CREATE_INDEX:
+                    ensure_index()
+                _pinecone_index = _get_pinecone_client().Index(INDEX_NAME)
+    return _pinecone_index
+
+# --- VEKTÖR DEPOSU (VECTOR STORE) ---
+# Hafıza işlemleri Pinecone'a doğrudan değil, `core.vector_stores` içindeki
+# arayüz üzerinden yapılır. Varsayılan depo Pinecone'dur; `[vector_store]`
+# ayarıyla yerel NumPy deposu veya Pinecone önünde yerel bir okuma önbelleği seçilebilir.
 
-# Index'e bağlanarak üzerinde işlem yapmaya hazır hale gel.
-pinecone_index = pc.Index(INDEX_NAME)
+_vector_store: Optional[VectorStore] = None
+
+def get_vector_store() -> VectorStore:
+    """Uygulama genelinde kullanılan vektör deposunu döndürür; ilk çağrıda ayarlardan oluşturur."""
+    global _vector_store
+    if _vector_store is None:
+        with _pinecone_lock:
+            if _vector_store is None:
+                _vector_store = vector_stores.create_store(vector_stores.get_settings(), get_index)
+    return _vector_store
+
+def set_vector_store(store: Optional[VectorStore]):
+    """
+    Kullanılan vektör deposunu değiştirir (örn: testlerde `LocalStore`); `None`
+    verilirse bir sonraki çağrıda ayarlardan yeniden oluşturulur.
+    """
+    global _vector_store
+    with _pinecone_lock:
+        _vector_store = store
 
 # --- YARDIMCI FONKSİYON: EMBEDDING ALMA ---
 
-@st.cache_data(show_spinner=False)
+def _fetch_gemini_embedding(text: str, task_type: str) -> List[float]:
+    """Tek bir metnin embedding'ini alır; hata durumunda hata fırlatır."""
+    return _fetch_gemini_embeddings([text], task_type)[0]
+
+def _fetch_gemini_embeddings(texts: List[str], task_type: str) -> List[List[float]]:
+    """
+    Birden fazla metnin embedding'ini Gemini'nin toplu (batch) uç noktasıyla alır.
+
+    Daha önce alınmış embedding'ler `core.embedding_cache`'ten okunur; sadece
+    önbellekte olmayan (ve tekrar etmeyen) metinler için, her istekte en fazla
+    `EMBED_BATCH_SIZE` metin gönderilir. Sonuçlar metinlerle aynı sırada
+    döner. Hata durumunda hata fırlatır; başarısız çağrılar önbelleğe yazılmaz.
+    """
+    return _fetch_embedding_requests([(text, task_type) for text in texts])
+
+def _fetch_embedding_requests(requests: List[Tuple[str, str]]) -> List[List[float]]:
+    """
+    `_fetch_gemini_embeddings`'in her metin için ayrı görev türü alan sürümü.
+
+    `(metin, görev türü)` çiftleri alır. Aynı metnin farklı görev türleri
+    için embedding'leri de tek bir toplu istekle alınabilir.
+    """
+    use_cache = embedding_cache.is_enabled()
+    embeddings: List[Optional[List[float]]] = [None] * len(requests)
+    if use_cache:
+        for task_type in dict.fromkeys(task for _, task in requests):
+            positions = [i for i, (_, task) in enumerate(requests) if task == task_type]
+            cached = embedding_cache.get_many(EMBED_MODEL, task_type, [requests[i][0] for i in positions])
+            for i, embedding in zip(positions, cached):
+                embeddings[i] = embedding
+    missing = list(dict.fromkeys(request for request, embedding in zip(requests, embeddings) if embedding is None))
+    fetched = {}
+    for i in range(0, len(missing), EMBED_BATCH_SIZE):
+        batch = missing[i:i + EMBED_BATCH_SIZE]
+        vectors = _request_embeddings(batch)
+        fetched.update(zip(batch, vectors))
+        if use_cache:
+            for task_type in dict.fromkeys(task for _, task in batch):
+                pairs = [(text, vector) for (text, task), vector in zip(batch, vectors) if task == task_type]
+                embedding_cache.put_many(EMBED_MODEL, task_type, *zip(*pairs))
+    return [embedding if embedding is not None else fetched[request]
+            for request, embedding in zip(requests, embeddings)]
+
+def _request_embeddings(batch: List[Tuple[str, str]]) -> List[List[float]]:
+    """En fazla `EMBED_BATCH_SIZE` `(metin, görev türü)` çiftinin embedding'ini tek bir istekle alır."""
+    task_types = {task for _, task in batch}
+    # Embedding almak yan etkisiz bir okumadır; yavaş kalırsa yedek istek gönderilebilir.
+    if len(task_types) == 1:
+        response = resilience.call(
+            resilience.GEMINI,
+            genai.embed_content,
+            model=EMBED_MODEL,
+            content=[text for text, _ in batch],
+            task_type=task_types.pop(),
+            hedge=True
+        )
+        return response["embedding"]
+    # `genai.embed_content` tüm metinlere aynı görev türünü uygular; Gemini'nin
+    # toplu uç noktası ise her metin için ayrı görev türünü kabul eder.
+    request = glm.BatchEmbedContentsRequest(model=EMBED_MODEL, requests=[
+        glm.EmbedContentRequest(model=EMBED_MODEL, content=content_types.to_content(text),
+                                task_type=to_task_type(task))
+        for text, task in batch
+    ])
+    response = resilience.call(resilience.GEMINI, get_default_generative_client().batch_embed_contents,
+                               request, hedge=True)
+    return [list(embedding.values) for embedding in response.embeddings]
+
 def get_gemini_embedding(text: str, task_type: str = "retrieval_document") -> List[float]:
     """
     Verilen metin için Google Gemini embedding'i oluşturur.
     
-    `@st.cache_data` sayesinde aynı metin için tekrar tekrar API çağrısı
-    yapılmaz, bu da performansı artırır ve maliyeti düşürür.
+    Embedding'ler diskteki paylaşımlı önbellekte (`core.embedding_cache`)
+    saklandığı için aynı metin için tekrar tekrar API çağrısı yapılmaz; bu da
+    performansı artırır ve maliyeti düşürür.
 
     Args:
         text: Embedding'i oluşturulacak metin.
@@ -73,53 +233,301 @@ def get_gemini_embedding(text: str, task_type: str = "retrieval_document") -> Li
                    arama sorgusu için 'retrieval_query' olmalıdır.
     """
     try:
-        response = genai.embed_content(
-            model="models/embedding-001",
-            content=text,
-            task_type=task_type
-        )
-        return response["embedding"]
+        return _fetch_gemini_embedding(text, task_type)
     except Exception as e:
         st.error(f"Embedding alınırken bir hata oluştu: {e}")
         return []
 
+# --- YAZMA KABUL FİLTRESİ (WRITE ADMISSION) ---
+# Sohbetteki "evet", "tamam" veya selamlaşma gibi bilgi taşımayan mesajlar
+# hafızaya yazılmaz; hem embedding ve upsert maliyetinden kaçınılır hem de
+# aramalar bu kayıtlarla dolmaz. Kontroller iki aşamadadır:
+#   1. Embedding'den önce, metin üzerinde: uzunluk ve yenilik (sadece dolgu
+#      kelimelerinden oluşan veya kullanıcının son kayıtlarından birinin aynısı
+#      olan metinler).
+#   2. Embedding'den sonra, upsert'ten önce: kullanıcının son kaydedilen
+#      vektörlerinden birine kosinüs benzerliği `duplicate_threshold`'u aşan
+#      (neredeyse aynı) metinler.
+# Son kayıtlar bu işlemin (process) belleğinde tutulur. Ayarlar `secrets.toml`
+# içinde `[memory_admission]` başlığı altında verilebilir.
+
+DEFAULT_ADMISSION_SETTINGS = {
+    "enabled": True,
+    # Uzunluk sınırları düşüktür: "Yoruldum" gibi kısa ama anlamlı mesajlar
+    # da kaydedilir; bilgi taşımayan kısa mesajları dolgu kelimeleri eler.
+    "min_chars": 4,               # Boşluklar hariç en az karakter sayısı.
+    "min_words": 1,               # En az kelime sayısı.
+    "duplicate_threshold": 0.95,  # Bu benzerliği aşan vektörler kopya sayılır.
+    "recent_vectors": 20,         # Kullanıcı başına karşılaştırılacak son kayıt sayısı.
+}
+ADMISSION_MAX_USERS = 500  # Son kayıtları bellekte tutulan en fazla kullanıcı sayısı.
+# Onay, teşekkür ve selamlaşma kelimeleri; metin sadece bunlardan oluşuyorsa
+# yazılmaz. "ben", "çok", "iyiyim" gibi bir durum anlatabilen kelimeler burada
+# yer almaz ("Ben çok iyiyim" kaydedilir).
+FILLER_WORDS = frozenset("""
+    evet hayır hayir tamam tamamdır ok okey olur peki tabi tabii aynen
+    teşekkürler teşekkür tesekkurler ederim sağol sağolun sağ ol eyvallah
+    merhaba selam selamlar günaydın iyi geceler akşamlar günler sabahlar
+    nasılsın naber de da ve hmm hm haha anladım
+""".split())
+
+_admission_settings: Optional[Dict[str, Any]] = None
+_admission_lock = threading.Lock()
+# Kullanıcı -> son kaydedilen metinlerin özetleri ve normalize edilmiş vektörleri.
+_recent_writes: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+_admission_counters: Dict[str, Dict[str, int]] = {}
+ADMISSION_COUNTERS = ("admitted", "too_short", "low_novelty", "duplicate")
+
+def get_admission_settings() -> Dict[str, Any]:
+    """Kabul filtresi ayarlarını döndürür; `[memory_admission]` başlığı yoksa varsayılanlar kullanılır."""
+    global _admission_settings
+    if _admission_settings is None:
+        try:
+            overrides = dict(st.secrets.get("memory_admission", {}))
+        except FileNotFoundError:
+            overrides = {}
+        _admission_settings = {**DEFAULT_ADMISSION_SETTINGS, **overrides}
+    return _admission_settings
+
+def _count_admission(user_id: str, name: str, amount: int = 1):
+    with _admission_lock:
+        counters = _admission_counters.setdefault(user_id, dict.fromkeys(ADMISSION_COUNTERS, 0))
+        counters[name] += amount
+
+def _recent_entry(user_id: str) -> Dict[str, Any]:
+    """Kullanıcının son kayıtlarını döndürür; `_admission_lock` altında çağrılmalıdır."""
+    entry = _recent_writes.get(user_id)
+    if entry is None:
+        limit = int(get_admission_settings()["recent_vectors"])
+        entry = _recent_writes[user_id] = {"texts": deque(maxlen=limit), "vectors": deque(maxlen=limit)}
+        while len(_recent_writes) > ADMISSION_MAX_USERS:
+            _recent_writes.popitem(last=False)
+    _recent_writes.move_to_end(user_id)
+    return entry
+
+def _text_key(text: str) -> Tuple[str, ...]:
+    return tuple(re.findall(r"\w+", text.casefold()))
+
+def _admit_texts(user_id: str, items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Embedding'den önceki kontrolleri uygular ve geçen öğeleri döndürür."""
+    settings = get_admission_settings()
+    if not settings["enabled"]:
+        return items
+    with _admission_lock:
+        recent = set(_recent_entry(user_id)["texts"])
+    admitted = []
+    for item in items:
+        words = _text_key(item["text"])
+        if len("".join(item["text"].split())) < settings["min_chars"] or len(words) < settings["min_words"]:
+            _count_admission(user_id, "too_short")
+        elif all(word in FILLER_WORDS for word in words) or words in recent:
+            _count_admission(user_id, "low_novelty")
+        else:
+            recent.add(words)
+            admitted.append(item)
+    return admitted
+
+def _admit_vectors(user_id: str, vectors: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Kullanıcının son vektörlerinden birinin neredeyse aynısı olan vektörleri eler."""
+    settings = get_admission_settings()
+    if not settings["enabled"]:
+        return vectors
+    with _admission_lock:
+        recent = list(_recent_entry(user_id)["vectors"])
+    threshold = float(settings["duplicate_threshold"])
+    admitted = []
+    for vector in vectors:
+        values = np.asarray(vector["values"], dtype=np.float32)
+        norm = np.linalg.norm(values)
+        normalized = values / norm if norm else values
+        # Tekrar denenen bir işin vektörü, kendi önceki kaydıyla karşılaştırılmaz.
+        others = [v for vector_id, v in recent if vector_id != vector["id"]]
+        if others and float(np.max(np.stack(others) @ normalized)) >= threshold:
+            _count_admission(user_id, "duplicate")
+            continue
+        recent.append((vector["id"], normalized))
+        admitted.append(vector)
+    return admitted
+
+def _remember_writes(user_id: str, vectors: List[Dict[str, Any]]):
+    """Başarıyla kaydedilen vektörleri, sonraki kabul kontrolleri için hatırlar."""
+    if not get_admission_settings()["enabled"] or not vectors:
+        return
+    _count_admission(user_id, "admitted", len(vectors))
+    with _admission_lock:
+        entry = _recent_entry(user_id)
+        for vector in vectors:
+            values = np.asarray(vector["values"], dtype=np.float32)
+            norm = np.linalg.norm(values)
+            entry["texts"].append(_text_key(vector["metadata"].get("text", "")))
+            entry["vectors"].append((vector["id"], values / norm if norm else values))
+
+def get_admission_stats(user_id: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Kabul filtresinin bu işlemdeki sayaçlarını döndürür.
+
+    Returns:
+        dict: `user_id` verilirse o kullanıcının, verilmezse tüm kullanıcıların
+        toplam `admitted`, `too_short`, `low_novelty`, `duplicate` ve
+        `skipped` (elenen toplam yazma) sayıları.
+    """
+    with _admission_lock:
+        if user_id is not None:
+            rows = [_admission_counters.get(user_id, {})]
+        else:
+            rows = list(_admission_counters.values())
+        totals = {name: sum(row.get(name, 0) for row in rows) for name in ADMISSION_COUNTERS}
+    totals["skipped"] = totals["too_short"] + totals["low_novelty"] + totals["duplicate"]
+    return totals
+
 # --- ANA HAFIZA YÖNETİMİ FONKSİYONLARI ---
+# `prepare_items`, `build_vectors` ve `upsert_vectors`, kendi hız sınırı ve
+# kontrol noktası mantığını yürüten toplu işlerin (yeniden indeksleme,
+# birleştirme, içe aktarma) kullandığı alt seviye adımlardır; sayfalar
+# `save_many_to_memory` veya kuyruk fonksiyonlarını kullanır.
 
-def save_to_memory(user_id: str, text: str, metadata: Dict[str, Any], vector_id: Optional[str] = None):
+def prepare_items(items: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
     """
-    Bir metni, meta verileriyle birlikte kullanıcının hafızasına kaydeder.
+    Kaydedilecek öğeleri `{"text", "metadata", "vector_id"}` biçimine getirir.
 
-    Eğer bir `vector_id` sağlanırsa, bu ID kullanılır. Sağlanmazsa,
-    benzersiz bir UUID oluşturulur.
+    Metni boş olan öğeler atlanır. ID'si verilmeyen öğelere burada benzersiz
+    bir UUID atanır; böylece tekrar denemeler aynı vektörün üzerine yazar.
+    Embedding'i önceden alınmış öğelerin `values` alanı korunur.
     """
-    if not user_id or not text:
-        return
+    prepared = []
+    for item in items:
+        if not item.get("text"):
+            continue
+        entry = {
+            "text": item["text"],
+            "metadata": dict(item.get("metadata") or {}),
+            "vector_id": item.get("vector_id") or str(uuid.uuid4()),
+        }
+        if item.get("values"):
+            entry["values"] = list(item["values"])
+        prepared.append(entry)
+    return prepared
 
-    # Pinecone'a gönderilecek her vektörün benzersiz bir ID'si olmalıdır.
-    # Eğer dışarıdan bir ID verilmediyse, burada kendimiz oluştururuz.
-    if vector_id is None:
-        vector_id = str(uuid.uuid4())
-        
-    embedding = get_gemini_embedding(text)
-    if not embedding:
-        return  # Embedding alınamadıysa kaydetme.
+def build_vectors(user_id: str, items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Öğelerin embedding'lerini toplu olarak alır ve Pinecone'a yüklenecek vektörleri hazırlar; başarısız olursa hata fırlatır."""
+    pending = [item["text"] for item in items if not item.get("values")]
+    fetched = iter(_fetch_gemini_embeddings(pending, "retrieval_document") if pending else [])
+    embeddings = [item.get("values") or next(fetched) for item in items]
 
-    # Pinecone'a yüklenecek vektörü hazırla. Metaveri, arama sonuçlarını
+    # Pinecone'a yüklenecek vektörleri hazırla. Metaveri, arama sonuçlarını
     # zenginleştirmek ve filtrelemek için kritik öneme sahiptir.
-    vector_to_upsert = {
-        "id": vector_id,
-        "values": embedding,
-        "metadata": {
-            "user_id": user_id,  # Hangi kullanıcıya ait olduğunu belirtir.
-            "text": text,        # Orijinal metni saklar.
-            **metadata          # Gelen diğer tüm meta verileri ekler (örn: 'role', 'timestamp').
+    return [
+        {
+            "id": item["vector_id"],
+            "values": embedding,
+            "metadata": {
+                "user_id": user_id,    # Hangi kullanıcıya ait olduğunu belirtir.
+                "text": item["text"],  # Orijinal metni saklar.
+                **item["metadata"]     # Gelen diğer tüm meta verileri ekler (örn: 'role', 'timestamp').
+            }
         }
-    }
+        for item, embedding in zip(items, embeddings)
+    ]
+
+def upsert_vectors(vectors: List[Dict[str, Any]]):
+    """Vektörleri `UPSERT_BATCH_SIZE`'lık parçalar hâlinde vektör deposuna yükler; başarısız olursa hata fırlatır."""
+    store = get_vector_store()
+    for i in range(0, len(vectors), UPSERT_BATCH_SIZE):
+        store.upsert(vectors[i:i + UPSERT_BATCH_SIZE])
+
+def _store_vectors(user_id: str, vectors: List[Dict[str, Any]], admission: bool) -> int:
+    """Vektörleri (gerekirse kabul filtresinden geçirerek) yükler ve yüklenen vektör sayısını döndürür."""
+    if admission:
+        vectors = _admit_vectors(user_id, vectors)
+    upsert_vectors(vectors)
+    if admission:
+        _remember_writes(user_id, vectors)
+    return len(vectors)
+
+def save_many_to_memory(user_id: str, items: Iterable[Dict[str, Any]], admission: bool = False) -> int:
+    """
+    Birden fazla metni, meta verileriyle birlikte kullanıcının hafızasına kaydeder.
+
+    Tüm metinlerin embedding'i Gemini'nin toplu uç noktasıyla alınır ve
+    vektörler parçalar hâlinde Pinecone'a yüklenir. Böylece N metin için N
+    yerine yaklaşık N/100 embedding ve N/100 upsert isteği yapılır.
+
+    Args:
+        items: `{"text": str, "metadata": dict, "vector_id": str (isteğe bağlı)}`
+            sözlükleri. ID verilmezse benzersiz bir UUID oluşturulur.
+        admission: True ise öğeler önce yazma kabul filtresinden geçirilir
+            (sohbet mesajları için).
+
+    Returns:
+        int: Kaydedilen öğe sayısı (hata durumunda 0).
+    """
+    items = prepare_items(items)
+    if not user_id or not items:
+        return 0
+    if admission:
+        items = _admit_texts(user_id, items)
+        if not items:
+            return 0
 
     try:
-        pinecone_index.upsert(vectors=[vector_to_upsert])
+        vectors = build_vectors(user_id, items)
+    except Exception as e:
+        st.error(f"Embedding alınırken bir hata oluştu: {e}")
+        return 0  # Embedding alınamadıysa kaydetme.
+
+    try:
+        return _store_vectors(user_id, vectors, admission)
     except Exception as e:
         st.error(f"Hafızaya kaydederken bir Pinecone hatası oluştu: {e}")
+        return 0
+
+def save_to_memory(user_id: str, text: str, metadata: Dict[str, Any], vector_id: Optional[str] = None):
+    """
+    Bir metni, meta verileriyle birlikte kullanıcının hafızasına kaydeder.
+
+    Eğer bir `vector_id` sağlanırsa, bu ID kullanılır. Sağlanmazsa,
+    benzersiz bir UUID oluşturulur.
+    """
+    save_many_to_memory(user_id, [{"text": text, "metadata": metadata, "vector_id": vector_id}])
+
+def enqueue_save_many_to_memory(user_id: str, items: Iterable[Dict[str, Any]], admission: bool = False):
+    """
+    `save_many_to_memory`'nin arka planda çalışan sürümü.
+
+    Tüm öğeler tek bir iş olarak kalıcı yazma kuyruğuna eklenir ve hemen
+    dönülür; embedding alma ve Pinecone'a yükleme arka plan işçileri
+    tarafından, hata durumunda tekrar denenerek toplu olarak yapılır. Kuyruk
+    doluysa kayıt senkron olarak yapılır.
+
+    `admission` True ise metin kontrolleri kuyruğa eklemeden önce, benzerlik
+    kontrolü ise işçide, embedding alındıktan sonra yapılır.
+    """
+    # ID'ler kuyruğa eklenirken belirlenir; böylece tekrar denemeler aynı
+    # vektörlerin üzerine yazar ve çift kayıt oluşmaz.
+    items = prepare_items(items)
+    if not user_id or not items:
+        return
+    if admission:
+        items = _admit_texts(user_id, items)
+        if not items:
+            return
+    _enqueue_prepared(user_id, items, admission)
+
+def _enqueue_prepared(user_id: str, items: List[Dict[str, Any]], admission: bool):
+    """Hazırlanmış (ve metin kontrollerinden geçmiş) öğeleri yazma kuyruğuna ekler."""
+    payload = {"user_id": user_id, "items": items, "admission": admission}
+    # Kullanıcı anahtarı, aynı kullanıcının kayıt ve silme işlerinin sırasını korur.
+    if not write_queue.enqueue(QUEUE_SAVE_MANY, payload, key=user_id):
+        try:
+            _store_vectors(user_id, build_vectors(user_id, items), admission)
+        except Exception as e:
+            st.error(f"Hafızaya kaydederken bir hata oluştu: {e}")
+
+def enqueue_save_to_memory(user_id: str, text: str, metadata: Dict[str, Any], vector_id: Optional[str] = None,
+                           admission: bool = False):
+    """`save_to_memory`'nin arka planda çalışan sürümü; tek öğeli bir `enqueue_save_many_to_memory`'dir."""
+    enqueue_save_many_to_memory(user_id, [{"text": text, "metadata": metadata, "vector_id": vector_id}],
+                                admission)
 
 def search_memory(user_id: str, query: str, top_k: int = 5) -> List[Dict[str, Any]]:
     """
@@ -135,30 +543,92 @@ def search_memory(user_id: str, query: str, top_k: int = 5) -> List[Dict[str, An
         return []
 
     try:
-        # Pinecone'da arama yap ve sonuçları sadece ilgili kullanıcı için filtrele.
-        results = pinecone_index.query(
-            vector=query_embedding,
-            top_k=top_k,  # En alakalı `top_k` sonucu getir.
-            filter={"user_id": {"$eq": user_id}},  # Sadece bu kullanıcıya ait vektörleri ara.
-            include_metadata=True  # Sonuçlarla birlikte meta verileri de getir.
-        )
-        
+        # Sadece ilgili kullanıcının vektörleri arasında en alakalı `top_k` sonucu getir.
+        matches = get_vector_store().query(user_id, query_embedding, top_k)
+
         # Sonuçları, sadece meta verileri içeren temiz bir listeye dönüştür.
-        found_matches = [match.metadata for match in results.matches] if results.matches else []
-        return found_matches
+        return [match["metadata"] for match in matches]
     except Exception as e:
         st.error(f"Hafızada arama yaparken bir Pinecone hatası oluştu: {e}")
         return []
 
-def delete_memory_by_id(vector_id: str):
-    """Belirli bir anıyı (vektörü) ID'sine göre Pinecone'dan siler."""
-    if not vector_id:
+def start_chat_turn(user_id: str, prompt: str, metadata: Dict[str, Any], top_k: int = 5) -> List[Dict[str, Any]]:
+    """
+    Bir sohbet mesajı için hafıza aramasını yapar ve mesajı hafızaya kaydetmeye başlar.
+
+    Mesajın arama (`retrieval_query`) ve kayıt (`retrieval_document`)
+    embedding'leri tek bir toplu istekle alınır. Arama yapıldıktan sonra
+    mesaj, hazır embedding'iyle yazma kuyruğuna eklenir; böylece vektör, yapay
+    zeka yanıtı üretilirken arka planda yüklenir ve kuyrukta tekrar embedding
+    alınmaz. Arama, mesaj kaydedilmeden yapıldığı için mesaj kendisini bulmaz.
+
+    Mesaj yazma kabul filtresinden geçmezse sadece arama embedding'i alınır
+    ve mesaj kaydedilmez.
+
+    Returns:
+        list: `search_memory` ile aynı biçimde, ilgili anıların metaverileri.
+    """
+    if not user_id or not prompt:
+        return []
+
+    items = _admit_texts(user_id, prepare_items([{"text": prompt, "metadata": metadata}]))
+    requests = [(prompt, "retrieval_query")] + [(prompt, "retrieval_document") for _ in items]
+    try:
+        query_embedding, *document_embedding = _fetch_embedding_requests(requests)
+    except Exception as e:
+        st.error(f"Embedding alınırken bir hata oluştu: {e}")
+        if items:
+            # Kayıt yine de kuyruğa eklenir; embedding orada tekrar denenir.
+            _enqueue_prepared(user_id, items, admission=True)
+        return []
+
+    try:
+        matches = get_vector_store().query(user_id, query_embedding, top_k)
+        memories = [match["metadata"] for match in matches]
+    except Exception as e:
+        st.error(f"Hafızada arama yaparken bir Pinecone hatası oluştu: {e}")
+        memories = []
+
+    if items:
+        items[0]["values"] = document_embedding[0]
+        _enqueue_prepared(user_id, items, admission=True)
+    return memories
+
+def delete_memory_by_id(vector_id: str, user_id: str):
+    """Bir kullanıcının belirli bir anısını (vektörünü) ID'sine göre Pinecone'dan siler."""
+    if not vector_id or not user_id:
+        return
+    delete_memories_by_ids([vector_id], user_id)
+
+def delete_memories_by_ids(vector_ids: List[str], user_id: Optional[str] = None):
+    """
+    Birden fazla anıyı (vektörü) tek bir Pinecone isteğiyle siler.
+
+    Vektörler kullanıcıların namespace'lerinde tutulduğu için `user_id`
+    verilmelidir; verilmezse sadece eski, ortak namespace'ten silinir.
+    """
+    vector_ids = [vector_id for vector_id in vector_ids if vector_id]
+    if not vector_ids:
         return
     try:
-        pinecone_index.delete(ids=[vector_id])
+        get_vector_store().delete(vector_ids, user_id)
     except Exception as e:
         st.error(f"Anı silinirken bir Pinecone hatası oluştu: {e}")
 
+def enqueue_delete_memories(vector_ids: List[str], user_id: Optional[str] = None):
+    """
+    `delete_memories_by_ids`'in arka planda çalışan sürümü.
+
+    `user_id` verilirse silme, aynı kullanıcının daha önce kuyruğa eklenmiş
+    kayıt işlerinden sonra yapılır. Kuyruk doluysa silme işlemi senkron
+    olarak yapılır.
+    """
+    vector_ids = [vector_id for vector_id in vector_ids if vector_id]
+    if not vector_ids:
+        return
+    if not write_queue.enqueue(QUEUE_DELETE, {"vector_ids": vector_ids, "user_id": user_id}, key=user_id):
+        delete_memories_by_ids(vector_ids, user_id)
+
 def delete_user_memory(user_id: str):
     """
     Belirli bir kullanıcıya ait tüm hafıza kayıtlarını (vektörleri) Pinecone'dan siler.
@@ -168,7 +638,50 @@ def delete_user_memory(user_id: str):
         return
     
     try:
-        pinecone_index.delete(filter={"user_id": {"$eq": user_id}})
+        purge_user_memory(user_id)
         st.toast(f"{user_id} için AI hafızası başarıyla temizlendi.", icon="🧠")
     except Exception as e:
-        st.error(f"Kullanıcı hafızasını silerken bir Pinecone hatası oluştu: {e}")
\ No newline at end of file
+        st.error(f"Kullanıcı hafızasını silerken bir Pinecone hatası oluştu: {e}")
+
+def purge_user_memory(user_id: str):
+    """
+    `delete_user_memory`'nin hataları fırlatan sürümü.
+
+    Önce kullanıcının kuyrukta bekleyen hafıza işleri atılır; böylece silme
+    işleminden sonra çalışıp vektörleri geri getiremezler.
+    """
+    write_queue.discard(user_id)
+    get_vector_store().delete_user(user_id)
+
+# --- ARKA PLAN YAZMA KUYRUĞU İŞLEYİCİLERİ ---
+# Kuyruktaki işler bu fonksiyonlarla işlenir. Senkron sürümlerin aksine hataları
+# yutmaz, fırlatırlar; böylece kuyruk başarısız işleri tekrar deneyebilir.
+
+QUEUE_SAVE = "memory.save"  # Tek öğeli eski kayıt işleri; kuyrukta kalmış olanlar için tutulur.
+QUEUE_SAVE_MANY = "memory.save_many"
+QUEUE_DELETE = "memory.delete"
+
+def _handle_queued_save(payload: Dict[str, Any]):
+    item = {"text": payload["text"], "metadata": payload["metadata"], "vector_id": payload["vector_id"]}
+    upsert_vectors(build_vectors(payload["user_id"], [item]))
+
+def _handle_queued_save_many(payload: Dict[str, Any]):
+    vectors = build_vectors(payload["user_id"], payload["items"])
+    _store_vectors(payload["user_id"], vectors, payload.get("admission", False))
+
+def _handle_queued_delete(payload: Dict[str, Any]):
+    get_vector_store().delete(payload["vector_ids"], payload.get("user_id"))
+
+write_queue.register_handler(QUEUE_SAVE, _handle_queued_save)
+write_queue.register_handler(QUEUE_SAVE_MANY, _handle_queued_save_many)
+write_queue.register_handler(QUEUE_DELETE, _handle_queued_delete)
+
+def start_queue_workers():
+    """
+    Önceki çalışmadan kuyrukta kalmış hafıza işlerini işlemeye başlar.
+
+    Modül içe aktarılırken işçi başlatılmaz (CLI komutları ve betikler arka
+    plan thread'i açmaz); uygulama bu fonksiyonu giriş noktasında çağırır.
+    Yeni bir iş kuyruğa eklendiğinde işçiler zaten kendiliğinden başlar.
+    """
+    write_queue.start_workers()
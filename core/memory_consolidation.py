@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+"""
+Hafıza Birleştirme (Memory Consolidation) Modülü.
+
+Her sohbet mesajı hafızaya ayrı bir vektör olarak yazılır; bu yüzden bir
+kullanıcının vektör sayısı ve onunla birlikte arama gecikmesi ve depolama
+maliyeti sürekli artar. Bu modül, belirli bir yaştan eski sohbet vektörlerini
+haftalık özetlere dönüştürür:
+
+1.  Kullanıcının vektörleri listelenir. Sadece sohbet mesajları (`role`
+    "user" veya "ai") ve `min_age_days`'ten eski olanlar ele alınır; günlük
+    ve hedef vektörlerine dokunulmaz.
+2.  Mesajlar ISO haftalarına göre gruplanır ve her grup `get_gemini_response`
+    ile tek bir özete dönüştürülür.
+3.  Özet, tarih aralığıyla birlikte tek bir vektör olarak yazılır; ardından
+    özetlenen mesajların vektörleri silinir.
+
+Özet vektörlerinin ID'si kullanıcı ve haftadan türetilir. Böylece yarıda
+kalan bir çalışma tekrarlandığında aynı özetin üzerine yazılır; o haftaya ait
+yeni mesajlar bulunursa önceki özet de yeni özete dahil edilir.
+
+Tarihi olmayan (bu özellikten önce kaydedilmiş) sohbet vektörlerinin yaşı
+bilinmediği için bunlar atlanır ve raporda `undated` olarak sayılır.
+
+İsteğe bağlı ayarlar `secrets.toml` içinde `[memory_consolidation]` başlığı
+altında verilebilir:
+
+    [memory_consolidation]
+    min_age_days = 30
+    max_workers = 2
+    min_group_size = 3
+"""
+import datetime
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+import streamlit as st
+
+from ai.gemini_client import get_gemini_response
+from core import memory
+
+DEFAULT_SETTINGS = {
+    "min_age_days": 30,   # Bu günden eski sohbet mesajları özetlenir.
+    "max_workers": 2,     # Aynı anda özetlenen en fazla hafta sayısı.
+    "min_group_size": 3,  # Bundan az mesajı olan haftalar özetlenmez.
+}
+CHAT_ROLES = ("user", "ai")
+SUMMARY_TYPE = "chat_summary"
+ROLE_LABELS = {"user": "Kullanıcı", "ai": "MyMindMate"}
+
+_settings: Optional[Dict[str, Any]] = None
+
+
+def get_settings() -> Dict[str, Any]:
+    """Birleştirme ayarlarını döndürür; `[memory_consolidation]` başlığı yoksa varsayılanlar kullanılır."""
+    global _settings
+    if _settings is None:
+        try:
+            overrides = dict(st.secrets.get("memory_consolidation", {}))
+        except FileNotFoundError:
+            overrides = {}
+        _settings = {**DEFAULT_SETTINGS, **overrides}
+    return _settings
+
+
+def _week_key(day: datetime.date) -> str:
+    year, week, _ = day.isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+def _collect_groups(user_id: str, cutoff: datetime.date) -> Dict[str, Any]:
+    """Kullanıcının eski sohbet mesajlarını haftalara göre gruplar."""
+    weeks: Dict[str, Dict[str, Any]] = {}
+    counts = {"scanned": 0, "chat": 0, "undated": 0}
+    for vector in memory.get_vector_store().iter_user(user_id):
+        counts["scanned"] += 1
+        metadata = vector["metadata"]
+        if metadata.get("type") == SUMMARY_TYPE:
+            if metadata.get("week"):
+                weeks.setdefault(metadata["week"], {"messages": [], "summary": None})["summary"] = metadata
+            continue
+        if metadata.get("role") not in CHAT_ROLES or metadata.get("type"):
+            continue
+        counts["chat"] += 1
+        try:
+            day = datetime.date.fromisoformat(metadata["date"])
+        except (KeyError, TypeError, ValueError):
+            counts["undated"] += 1
+            continue
+        if day >= cutoff:
+            continue
+        week = _week_key(day)
+        # Sadece metaveri tutulur; vektör değerlerine ihtiyaç yoktur.
+        weeks.setdefault(week, {"messages": [], "summary": None})["messages"].append(
+            {"id": vector["id"], "metadata": metadata})
+    return {"weeks": weeks, **counts}
+
+
+def _summarize(messages: List[Dict[str, Any]], previous: Optional[Dict[str, Any]],
+               date_from: str, date_to: str) -> str:
+    lines = [f"- [{m['metadata'].get('date')}] {ROLE_LABELS.get(m['metadata'].get('role'), '')}: "
+             f"{m['metadata'].get('text', '')}" for m in messages]
+    previous_block = ""
+    if previous:
+        previous_block = f"Bu hafta için daha önce yazılmış özet (yeni özete dahil et):\n{previous.get('text', '')}\n\n"
+    prompt = (
+        f"Aşağıda bir kullanıcının yapay zeka arkadaşıyla {date_from} - {date_to} tarihleri arasındaki "
+        "sohbet mesajları bulunuyor. Bu mesajları, ileride hatırlanması gereken bilgileri (olaylar, "
+        "duygular, kişiler, planlar ve hedefler) koruyarak kısa bir özet paragrafı hâline getir. "
+        "Sadece mesajlarda geçen bilgileri kullan, yorum ekleme veya bilgi uydurma.\n\n"
+        f"{previous_block}Mesajlar:\n" + "\n".join(lines)
+    )
+    return get_gemini_response(prompt)
+
+
+def _consolidate_week(user_id: str, week: str, group: Dict[str, Any]) -> int:
+    """Bir haftanın mesajlarını özetler, özeti yazar ve mesajları siler. Silinen vektör sayısını döndürür."""
+    messages = sorted(group["messages"], key=lambda m: (m["metadata"].get("date", ""),
+                                                        m["metadata"].get("timestamp", "")))
+    previous = group["summary"]
+    dates = [m["metadata"]["date"] for m in messages]
+    if previous:
+        dates += [previous["date_from"], previous["date_to"]]
+    date_from, date_to = min(dates), max(dates)
+
+    summary = _summarize(messages, previous, date_from, date_to)
+    metadata = {
+        "type": SUMMARY_TYPE,
+        "role": "summary",
+        "date": date_to,  # Sohbet sayfası anıların tarihini bu alandan gösterir.
+        "date_from": date_from,
+        "date_to": date_to,
+        "week": week,
+        # Pinecone sayısal metaverileri ondalıklı sayı olarak döndürür.
+        "source_count": len(messages) + int((previous or {}).get("source_count", 0)),
+    }
+    item = {"text": summary, "metadata": metadata, "vector_id": f"summary-{user_id}-{week}"}
+    # Önce özet yazılır, sonra mesajlar silinir; arada bir hata olursa veri kaybolmaz.
+    memory.upsert_vectors(memory.build_vectors(user_id, memory.prepare_items([item])))
+    memory.get_vector_store().delete([m["id"] for m in messages], user_id)
+    return len(messages)
+
+
+def consolidate_user_memory(user_id: str, dry_run: bool = False, min_age_days: Optional[int] = None,
+                            max_workers: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Kullanıcının eski sohbet vektörlerini haftalık özetlere dönüştürür.
+
+    Args:
+        dry_run: True ise hiçbir şey yazılmaz veya silinmez; sadece yapılacak
+            işlem ve beklenen vektör tasarrufu raporlanır.
+        min_age_days, max_workers: Verilmezse ayarlardaki değerler kullanılır.
+
+    Returns:
+        dict: `scanned` (listelenen vektörler), `chat` (sohbet mesajları),
+        `undated` (tarihi olmadığı için atlananlar), `weeks` (özetlenecek
+        haftalar), `eligible` (özetlenecek mesajlar), `projected_savings`
+        (işlem sonunda eksilecek vektör sayısı), `deleted` ve `errors`.
+    """
+    settings = get_settings()
+    min_age_days = int(settings["min_age_days"] if min_age_days is None else min_age_days)
+    max_workers = int(settings["max_workers"] if max_workers is None else max_workers)
+    cutoff = datetime.date.today() - datetime.timedelta(days=min_age_days)
+
+    collected = _collect_groups(user_id, cutoff)
+    min_group_size = int(settings["min_group_size"])
+    # Daha önce özetlenmiş haftalarda tek bir yeni mesaj bile özete eklenmeye değer.
+    groups = {week: group for week, group in collected["weeks"].items()
+              if group["messages"] and (group["summary"] or len(group["messages"]) >= min_group_size)}
+    eligible = sum(len(group["messages"]) for group in groups.values())
+    new_summaries = sum(1 for group in groups.values() if not group["summary"])
+    report = {
+        "scanned": collected["scanned"],
+        "chat": collected["chat"],
+        "undated": collected["undated"],
+        "weeks": len(groups),
+        "eligible": eligible,
+        "projected_savings": eligible - new_summaries,
+        "deleted": 0,
+        "errors": [],
+    }
+    if dry_run or not groups:
+        return report
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="memory-consolidation") as executor:
+        futures = {week: executor.submit(_consolidate_week, user_id, week, group) for week, group in groups.items()}
+        for week, future in futures.items():
+            try:
+                report["deleted"] += future.result()
+            except Exception as e:
+                report["errors"].append(f"{week}: {e}")
+    return report
@@ -0,0 +1,257 @@
+# -*- coding: utf-8 -*-
+"""
+Hafıza Yeniden İndeksleme (Reindex) Modülü.
+
+Günlük ve hedef vektörleri normalde sadece ilgili form gönderildiğinde yazılır.
+Pinecone index'i kaybolursa veya embedding modeli değişirse hafızanın
+Firebase'deki verilerden yeniden oluşturulması gerekir. Bu modül bunu toplu
+olarak yapar:
+
+- **Akışlı Okuma:** `users/{uid}/journals` ve `goals` düğümleri
+  `firebase_db.iter_user_days` ile tarih aralıkları hâlinde okunur; bir
+  kullanıcının tüm geçmişi tek seferde belleğe alınmaz.
+- **Toplu ve Hız Sınırlı Embedding:** Öğeler `batch_size`'lık gruplar hâlinde
+  embed edilir. Her Gemini isteği, dakikadaki istek sınırına uyan bir
+  zamanlayıcıdan (`RateLimiter`) geçer; Gemini kota hatası (429) döndürürse
+  istek hızı yarıya indirilir, istek beklenip tekrarlanır ve hız başarılı
+  isteklerle kademeli olarak geri yükseltilir.
+- **Aynı ID'ler:** Vektör ID'leri, sayfaların kullandığı Firebase push
+  ID'leridir; yeniden indeksleme mevcut vektörlerin üzerine yazar ve hedef
+  tamamlandığında yapılan silmeler aynı vektörleri bulur.
+- **Sürdürülebilir:** Her kullanıcı ve düğüm için tamamlanan son tarih bir
+  JSON dosyasına (checkpoint) yazılır; yarıda kalan iş kaldığı yerden devam eder.
+- **İzlenebilir:** İlerleme, saniyedeki öğe sayısıyla birlikte raporlanır.
+
+Sadece tamamlanmamış hedefler indekslenir; sayfalar tamamlanan hedefleri
+hafızadan siler.
+
+İsteğe bağlı ayarlar `secrets.toml` içinde `[memory_reindex]` başlığı altında
+verilebilir:
+
+    [memory_reindex]
+    checkpoint = ".mymindmate/reindex.json"
+    requests_per_minute = 120
+    batch_size = 100
+"""
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import streamlit as st
+from google.api_core import exceptions as google_exceptions
+
+from core import firebase_db, memory, resilience
+
+DEFAULT_SETTINGS = {
+    "checkpoint": os.path.join(".mymindmate", "reindex.json"),
+    "requests_per_minute": 120,
+    "batch_size": memory.EMBED_BATCH_SIZE,
+}
+NODES = ("journals", "goals")
+MAX_THROTTLE_RETRIES = 8
+# Kota hatasından sonra ilk bekleme (saniye); her tekrar denemede iki katına çıkar.
+THROTTLE_BASE_DELAY = 2.0
+THROTTLE_MAX_DELAY = 60.0
+# Art arda kota hataları Gemini'nin devresini de açabilir (bkz. `core.resilience`);
+# bu durumda da aynı şekilde beklenip tekrar denenir.
+RATE_LIMIT_ERRORS = (google_exceptions.ResourceExhausted, google_exceptions.TooManyRequests,
+                     resilience.CircuitOpenError)
+
+_settings: Optional[Dict[str, Any]] = None
+
+
+def get_settings() -> Dict[str, Any]:
+    """Yeniden indeksleme ayarlarını döndürür; `[memory_reindex]` başlığı yoksa varsayılanlar kullanılır."""
+    global _settings
+    if _settings is None:
+        try:
+            overrides = dict(st.secrets.get("memory_reindex", {}))
+        except FileNotFoundError:
+            overrides = {}
+        _settings = {**DEFAULT_SETTINGS, **overrides}
+    return _settings
+
+
+class RateLimiter:
+    """
+    İstekleri dakikadaki istek sınırına göre aralıklarla başlatan zamanlayıcı.
+
+    Kota hatası alındığında (`throttled`) hız yarıya iner; her başarılı
+    istekte (`succeeded`) sınırın %5'i kadar geri yükselir.
+    """
+
+    def __init__(self, requests_per_minute: float):
+        self.max_rate = requests_per_minute / 60.0
+        self.rate = self.max_rate
+        self._next = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Bir sonraki istek zamanı gelene kadar bekler."""
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + 1.0 / self.rate
+        if start > now:
+            time.sleep(start - now)
+
+    def succeeded(self):
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.max_rate * 0.05)
+
+    def throttled(self, attempt: int) -> float:
+        """Hızı düşürür ve tekrar denemeden önce beklenmesi gereken süreyi döndürür."""
+        with self._lock:
+            self.rate = max(self.max_rate / 16, self.rate / 2)
+        return min(THROTTLE_BASE_DELAY * (2 ** attempt), THROTTLE_MAX_DELAY)
+
+
+def embed_with_limit(limiter: RateLimiter, user_id: str, items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Öğelerin vektörlerini (tek bir Gemini isteğiyle) hız sınırına uyarak hazırlar."""
+    for attempt in range(MAX_THROTTLE_RETRIES):
+        limiter.acquire()
+        try:
+            vectors = memory.build_vectors(user_id, items)
+        except RATE_LIMIT_ERRORS:
+            time.sleep(limiter.throttled(attempt))
+            continue
+        limiter.succeeded()
+        return vectors
+    raise RuntimeError(f"Gemini kota hatası {MAX_THROTTLE_RETRIES} denemede düzelmedi.")
+
+
+def _journal_items(day: str, entries: dict) -> List[Dict[str, Any]]:
+    # Metaveri, Günlüğüm sayfasının kaydettiğiyle aynıdır; içe aktarılan
+    # girdiler Firebase'de sakladıkları kaynakla yazılır.
+    return [
+        {"text": entry["text"], "vector_id": entry_id,
+         "metadata": {"type": "journal_entry", "date": day, "source": entry.get("source") or "Günlüğüm Sayfası"}}
+        for entry_id, entry in entries.items()
+        if isinstance(entry, dict) and entry.get("text")
+    ]
+
+
+def _goal_items(day: str, day_goals: dict) -> List[Dict[str, Any]]:
+    # Metaveri, Hedeflerim sayfasının kaydettiğiyle aynıdır.
+    pending = day_goals.get("pending")
+    if not isinstance(pending, dict):
+        return []
+    items = []
+    for goal_id, details in pending.items():
+        if not isinstance(details, dict) or details.get("is_checked") is True:
+            continue
+        text = (details.get("goal") or "").strip()
+        if not text:
+            continue
+        metadata = {"type": "goal", "goal_type": details.get("type"), "date": day, "source": "Hedeflerim Sayfası"}
+        # Pinecone boş (None) metaveri değerlerini kabul etmez.
+        items.append({"text": text, "vector_id": goal_id,
+                      "metadata": {key: value for key, value in metadata.items() if value is not None}})
+    return items
+
+
+_ITEM_BUILDERS = {"journals": _journal_items, "goals": _goal_items}
+
+
+def load_checkpoint(path: str) -> Dict[str, Any]:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {"users": {}}
+
+
+def reset_checkpoint(path: str, user_ids: Optional[Iterable[str]] = None):
+    """
+    Kayıtlı ilerlemeyi siler; `user_ids` verilirse sadece o kullanıcılarınkini.
+
+    Diğer kullanıcıların ilerlemesi korunur; böylece tek bir kullanıcı için
+    yeniden indeksleme, tüm kullanıcıları baştan işletmez.
+    """
+    if user_ids is None:
+        if os.path.exists(path):
+            os.remove(path)
+        return
+    state = load_checkpoint(path)
+    for user_id in user_ids:
+        state["users"].pop(user_id, None)
+    save_checkpoint(path, state)
+
+
+def save_checkpoint(path: str, state: Dict[str, Any]):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    temp = f"{path}.tmp"
+    with open(temp, "w", encoding="utf-8") as f:
+        json.dump(state, f)
+    os.replace(temp, path)
+
+
+def reindex_users(user_ids: Iterable[str], id_token: Optional[str], checkpoint_path: Optional[str] = None,
+                  requests_per_minute: Optional[float] = None,
+                  on_progress: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+    """
+    Kullanıcıların günlük ve hedeflerini Firebase'den okuyup hafızaya yeniden yazar.
+
+    Kontrol noktasında tamamlanmış görünen kullanıcılar atlanır; yarıda
+    kalmış olanlar son tamamlanan tarihten sonrasıyla devam eder.
+
+    Args:
+        on_progress: Her toplu yazmadan sonra `{"user_id", "node", "date",
+            "items", "elapsed", "items_per_second"}` sözlüğüyle çağrılır.
+
+    Returns:
+        dict: `users` (işlenen kullanıcı sayısı), `items` (yazılan öğe
+        sayısı), `elapsed` (saniye) ve `items_per_second`.
+    """
+    settings = get_settings()
+    checkpoint_path = checkpoint_path or settings["checkpoint"]
+    limiter = RateLimiter(float(requests_per_minute or settings["requests_per_minute"]))
+    batch_size = min(int(settings["batch_size"]), memory.EMBED_BATCH_SIZE)
+    state = load_checkpoint(checkpoint_path)
+    started = time.monotonic()
+    totals = {"users": 0, "items": 0}
+
+    def report(user_id: str, node: str, day: Optional[str]) -> Dict[str, Any]:
+        elapsed = time.monotonic() - started
+        return {"user_id": user_id, "node": node, "date": day, "items": totals["items"],
+                "elapsed": elapsed, "items_per_second": totals["items"] / elapsed if elapsed else 0.0}
+
+    for user_id in user_ids:
+        progress = state["users"].setdefault(user_id, {"done": False, "items": 0})
+        if progress["done"]:
+            continue
+        for node in NODES:
+            pending: List[Dict[str, Any]] = []
+            last_day = None
+
+            def flush():
+                for i in range(0, len(pending), batch_size):
+                    vectors = embed_with_limit(limiter, user_id, pending[i:i + batch_size])
+                    memory.upsert_vectors(vectors)
+                    totals["items"] += len(vectors)
+                    progress["items"] += len(vectors)
+                # Sadece tüm öğeleri yazılmış günler tamamlanmış sayılır.
+                progress[node] = last_day
+                save_checkpoint(checkpoint_path, state)
+                pending.clear()
+                if on_progress:
+                    on_progress(report(user_id, node, last_day))
+
+            for day, value in firebase_db.iter_user_days(user_id, node, id_token, after=progress.get(node)):
+                pending.extend(memory.prepare_items(_ITEM_BUILDERS[node](day, value)))
+                last_day = day
+                if len(pending) >= batch_size:
+                    flush()
+            if last_day is not None and (pending or progress.get(node) != last_day):
+                flush()
+        progress["done"] = True
+        save_checkpoint(checkpoint_path, state)
+        totals["users"] += 1
+
+    result = report("", "", None)
+    return {"users": totals["users"], "items": totals["items"], "elapsed": result["elapsed"],
+            "items_per_second": result["items_per_second"]}
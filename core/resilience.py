@@ -0,0 +1,309 @@
+# -*- coding: utf-8 -*-
+"""
+Dış Servis Dayanıklılığı (Resilience) Modülü.
+
+Gemini, Pinecone ve Firebase'e yapılan istekler bu modüldeki `call`
+fonksiyonu üzerinden yapılır. Yavaşlayan veya hata veren bir servisin tüm
+Streamlit betiğini kilitlemesini engellemek için her servise (dependency)
+ayrı bir politika uygulanır:
+
+- **Zaman Aşımı:** İstek, servisin iş parçacığı havuzunda çalıştırılır ve
+  `timeout` saniyede tamamlanmazsa `CallTimeout` fırlatılır. Kütüphanenin
+  kendisi beklemeye devam etse bile sayfa beklemez.
+- **Tekrar Deneme:** Geçici hatalar (zaman aşımı, bağlantı hatası, 429 ve 5xx)
+  `retries` kez, her seferinde rastgele (jitter) ve üstel olarak artan bir
+  beklemeyle tekrar denenir. İzin, yetki veya geçersiz istek gibi kalıcı
+  hatalar hemen fırlatılır.
+- **Devre Kesici (Circuit Breaker):** Art arda `failure_threshold` geçici
+  hata alınan servis `reset_timeout` saniye boyunca "açık" sayılır; bu sürede
+  istekler servise gönderilmeden `CircuitOpenError` ile hemen reddedilir.
+  Süre dolunca tek bir deneme isteğine izin verilir; başarılı olursa devre
+  kapanır.
+- **Yedekli İstek (Hedging):** `hedge=True` ile çağrılan okumalar (örn:
+  hafıza araması, profil okuma) `hedge_after` saniye içinde yanıt vermezse,
+  aynı istek bir kez daha gönderilir ve önce gelen yanıt kullanılır. Sadece
+  tekrarlanması güvenli (idempotent) okumalarda kullanılmalıdır.
+  `hedge_after = 0` (varsayılan) bu özelliği kapatır.
+- **İzlenebilir:** `get_dependency_stats()` her servis için istek, hata,
+  tekrar deneme, zaman aşımı ve reddedilen istek sayılarını, devre durumunu ve
+  son isteklerin gecikme yüzdeliklerini (p50/p95/p99) döndürür.
+
+Politikalar `secrets.toml` içinde `[resilience.<servis>]` başlıkları altında
+değiştirilebilir:
+
+    [resilience.pinecone]
+    timeout = 5
+    retries = 2
+    hedge_after = 0.3
+"""
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Deque, Dict, List, Optional, TypeVar
+
+import requests
+import streamlit as st
+import urllib3
+from google.api_core import exceptions as google_exceptions
+
+T = TypeVar("T")
+
+GEMINI = "gemini"
+PINECONE = "pinecone"
+FIREBASE = "firebase"
+
+_BASE_POLICY = {
+    "timeout": 10.0,          # Saniye. Bir denemenin en uzun süresi.
+    "retries": 2,             # Geçici hatalardan sonra yapılacak en fazla tekrar deneme.
+    "base_delay": 0.5,        # Saniye. İlk tekrar denemeden önceki en uzun bekleme.
+    "max_delay": 8.0,         # Saniye. Tekrar denemeler arası en uzun bekleme.
+    "failure_threshold": 5,   # Devreyi açan art arda geçici hata sayısı.
+    "reset_timeout": 30.0,    # Saniye. Açık devrenin yeni bir denemeye izin vermeden önce beklediği süre.
+    "hedge_after": 0.0,       # Saniye. Yedekli isteğin gönderileceği süre; 0 kapalıdır.
+    "max_workers": 16,        # Servis başına aynı anda çalışabilecek en fazla istek.
+}
+DEFAULT_POLICIES = {
+    # Uzun yanıtların üretilmesi zaman alabildiği için Gemini'nin süresi daha uzundur.
+    GEMINI: {**_BASE_POLICY, "timeout": 60.0, "retries": 3},
+    PINECONE: {**_BASE_POLICY, "timeout": 5.0},
+    FIREBASE: {**_BASE_POLICY, "timeout": 15.0},
+}
+LATENCY_WINDOW = 1000  # Gecikme yüzdelikleri için saklanan son istek sayısı.
+COUNTERS = ("calls", "successes", "failures", "retries", "timeouts", "rejected", "hedged", "hedge_wins")
+
+TRANSIENT_ERRORS = (
+    TimeoutError,
+    ConnectionError,
+    requests.ConnectionError,
+    requests.Timeout,
+    urllib3.exceptions.HTTPError,
+    google_exceptions.TooManyRequests,
+    google_exceptions.ResourceExhausted,
+    google_exceptions.ServerError,
+)
+
+
+class CallTimeout(TimeoutError):
+    """Bir istek, servisin politikasındaki süre içinde tamamlanmadı."""
+
+
+class CircuitOpenError(RuntimeError):
+    """Servisin devresi açık; istek gönderilmeden reddedildi."""
+
+
+def _status_code(error: BaseException) -> Optional[int]:
+    # Pinecone hataları `status`, requests hataları `response` taşır. Pyrebase
+    # ise asıl HTTP hatasını yeni bir `HTTPError`'ın ilk argümanı olarak sarar.
+    for candidate in (error, *(arg for arg in getattr(error, "args", ()) if isinstance(arg, BaseException))):
+        status = getattr(candidate, "status", None)
+        if isinstance(status, int):
+            return status
+        response = getattr(candidate, "response", None)
+        if response is not None and isinstance(getattr(response, "status_code", None), int):
+            return response.status_code
+    return None
+
+
+def is_transient(error: BaseException) -> bool:
+    """Hatanın tekrar denemeye değer (geçici) bir hata olup olmadığını döndürür."""
+    if isinstance(error, CircuitOpenError):
+        return False
+    if isinstance(error, TRANSIENT_ERRORS):
+        return True
+    status = _status_code(error)
+    return status is not None and (status == 429 or status >= 500)
+
+
+class _Dependency:
+    """Bir servisin politikası, devre kesici durumu, iş parçacığı havuzu ve istatistikleri."""
+
+    def __init__(self, name: str, policy: Dict[str, Any]):
+        self.name = name
+        self.policy = policy
+        self.executor = ThreadPoolExecutor(max_workers=int(policy["max_workers"]),
+                                           thread_name_prefix=f"resilience-{name}")
+        self.lock = threading.Lock()
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self.trial_running = False
+        self.counters = dict.fromkeys(COUNTERS, 0)
+        self.latencies: Deque[float] = deque(maxlen=LATENCY_WINDOW)
+
+    def count(self, counter: str, amount: int = 1):
+        with self.lock:
+            self.counters[counter] += amount
+
+    # --- Devre kesici ---
+
+    def allow(self) -> bool:
+        """Devre kapalıysa veya açık devrenin deneme zamanı geldiyse isteğe izin verir."""
+        with self.lock:
+            if self.opened_at is None:
+                return True
+            if self.trial_running or time.monotonic() - self.opened_at < self.policy["reset_timeout"]:
+                return False
+            self.trial_running = True
+            return True
+
+    def record_success(self, latency: float):
+        with self.lock:
+            self.consecutive_failures = 0
+            self.opened_at = None
+            self.trial_running = False
+            self.latencies.append(latency)
+
+    def record_failure(self, transient: bool):
+        with self.lock:
+            self.trial_running = False
+            if not transient:
+                # Kalıcı hatalar (örn: 403, 400) servisin yanıt verdiğini gösterir.
+                self.consecutive_failures = 0
+                self.opened_at = None
+                return
+            self.consecutive_failures += 1
+            if self.opened_at is not None or self.consecutive_failures >= self.policy["failure_threshold"]:
+                self.opened_at = time.monotonic()
+
+    def state(self) -> str:
+        with self.lock:
+            if self.opened_at is None:
+                return "closed"
+            if time.monotonic() - self.opened_at >= self.policy["reset_timeout"]:
+                return "half_open"
+            return "open"
+
+    # --- Tek deneme ---
+
+    def attempt(self, fn: Callable[..., T], args, kwargs, hedge: bool) -> T:
+        """İsteği (gerekirse yedekli olarak) bir kez çalıştırır ve zaman aşımını uygular."""
+        timeout = float(self.policy["timeout"])
+        hedge_after = float(self.policy["hedge_after"])
+        started = time.monotonic()
+        futures: List[Future] = [self.executor.submit(fn, *args, **kwargs)]
+        if hedge and 0 < hedge_after < timeout:
+            done, _ = wait(futures, timeout=hedge_after)
+            if not done:
+                self.count("hedged")
+                futures.append(self.executor.submit(fn, *args, **kwargs))
+
+        error: Optional[BaseException] = None
+        pending = set(futures)
+        while pending:
+            remaining = timeout - (time.monotonic() - started)
+            if remaining <= 0:
+                break
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is not futures[0]:
+                        self.count("hedge_wins")
+                    return future.result()
+                error = error or future.exception()
+        for future in pending:
+            future.cancel()
+        if error is not None and not pending:
+            raise error
+        self.count("timeouts")
+        raise CallTimeout(f"{self.name} isteği {timeout:g} saniyede tamamlanmadı.")
+
+    def stats(self) -> Dict[str, Any]:
+        with self.lock:
+            stats: Dict[str, Any] = dict(self.counters)
+            latencies = sorted(self.latencies)
+        stats["state"] = self.state()
+        for name, quantile in (("p50", 0.50), ("p95", 0.95), ("p99", 0.99)):
+            value = None
+            if latencies:
+                value = latencies[min(len(latencies) - 1, int(quantile * len(latencies)))]
+            stats[f"latency_{name}"] = value
+        return stats
+
+
+_dependencies: Dict[str, _Dependency] = {}
+_dependencies_lock = threading.Lock()
+
+
+def get_policy(name: str) -> Dict[str, Any]:
+    """Bir servisin politikasını döndürür; `[resilience.<servis>]` başlığı yoksa varsayılanlar kullanılır."""
+    try:
+        overrides = dict(st.secrets.get("resilience", {}).get(name, {}))
+    except FileNotFoundError:
+        overrides = {}
+    return {**DEFAULT_POLICIES.get(name, _BASE_POLICY), **overrides}
+
+
+def _get_dependency(name: str) -> _Dependency:
+    with _dependencies_lock:
+        if name not in _dependencies:
+            _dependencies[name] = _Dependency(name, get_policy(name))
+        return _dependencies[name]
+
+
+def call(dependency: str, fn: Callable[..., T], *args, retry: bool = True, hedge: bool = False, **kwargs) -> T:
+    """
+    `fn(*args, **kwargs)` çağrısını servisin politikasına göre yapar.
+
+    Args:
+        dependency: Servis adı (`GEMINI`, `PINECONE` veya `FIREBASE`).
+        retry: False ise geçici hatalarda tekrar denenmez; tekrarlanması
+            güvenli olmayan yazmalar (örn: sayaç artırma) için kullanılır.
+        hedge: True ise istek yavaş kaldığında yedek bir istek gönderilir;
+            sadece idempotent okumalar için kullanılmalıdır.
+
+    Raises:
+        CircuitOpenError: Servisin devresi açıksa.
+        CallTimeout: İstek zaman aşımına uğradıysa (ve tekrar denemeler bittiyse).
+        Exception: `fn`'in fırlattığı son hata.
+    """
+    dep = _get_dependency(dependency)
+    retries = int(dep.policy["retries"]) if retry else 0
+    attempt = 0
+    while True:
+        if not dep.allow():
+            dep.count("rejected")
+            raise CircuitOpenError(f"{dependency} geçici olarak devre dışı (art arda hatalar).")
+        dep.count("calls")
+        started = time.monotonic()
+        try:
+            result = dep.attempt(fn, args, kwargs, hedge)
+        except Exception as e:
+            transient = is_transient(e)
+            dep.record_failure(transient)
+            dep.count("failures")
+            if not transient or attempt >= retries:
+                raise
+            dep.count("retries")
+            # Tam jitter: bekleme, 0 ile üstel olarak artan sınır arasında rastgele seçilir.
+            ceiling = min(float(dep.policy["max_delay"]), float(dep.policy["base_delay"]) * (2 ** attempt))
+            time.sleep(random.uniform(0, ceiling))
+            attempt += 1
+            continue
+        dep.record_success(time.monotonic() - started)
+        dep.count("successes")
+        return result
+
+
+def get_dependency_stats() -> Dict[str, Dict[str, Any]]:
+    """
+    Bu işlemde kullanılan her servisin istatistiklerini döndürür.
+
+    Returns:
+        dict: Servis adına göre `calls`, `successes`, `failures`, `retries`,
+        `timeouts`, `rejected` (açık devre nedeniyle), `hedged` (gönderilen
+        yedek istekler), `hedge_wins` (yedeğin önce yanıt verdiği istekler),
+        `state` ("closed", "open" veya "half_open") ve saniye cinsinden
+        `latency_p50`/`latency_p95`/`latency_p99`.
+    """
+    with _dependencies_lock:
+        dependencies = list(_dependencies.values())
+    return {dep.name: dep.stats() for dep in dependencies}
+
+
+def reset():
+    """Devre durumlarını, istatistikleri ve politikaları sıfırlar (ayarlar değiştiğinde veya testlerde)."""
+    with _dependencies_lock:
+        for dep in _dependencies.values():
+            dep.executor.shutdown(wait=False)
+        _dependencies.clear()
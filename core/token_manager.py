@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+"""
+Oturum Token Yönetimi Modülü.
+
+Firebase'in verdiği `idToken` bir saat geçerlidir. Bu modül, giriş sırasında
+alınan `refreshToken`'ı saklar ve etkin kullanıcıların `idToken`'ını süresi
+dolmadan önce arka planda yeniler. Böylece kullanıcı bir saat sonra yeniden
+giriş yapmak zorunda kalmaz.
+
+Sayfalar, oturumda saklanan (giriş anındaki) token'ı kullanmaya devam eder;
+`core.firebase_db` her işlemde bu token'ı `current_token` ile güncel token'a
+çevirir. Sadece bu modülün verdiği veya yenilediği token'lar çevrilir;
+tanınmayan bir token olduğu gibi kullanılır. Giriş token'ları oturum boyunca
+(kaç kez yenilenirse yenilensin) tanınır; yenilenen token'lardan ise sadece
+son birkaçı tutulur.
+
+Token'lar sadece bu işlemin (process) belleğinde tutulur; uygulama yeniden
+başlatılırsa kullanıcının yeniden giriş yapması gerekir.
+"""
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Deque, Dict, Optional, Set
+
+from pyrebase.pyrebase import raise_detailed_error
+
+from core.firebase_config import get_firebase_app
+
+SECURE_TOKEN_URL = "https://securetoken.googleapis.com/v1/token"
+REFRESH_MARGIN = 300.0      # Saniye. Token, süresinin dolmasına bu kadar kala yenilenir.
+IDLE_SECONDS = 7200.0       # Bu süre boyunca kullanılmayan oturumlar arka planda yenilenmez.
+CHECK_INTERVAL = 30.0       # Saniye. Arka plan yenileyicinin kontrol aralığı.
+KNOWN_TOKENS = 8            # Bir kullanıcı için güncel token'a çevrilebilecek eski (yenilenmiş) token sayısı.
+
+_sessions: Dict[str, "_Session"] = {}
+_sessions_lock = threading.Lock()
+_refresher_started = False
+
+
+@dataclass
+class _Session:
+    id_token: str
+    refresh_token: str
+    expires_at: float
+    last_used: float = field(default_factory=time.monotonic)
+    # Sayfaların `st.session_state`'te sakladığı giriş token'ları; hiçbir zaman düşürülmez.
+    login_tokens: Set[str] = field(default_factory=set)
+    known_tokens: Deque[str] = field(default_factory=lambda: deque(maxlen=KNOWN_TOKENS))
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+def register(user_id: str, id_token: str, refresh_token: str, expires_in) -> None:
+    """
+    Giriş veya kayıt yanıtındaki token'ları saklar ve arka plan yenileyiciyi başlatır.
+
+    Args:
+        expires_in: `idToken`'ın geçerlilik süresi (saniye); Firebase bunu metin olarak döndürür.
+    """
+    session = _Session(id_token, refresh_token, time.monotonic() + float(expires_in))
+    session.login_tokens.add(id_token)
+    with _sessions_lock:
+        previous = _sessions.get(user_id)
+        if previous is not None:
+            # Aynı kullanıcının diğer oturumlarındaki token'lar da güncel token'a çevrilir.
+            session.login_tokens.update(previous.login_tokens)
+            for token in previous.known_tokens:
+                session.known_tokens.append(token)
+        _sessions[user_id] = session
+    _ensure_refresher()
+
+
+def forget(user_id: str) -> None:
+    """Kullanıcının saklanan token'larını siler (örn: hesap silindiğinde)."""
+    with _sessions_lock:
+        _sessions.pop(user_id, None)
+
+
+def current_token(user_id: str, id_token: Optional[str]) -> Optional[str]:
+    """
+    Verilen token'ı, kullanıcının güncel `idToken`'ına çevirir.
+
+    Token'ın süresi dolmak üzereyse (örn: oturum arka planda yenilenmeyecek
+    kadar uzun süre boşta kaldıysa) önce senkron olarak yenilenir. Token bu
+    modül tarafından tanınmıyorsa olduğu gibi döndürülür.
+    """
+    if not user_id or not id_token:
+        return id_token
+    with _sessions_lock:
+        session = _sessions.get(user_id)
+    if session is None or (id_token not in session.login_tokens
+                           and id_token not in session.known_tokens):
+        return id_token
+    session.last_used = time.monotonic()
+    if session.expires_at - time.monotonic() < REFRESH_MARGIN:
+        _refresh(user_id, session)
+    return session.id_token
+
+
+def _refresh(user_id: str, session: _Session) -> None:
+    """Oturumun `idToken`'ını `refreshToken` ile yeniler; aynı anda tek bir yenileme yapılır."""
+    with session.lock:
+        if session.expires_at - time.monotonic() >= REFRESH_MARGIN:
+            return  # Başka bir thread az önce yeniledi.
+        firebase_app = get_firebase_app()
+        try:
+            response = firebase_app.requests.post(
+                f"{SECURE_TOKEN_URL}?key={firebase_app.api_key}",
+                data={"grant_type": "refresh_token", "refresh_token": session.refresh_token},
+            )
+            raise_detailed_error(response)
+        except Exception as e:
+            err = str(e)
+            print(f"Token yenilenemedi ({user_id}): {err}")
+            if "TOKEN_EXPIRED" in err or "USER_DISABLED" in err or "USER_NOT_FOUND" in err:
+                # Yenileme token'ı artık geçersiz; kullanıcı yeniden giriş yapmalı.
+                forget(user_id)
+            return
+        data = response.json()
+        session.id_token = data["id_token"]
+        session.refresh_token = data["refresh_token"]
+        session.expires_at = time.monotonic() + float(data["expires_in"])
+        session.known_tokens.append(session.id_token)
+
+
+def _refresh_loop() -> None:
+    while True:
+        time.sleep(CHECK_INTERVAL)
+        now = time.monotonic()
+        with _sessions_lock:
+            due = [(uid, s) for uid, s in _sessions.items()
+                   if s.expires_at - now < REFRESH_MARGIN + CHECK_INTERVAL
+                   and now - s.last_used < IDLE_SECONDS]
+        for user_id, session in due:
+            _refresh(user_id, session)
+
+
+def _ensure_refresher() -> None:
+    global _refresher_started
+    if _refresher_started:
+        return
+    with _sessions_lock:
+        if _refresher_started:
+            return
+        threading.Thread(target=_refresh_loop, name="token-refresher", daemon=True).start()
+        _refresher_started = True
@@ -0,0 +1,582 @@
+# -*- coding: utf-8 -*-
+"""
+Vektör Deposu (Vector Store) Arka Uçları Modülü.
+
+`core.memory`, hafıza vektörlerine doğrudan Pinecone üzerinden değil, bu
+modüldeki `VectorStore` arayüzü üzerinden erişir:
+
+- **PineconeStore:** Varsayılan arka uç. Vektörleri Pinecone index'inde,
+  her kullanıcı için ayrı bir namespace'te tutar.
+- **LocalStore:** Her kullanıcının vektörlerini tek, bitişik bir `float32`
+  NumPy matrisinde tutar ve kosinüs benzerliğiyle tam (exact) arama yapar.
+  Ağ gerektirmez; çevrimdışı geliştirme, testler ve benchmark'lar için
+  Pinecone'un yerine kullanılabilir. `path` verilirse her kullanıcının
+  matrisi diske yazılır ve başka bir işlemin (process) yaptığı değişiklikler
+  dosya değişim zamanından anlaşılarak yeniden yüklenir.
+- **CachedStore:** Pinecone'un önünde okuma önbelleği (hot tier) olarak
+  çalışır. Bir kullanıcının ilk aramasında tüm vektörleri Pinecone'dan bir
+  kez çekilir ve sonraki aramalar `hot_ttl` süresince yerelde yapılır.
+  Yazmalar her iki katmana da uygulanır. Vektör sayısı `hot_limit`'i aşan
+  kullanıcılar önbelleğe alınmaz ve doğrudan Pinecone'da aranır.
+
+Arka uç, `secrets.toml` içinde `[vector_store]` başlığı altında seçilir:
+
+    [vector_store]
+    backend = "cached"           # "pinecone" (varsayılan), "local" veya "cached"
+    path = ".mymindmate/vectors" # Sadece "local" için; verilmezse vektörler sadece bellekte tutulur.
+    hot_ttl = 300                # Sadece "cached" için; saniye.
+    legacy_namespace = false     # Sadece yükseltmede: geçiş bitene kadar eski, ortak namespace'e de bakılır.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+import streamlit as st
+
+from core import resilience
+
+DEFAULT_STORE = "pinecone"
+DEFAULT_HOT_TTL = 300.0
+HOT_LIMIT = 1000  # Pinecone'un değerlerle birlikte döndürebildiği en fazla sonuç sayısı.
+
+
+class VectorStore(ABC):
+    """
+    `core.memory`'nin ihtiyaç duyduğu vektör işlemlerinin arayüzü.
+
+    Vektörler `{"id": str, "values": list[float], "metadata": dict}`
+    biçimindedir; `metadata["user_id"]` vektörün sahibini belirtir.
+    """
+
+    @abstractmethod
+    def upsert(self, vectors: List[Dict[str, Any]]):
+        """Vektörleri ekler; aynı ID'ye sahip vektörlerin üzerine yazar."""
+
+    @abstractmethod
+    def query(self, user_id: str, vector: List[float], top_k: int) -> List[Dict[str, Any]]:
+        """
+        Kullanıcının vektörleri arasında sorguya en benzer `top_k` tanesini bulur.
+
+        Returns:
+            list: Benzerliğe göre azalan sırada `{"id", "score", "metadata"}` sözlükleri.
+        """
+
+    @abstractmethod
+    def delete(self, ids: List[str], user_id: Optional[str] = None):
+        """Vektörleri ID'lerine göre siler; `user_id` biliniyorsa arama o kullanıcıyla sınırlanır."""
+
+    @abstractmethod
+    def delete_user(self, user_id: str):
+        """Bir kullanıcıya ait tüm vektörleri siler."""
+
+    @abstractmethod
+    def iter_user(self, user_id: str) -> Iterator[Dict[str, Any]]:
+        """Kullanıcının tüm vektörlerini `{"id", "values", "metadata"}` sözlükleri olarak döndürür."""
+
+
+LEGACY_NAMESPACE = ""  # Namespace'lerden önceki, tüm kullanıcıların ortak (varsayılan) namespace'i.
+MIGRATION_CHECKPOINT = os.path.join(".mymindmate", "namespace_migration.json")
+LIST_BATCH_SIZE = 100  # Pinecone'un `list` ve `upsert` istekleri için önerilen parça boyutu.
+
+
+class PineconeStore(VectorStore):
+    """
+    Vektörleri Pinecone index'inde, her kullanıcı için ayrı bir namespace'te tutan arka uç.
+
+    Aramalar ve silmeler doğrudan kullanıcının namespace'ine gönderilir;
+    index büyüdükçe yavaşlayan metaveri filtreleri kullanılmaz.
+
+    Namespace'lerden önce tüm vektörler varsayılan namespace'te, `user_id`
+    metaverisiyle tutuluyordu. `legacy_namespace` açıkken namespace'i boş
+    olan kullanıcılar için eski yerde de (ek bir filtreli sorguyla) arama
+    yapılır ve silmeler eski yere de uygulanır. Yeni kurulumlarda eski yer
+    boş olduğundan varsayılan olarak kapalıdır; yükseltilen kurulumlarda
+    eski vektörler `migrate_legacy_namespace` ile taşınana kadar açılır.
+    Geçiş vektörleri taşımaz, kopyalar; bu yüzden bir kullanıcının tüm
+    vektörleri silinirken (`delete_user`) ayardan bağımsız olarak eski
+    yerdeki kopyaları da silinir.
+
+    Pinecone istekleri `core.resilience` üzerinden, zaman aşımı ve tekrar
+    deneme politikasıyla gönderilir.
+    """
+
+    def __init__(self, index_factory: Callable[[], Any], legacy_namespace: bool = False):
+        # Index bağlantısı ilk işlemde kurulur (bkz. `core.memory.get_index`).
+        self._index_factory = index_factory
+        self.legacy_namespace = legacy_namespace
+
+    @staticmethod
+    def _user_filter(user_id: str) -> Dict[str, Any]:
+        return {"user_id": {"$eq": user_id}}
+
+    def upsert(self, vectors):
+        index = self._index_factory()
+        for user_id, user_vectors in _group_by_user(vectors).items():
+            resilience.call(resilience.PINECONE, index.upsert, vectors=user_vectors,
+                            namespace=user_namespace(user_id))
+
+    def _query(self, user_id: str, vector: List[float], top_k: int, **kwargs):
+        index = self._index_factory()
+        # Aramalar idempotent okumalardır; yavaş kalırlarsa yedek istek gönderilebilir.
+        matches = resilience.call(resilience.PINECONE, index.query, vector=vector, top_k=top_k,
+                                  namespace=user_namespace(user_id), include_metadata=True,
+                                  hedge=True, **kwargs).matches or []
+        if not matches and self.legacy_namespace:
+            # Kullanıcının vektörleri henüz taşınmamış olabilir.
+            matches = resilience.call(resilience.PINECONE, index.query, vector=vector, top_k=top_k,
+                                      filter=self._user_filter(user_id), include_metadata=True,
+                                      hedge=True, **kwargs).matches or []
+        return matches
+
+    def query(self, user_id, vector, top_k):
+        return [{"id": match.id, "score": match.score, "metadata": match.metadata}
+                for match in self._query(user_id, vector, top_k)]
+
+    def fetch_user(self, user_id: str, vector: List[float], limit: int) -> Optional[List[Dict[str, Any]]]:
+        """
+        Kullanıcının tüm vektörlerini değerleriyle birlikte çeker.
+
+        Bir namespace'teki vektörleri değerleriyle listelemenin en ucuz yolu
+        `limit` sonuçlu tek bir aramadır. Sonuç sayısı `limit`'e ulaşırsa
+        kullanıcının tüm vektörleri alınamamış olabileceğinden None döner.
+        """
+        matches = self._query(user_id, vector, limit, include_values=True)
+        if len(matches) >= limit:
+            return None
+        return [{"id": match.id, "values": list(match.values), "metadata": match.metadata}
+                for match in matches]
+
+    def delete(self, ids, user_id=None):
+        index = self._index_factory()
+        if user_id is not None:
+            resilience.call(resilience.PINECONE, index.delete, ids=ids, namespace=user_namespace(user_id))
+        if user_id is None or self.legacy_namespace:
+            resilience.call(resilience.PINECONE, index.delete, ids=ids)
+
+    def delete_user(self, user_id):
+        index = self._index_factory()
+        resilience.call(resilience.PINECONE, index.delete, delete_all=True, namespace=user_namespace(user_id))
+        # Eski namespace'te kalmış kopyalar (`--delete-legacy` kullanılmadıysa) da silinir;
+        # filtreli silme idempotenttir ve eşleşen vektör yoksa hiçbir şey yapmaz.
+        resilience.call(resilience.PINECONE, index.delete, filter=self._user_filter(user_id))
+
+    def iter_user(self, user_id, batch_size: int = LIST_BATCH_SIZE):
+        # Sadece kullanıcının namespace'i listelenir; ortak namespace'teki eski
+        # vektörler `migrate_legacy_namespace` ile taşındıktan sonra görünür.
+        index = self._index_factory()
+        namespace, token = user_namespace(user_id), None
+        while True:
+            page = resilience.call(resilience.PINECONE, index.list_paginated, namespace=namespace,
+                                   limit=batch_size, pagination_token=token, hedge=True)
+            ids = [vector.id for vector in page.vectors or []]
+            if ids:
+                fetched = resilience.call(resilience.PINECONE, index.fetch, ids=ids, namespace=namespace, hedge=True)
+                for vector_id, vector in fetched.vectors.items():
+                    yield {"id": vector_id, "values": list(vector.values), "metadata": dict(vector.metadata or {})}
+            token = page.pagination.next if page.pagination else None
+            if not token:
+                return
+
+
+NAMESPACE_PREFIX = "user-"
+
+
+def user_namespace(user_id: str) -> str:
+    """Kullanıcının vektörlerinin tutulduğu Pinecone namespace'inin adı."""
+    return f"{NAMESPACE_PREFIX}{user_id}"
+
+
+def _group_by_user(vectors: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+    by_user: Dict[str, List[Dict[str, Any]]] = {}
+    for vector in vectors:
+        by_user.setdefault((vector.get("metadata") or {}).get("user_id", ""), []).append(vector)
+    return by_user
+
+
+def _load_checkpoint(path: str) -> Dict[str, Any]:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {"pagination_token": None, "finished": False, "copied": {}, "skipped": 0}
+
+
+def _save_checkpoint(path: str, state: Dict[str, Any]):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    temp = f"{path}.tmp"
+    with open(temp, "w", encoding="utf-8") as f:
+        json.dump(state, f)
+    os.replace(temp, path)
+
+
+def migrate_legacy_namespace(index, checkpoint_path: str = MIGRATION_CHECKPOINT,
+                             batch_size: int = LIST_BATCH_SIZE,
+                             on_progress: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+    """
+    Ortak namespace'teki vektörleri sahiplerinin namespace'lerine kopyalar.
+
+    Vektörler `batch_size`'lık parçalar halinde listelenir, değerleri ve
+    metaverileriyle çekilir ve `metadata["user_id"]`'ye göre kullanıcıların
+    namespace'lerine yazılır. Her parçadan sonra ilerleme `checkpoint_path`'e
+    kaydedilir; yarıda kalan bir geçiş tekrar çalıştırıldığında kaldığı
+    parçadan devam eder. Upsert tekrarlanabilir olduğundan, kaydedilmeden
+    yarıda kalan bir parçanın tekrar kopyalanması sorun değildir.
+
+    Ortak namespace bu fonksiyon tarafından silinmez.
+
+    Returns:
+        dict: `copied` (kullanıcı -> kopyalanan vektör sayısı), `skipped`
+        (`user_id` metaverisi olmayan vektörler), `finished` ve
+        `verify_legacy_namespace` ile doğrulanabilecek toplamlar.
+    """
+    state = _load_checkpoint(checkpoint_path)
+    while not state["finished"]:
+        page = index.list_paginated(namespace=LEGACY_NAMESPACE, limit=batch_size,
+                                    pagination_token=state["pagination_token"])
+        ids = [vector.id for vector in page.vectors or []]
+        if ids:
+            fetched = index.fetch(ids=ids, namespace=LEGACY_NAMESPACE).vectors
+            vectors = [{"id": vector_id, "values": list(vector.values), "metadata": dict(vector.metadata or {})}
+                       for vector_id, vector in fetched.items()]
+            for user_id, user_vectors in _group_by_user(vectors).items():
+                if not user_id:
+                    state["skipped"] += len(user_vectors)
+                    continue
+                index.upsert(vectors=user_vectors, namespace=user_namespace(user_id))
+                state["copied"][user_id] = state["copied"].get(user_id, 0) + len(user_vectors)
+        token = page.pagination.next if page.pagination else None
+        state["pagination_token"] = token
+        state["finished"] = not token
+        _save_checkpoint(checkpoint_path, state)
+        if on_progress:
+            on_progress(state)
+    return state
+
+
+def verify_legacy_namespace(index, state: Dict[str, Any]) -> List[str]:
+    """
+    Geçişin sonucunu Pinecone'un namespace istatistikleriyle karşılaştırır.
+
+    Her kullanıcının namespace'inde en az kopyalanan kadar vektör olmalıdır
+    (geçiş sırasında yeni kayıtlar eklenmiş olabilir). Ortak namespace'teki
+    vektör sayısı da kopyalanan ve atlanan vektörlerin toplamına eşit olmalıdır.
+
+    Returns:
+        list: Bulunan tutarsızlıkların açıklamaları; boşsa geçiş doğrulanmıştır.
+    """
+    namespaces = index.describe_index_stats().namespaces or {}
+
+    def count(namespace: str) -> int:
+        summary = namespaces.get(namespace)
+        return summary.vector_count if summary else 0
+
+    problems = []
+    for user_id, copied in state["copied"].items():
+        found = count(user_namespace(user_id))
+        if found < copied:
+            problems.append(f"{user_id}: {copied} vektör kopyalandı, namespace'te {found} var.")
+    expected = sum(state["copied"].values()) + state["skipped"]
+    legacy = count(LEGACY_NAMESPACE)
+    if legacy != expected:
+        problems.append(f"Ortak namespace'te {legacy} vektör var, {expected} tanesi işlendi.")
+    return problems
+
+
+class _UserMatrix:
+    """
+    Bir kullanıcının vektörleri: satırları birim uzunluğa normalize edilmiş,
+    bitişik bir `float32` matris ve satırlara karşılık gelen ID'ler/metaveriler.
+
+    Matrisin kapasitesi dolduğunda iki katına çıkarılır; silinen satırın
+    yerine son satır taşınır. Böylece ekleme ve silme, matrisin tamamını
+    kopyalamadan yapılır.
+    """
+
+    def __init__(self, matrix: Optional[np.ndarray] = None, ids: Optional[List[str]] = None,
+                 metadata: Optional[List[Dict[str, Any]]] = None):
+        self.ids: List[str] = list(ids or [])
+        self.metadata: List[Dict[str, Any]] = list(metadata or [])
+        self.rows: Dict[str, int] = {vector_id: row for row, vector_id in enumerate(self.ids)}
+        self.matrix = matrix if matrix is not None else np.empty((0, 0), dtype=np.float32)
+        self.mtime: Optional[float] = None
+
+    @property
+    def size(self) -> int:
+        return len(self.ids)
+
+    def upsert(self, vectors: List[Dict[str, Any]]):
+        values = np.asarray([vector["values"] for vector in vectors], dtype=np.float32)
+        norms = np.linalg.norm(values, axis=1, keepdims=True)
+        values = np.divide(values, norms, out=np.zeros_like(values), where=norms > 0)
+        if not self.size and self.matrix.shape[1] != values.shape[1]:
+            # İlk ekleme: vektör boyutu artık bilinir.
+            self.matrix = np.empty((max(len(vectors), 16), values.shape[1]), dtype=np.float32)
+        for vector, normalized in zip(vectors, values):
+            row = self.rows.get(vector["id"])
+            if row is None:
+                row = self.size
+                if row == self.matrix.shape[0]:
+                    grown = np.empty((max(row * 2, 16), self.matrix.shape[1]), dtype=np.float32)
+                    grown[:row] = self.matrix[:row]
+                    self.matrix = grown
+                self.rows[vector["id"]] = row
+                self.ids.append(vector["id"])
+                self.metadata.append(dict(vector.get("metadata") or {}))
+            else:
+                self.metadata[row] = dict(vector.get("metadata") or {})
+            self.matrix[row] = normalized
+
+    def delete(self, ids: Iterable[str]) -> bool:
+        changed = False
+        for vector_id in ids:
+            row = self.rows.pop(vector_id, None)
+            if row is None:
+                continue
+            last = self.size - 1
+            if row != last:
+                self.matrix[row] = self.matrix[last]
+                self.ids[row] = self.ids[last]
+                self.metadata[row] = self.metadata[last]
+                self.rows[self.ids[row]] = row
+            self.ids.pop()
+            self.metadata.pop()
+            changed = True
+        return changed
+
+    def query(self, vector: List[float], top_k: int) -> List[Dict[str, Any]]:
+        if not self.size or top_k <= 0:
+            return []
+        query = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm == 0:
+            return []
+        scores = self.matrix[:self.size] @ (query / norm)
+        if top_k < self.size:
+            # Tüm skorları sıralamak yerine en iyi `top_k` tanesi seçilip sadece onlar sıralanır.
+            best = np.argpartition(-scores, top_k - 1)[:top_k]
+        else:
+            best = np.arange(self.size)
+        best = best[np.argsort(-scores[best], kind="stable")]
+        return [{"id": self.ids[row], "score": float(scores[row]), "metadata": dict(self.metadata[row])}
+                for row in best]
+
+
+class LocalStore(VectorStore):
+    """
+    Vektörleri kullanıcı başına bir NumPy matrisinde tutan ve tam arama yapan arka uç.
+
+    `path` verilirse her kullanıcının vektörleri bu dizinde ayrı bir `.npz`
+    dosyasına yazılır (her değişiklikten sonra, atomik olarak). Dosya başka
+    bir işlem tarafından değiştirildiyse bir sonraki erişimde yeniden yüklenir.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self._users: Dict[str, _UserMatrix] = {}
+        self._lock = threading.RLock()
+        if path:
+            os.makedirs(path, exist_ok=True)
+
+    def _file(self, user_id: str) -> str:
+        name = hashlib.sha256(user_id.encode("utf-8")).hexdigest()[:32]
+        return os.path.join(self.path, f"{name}.npz")
+
+    def _load(self, user_id: str) -> _UserMatrix:
+        """Kullanıcının matrisini döndürür; dosyası daha yeniyse diskten yeniden yükler."""
+        entry = self._users.get(user_id)
+        if not self.path:
+            if entry is None:
+                entry = self._users[user_id] = _UserMatrix()
+            return entry
+        file = self._file(user_id)
+        try:
+            mtime = os.stat(file).st_mtime_ns
+        except FileNotFoundError:
+            mtime = None
+        if entry is not None and entry.mtime == mtime:
+            return entry
+        if mtime is None:
+            entry = _UserMatrix()
+        else:
+            with np.load(file, allow_pickle=False) as data:
+                meta = json.loads(str(data["meta"]))
+                entry = _UserMatrix(np.array(data["matrix"]), meta["ids"], meta["metadata"])
+        entry.mtime = mtime
+        self._users[user_id] = entry
+        return entry
+
+    def _save(self, user_id: str, entry: _UserMatrix):
+        if not self.path:
+            return
+        file = self._file(user_id)
+        if not entry.size:
+            if os.path.exists(file):
+                os.remove(file)
+            entry.mtime = None
+            return
+        temp = f"{file}.{os.getpid()}.{threading.get_ident()}.tmp.npz"
+        meta = json.dumps({"ids": entry.ids, "metadata": entry.metadata}, ensure_ascii=False)
+        np.savez(temp, matrix=entry.matrix[:entry.size], meta=np.array(meta))
+        os.replace(temp, file)
+        entry.mtime = os.stat(file).st_mtime_ns
+
+    def upsert(self, vectors):
+        with self._lock:
+            for user_id, user_vectors in _group_by_user(vectors).items():
+                entry = self._load(user_id)
+                entry.upsert(user_vectors)
+                self._save(user_id, entry)
+
+    def replace_user(self, user_id: str, vectors: List[Dict[str, Any]]):
+        """Kullanıcının tüm vektörlerini verilenlerle değiştirir."""
+        with self._lock:
+            entry = _UserMatrix()
+            if vectors:
+                entry.upsert(vectors)
+            self._users[user_id] = entry
+            self._save(user_id, entry)
+
+    def query(self, user_id, vector, top_k):
+        with self._lock:
+            return self._load(user_id).query(vector, top_k)
+
+    def delete(self, ids, user_id=None):
+        ids = set(ids)
+        with self._lock:
+            if user_id is not None:
+                user_ids = [user_id]
+            elif self.path:
+                # Sahibi bilinmeyen ID'ler için diskteki tüm kullanıcılara bakılır.
+                user_ids = list(self._users)
+                loaded = {self._file(uid) for uid in user_ids}
+                for name in os.listdir(self.path):
+                    file = os.path.join(self.path, name)
+                    if name.endswith(".npz") and file not in loaded:
+                        with np.load(file, allow_pickle=False) as data:
+                            meta = json.loads(str(data["meta"]))
+                        if ids & set(meta["ids"]) and meta["metadata"]:
+                            user_ids.append(meta["metadata"][0].get("user_id", ""))
+            else:
+                user_ids = list(self._users)
+            for uid in user_ids:
+                entry = self._load(uid)
+                if entry.delete(ids):
+                    self._save(uid, entry)
+
+    def delete_user(self, user_id):
+        with self._lock:
+            self._users[user_id] = _UserMatrix()
+            self._save(user_id, self._users[user_id])
+
+    def iter_user(self, user_id):
+        with self._lock:
+            entry = self._load(user_id)
+            vectors = [{"id": vector_id, "values": entry.matrix[row].tolist(), "metadata": dict(metadata)}
+                       for row, (vector_id, metadata) in enumerate(zip(entry.ids, entry.metadata))]
+        return iter(vectors)
+
+    def has_user(self, user_id: str) -> bool:
+        """Kullanıcının belleğe yüklenmiş vektörleri olup olmadığını döndürür."""
+        with self._lock:
+            return user_id in self._users
+
+
+class CachedStore(VectorStore):
+    """Pinecone'un önünde, kullanıcı bazlı okuma önbelleği olarak çalışan arka uç."""
+
+    def __init__(self, primary: PineconeStore, hot_ttl: float = DEFAULT_HOT_TTL,
+                 hot_limit: int = HOT_LIMIT):
+        self.primary = primary
+        self.hot = LocalStore()
+        self.hot_ttl = hot_ttl
+        self.hot_limit = hot_limit
+        # Kullanıcı -> (önbellek geçerlilik sonu, önbellekte mi). Büyük kullanıcılar
+        # da "önbellekte değil" olarak hatırlanır; böylece her aramada tekrar denenmez.
+        self._warm: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _is_warm(self, user_id: str) -> Optional[bool]:
+        entry = self._warm.get(user_id)
+        if entry is None or time.monotonic() >= entry[0]:
+            return None
+        return entry[1]
+
+    def upsert(self, vectors):
+        self.primary.upsert(vectors)
+        with self._lock:
+            warm = [vector for vector in vectors
+                    if self._is_warm((vector.get("metadata") or {}).get("user_id", ""))]
+            if warm:
+                self.hot.upsert(warm)
+
+    def query(self, user_id, vector, top_k):
+        with self._lock:
+            warm = self._is_warm(user_id)
+        if warm is None:
+            vectors = self.primary.fetch_user(user_id, vector, self.hot_limit)
+            with self._lock:
+                if vectors is not None:
+                    self.hot.replace_user(user_id, vectors)
+                else:
+                    self.hot.delete_user(user_id)
+                warm = vectors is not None
+                self._warm[user_id] = (time.monotonic() + self.hot_ttl, warm)
+        if not warm:
+            self.misses += 1
+            return self.primary.query(user_id, vector, top_k)
+        self.hits += 1
+        return self.hot.query(user_id, vector, top_k)
+
+    def delete(self, ids, user_id=None):
+        self.primary.delete(ids, user_id)
+        with self._lock:
+            self.hot.delete(ids, user_id)
+
+    def delete_user(self, user_id):
+        self.primary.delete_user(user_id)
+        with self._lock:
+            self.hot.delete_user(user_id)
+            self._warm.pop(user_id, None)
+
+    def iter_user(self, user_id):
+        return self.primary.iter_user(user_id)
+
+
+def get_settings() -> Dict[str, Any]:
+    """`[vector_store]` ayarlarını döndürür; başlık yoksa boş sözlük."""
+    try:
+        return dict(st.secrets.get("vector_store", {}))
+    except FileNotFoundError:
+        return {}
+
+
+def create_store(settings: Dict[str, Any], pinecone_index: Callable[[], Any]) -> VectorStore:
+    """
+    Ayarlara göre bir vektör deposu oluşturur.
+
+    Args:
+        pinecone_index: Pinecone index bağlantısını döndüren fonksiyon; bağlantı
+            sadece Pinecone kullanan bir işlem yapıldığında kurulur.
+
+    Raises:
+        ValueError: Bilinmeyen bir arka uç adı verilirse.
+    """
+    name = settings.get("backend", DEFAULT_STORE)
+    legacy_namespace = bool(settings.get("legacy_namespace", False))
+    if name == "pinecone":
+        return PineconeStore(pinecone_index, legacy_namespace)
+    if name == "local":
+        return LocalStore(settings.get("path"))
+    if name == "cached":
+        return CachedStore(PineconeStore(pinecone_index, legacy_namespace),
+                           hot_ttl=float(settings.get("hot_ttl", DEFAULT_HOT_TTL)))
+    raise ValueError(f"Bilinmeyen vektör deposu: {name}")
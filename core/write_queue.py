@@ -0,0 +1,315 @@
+# -*- coding: utf-8 -*-
+"""
+Arka Plan Yazma Kuyruğu (Write-Behind Queue) Modülü.
+
+Bazı yazma işlemleri (örn: bir günlüğün embedding'inin alınıp Pinecone'a
+kaydedilmesi) kullanıcının beklemesini gerektirmeyecek kadar ikincildir. Bu
+modül, bu tür işleri diskteki bir SQLite kuyruğuna yazar ve arka planda
+çalışan bir işçi (worker) havuzu ile işler. Böylece arayüz, birincil Firebase
+yazması tamamlanır tamamlanmaz kullanıcıya yanıt verebilir.
+
+Özellikler:
+- **Kalıcı:** İşler bir SQLite dosyasında tutulur; uygulama yeniden başlasa
+  bile kaybolmaz. Aynı dosyayı paylaşan birden fazla Streamlit işlemi
+  (process) aynı kuyruğu güvenle işleyebilir.
+- **Sınırlı:** Bekleyen iş sayısı `max_pending`'i aşarsa yeni iş kabul edilmez;
+  çağıran taraf işi senkron olarak yapmaya geri dönebilir.
+- **Tekrar Denemeli:** Başarısız işler üstel bekleme (exponential backoff) ile
+  `max_attempts` kez tekrar denenir, sonra "dead" olarak işaretlenir. Vazgeçilen
+  işlerin verisi (örn: günlük veya sohbet metni) hemen silinir; sadece türü,
+  anahtarı ve son hatası `dead_retention_days` gün boyunca tutulur.
+- **Sıralı:** Aynı `key` ile eklenen işler eklendikleri sırayla, birbiri
+  ardına işlenir (örn: bir kullanıcının hafıza kaydı, aynı kaydın silinmesinden
+  önce tamamlanır). Farklı anahtarlar paralel işlenebilir.
+- **İzlenebilir:** `get_queue_stats()` kuyruk derinliğini ve gecikmeyi (en eski
+  bekleyen işin yaşı) döndürür.
+
+İsteğe bağlı ayarlar `secrets.toml` içinde `[write_queue]` başlığı altında
+verilebilir:
+
+    [write_queue]
+    path = ".mymindmate/write_queue.sqlite3"
+    workers = 2
+    max_pending = 10000
+    max_attempts = 5
+    dead_retention_days = 7
+
+İş türleri, `register_handler` ile kaydedilen fonksiyonlar tarafından
+işlenir (örn: `core.memory`, "memory.save" işlerini kaydeder).
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+import streamlit as st
+
+DEFAULT_SETTINGS = {
+    "path": os.path.join(".mymindmate", "write_queue.sqlite3"),
+    "workers": 2,
+    "max_pending": 10000,
+    "max_attempts": 5,
+    "dead_retention_days": 7,
+}
+RETRY_BASE_DELAY = 2.0    # Saniye. n. denemeden sonra 2 * 2^n saniye beklenir.
+RETRY_MAX_DELAY = 300.0   # Saniye. Tekrar denemeler arası en uzun bekleme.
+LEASE_SECONDS = 300.0     # Bu süreden uzun "running" kalan iş, çökmüş sayılıp yeniden alınır.
+POLL_INTERVAL = 1.0       # Saniye. Boştaki işçinin kuyruğu yeniden kontrol etme aralığı.
+
+_handlers: Dict[str, Callable[[Dict[str, Any]], None]] = {}
+_settings: Optional[Dict[str, Any]] = None
+_start_lock = threading.Lock()
+_workers_started = False
+_wakeup = threading.Event()
+_counters = {"processed": 0, "retried": 0}
+_counters_lock = threading.Lock()
+
+
+def get_settings() -> Dict[str, Any]:
+    """Kuyruk ayarlarını döndürür; `[write_queue]` başlığı yoksa varsayılanlar kullanılır."""
+    global _settings
+    if _settings is None:
+        try:
+            overrides = dict(st.secrets.get("write_queue", {}))
+        except FileNotFoundError:
+            overrides = {}
+        _settings = {**DEFAULT_SETTINGS, **overrides}
+    return _settings
+
+
+def _connect() -> sqlite3.Connection:
+    path = get_settings()["path"]
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            kind TEXT NOT NULL,
+            key TEXT,
+            payload TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'pending',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            enqueued_at REAL NOT NULL,
+            next_attempt_at REAL NOT NULL,
+            claimed_at REAL,
+            last_error TEXT
+        )
+        """
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS jobs_ready ON jobs (status, next_attempt_at)")
+    conn.execute("CREATE INDEX IF NOT EXISTS jobs_key ON jobs (key, id)")
+    return conn
+
+
+def register_handler(kind: str, handler: Callable[[Dict[str, Any]], None]):
+    """
+    Bir iş türünü işleyecek fonksiyonu kaydeder.
+
+    İşleyici, işin `payload` sözlüğünü alır ve başarısızlık durumunda hata
+    fırlatmalıdır; fırlatılan her hata bir tekrar denemeye yol açar.
+    """
+    _handlers[kind] = handler
+
+
+def enqueue(kind: str, payload: Dict[str, Any], key: Optional[str] = None) -> bool:
+    """
+    Yeni bir işi kuyruğa ekler ve arka plan işçilerini (gerekirse) başlatır.
+
+    Args:
+        kind (str): `register_handler` ile kaydedilmiş iş türü.
+        payload (dict): İşleyiciye verilecek, JSON'a çevrilebilir veri.
+        key (str, optional): Sıralama anahtarı. Aynı anahtara sahip işler,
+            eklendikleri sırayla ve birbiri ardına işlenir.
+
+    Returns:
+        bool: İş kabul edildiyse True; kuyruk dolu olduğu için reddedildiyse False.
+    """
+    now = time.time()
+    conn = _connect()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        (depth,) = conn.execute("SELECT COUNT(*) FROM jobs WHERE status != 'dead'").fetchone()
+        if depth >= int(get_settings()["max_pending"]):
+            conn.execute("ROLLBACK")
+            return False
+        conn.execute(
+            "INSERT INTO jobs (kind, key, payload, enqueued_at, next_attempt_at) VALUES (?, ?, ?, ?, ?)",
+            (kind, key, json.dumps(payload, ensure_ascii=False), now, now),
+        )
+        conn.execute("COMMIT")
+    finally:
+        conn.close()
+    _ensure_workers()
+    _wakeup.set()
+    return True
+
+
+def discard(key: str) -> int:
+    """
+    Bir anahtara ait, henüz çalışmaya başlamamış tüm işleri kuyruktan siler.
+
+    Örn: bir kullanıcının hesabı silinirken, o kullanıcı için bekleyen hafıza
+    kayıtlarının silme işleminden sonra çalışıp veriyi geri getirmesini önler.
+
+    Returns:
+        int: Silinen iş sayısı.
+    """
+    conn = _connect()
+    try:
+        cursor = conn.execute("DELETE FROM jobs WHERE key = ? AND status != 'running'", (key,))
+        return cursor.rowcount
+    finally:
+        conn.close()
+
+
+def _claim_job(conn: sqlite3.Connection):
+    """
+    Çalışmaya hazır en eski işi atomik olarak bu işçi adına sahiplenir.
+
+    Aynı anahtara sahip daha eski ve henüz bitmemiş bir iş varsa, sıranın
+    bozulmaması için bu iş atlanır.
+    """
+    now = time.time()
+    kinds = list(_handlers)
+    if not kinds:
+        return None
+    placeholders = ",".join("?" for _ in kinds)
+    conn.execute("BEGIN IMMEDIATE")
+    row = conn.execute(
+        f"""
+        SELECT id, kind, payload, attempts FROM jobs
+        WHERE kind IN ({placeholders})
+          AND ((status = 'pending' AND next_attempt_at <= ?)
+               OR (status = 'running' AND claimed_at <= ?))
+          AND (key IS NULL OR NOT EXISTS (
+               SELECT 1 FROM jobs AS earlier
+               WHERE earlier.key = jobs.key AND earlier.id < jobs.id
+                 AND earlier.status != 'dead'))
+        ORDER BY id LIMIT 1
+        """,
+        (*kinds, now, now - LEASE_SECONDS),
+    ).fetchone()
+    if row is None:
+        conn.execute("COMMIT")
+        return None
+    conn.execute("UPDATE jobs SET status = 'running', claimed_at = ? WHERE id = ?", (now, row[0]))
+    conn.execute("COMMIT")
+    return row
+
+
+def _process_one(conn: sqlite3.Connection) -> bool:
+    """Bir işi çalıştırır. İşlenecek iş yoksa False döner."""
+    job = _claim_job(conn)
+    if job is None:
+        return False
+    job_id, kind, payload, attempts = job
+    try:
+        _handlers[kind](json.loads(payload))
+    except Exception as e:
+        attempts += 1
+        if attempts >= int(get_settings()["max_attempts"]):
+            # Kullanıcı verisi içeren payload saklanmaz; tanı için hata kaydı yeterlidir.
+            conn.execute(
+                "UPDATE jobs SET status = 'dead', payload = '{}', attempts = ?, last_error = ? WHERE id = ?",
+                (attempts, str(e), job_id),
+            )
+            _prune_dead(conn)
+        else:
+            delay = min(RETRY_BASE_DELAY * (2 ** attempts), RETRY_MAX_DELAY)
+            conn.execute(
+                "UPDATE jobs SET status = 'pending', attempts = ?, next_attempt_at = ?, last_error = ? WHERE id = ?",
+                (attempts, time.time() + delay, str(e), job_id),
+            )
+            _count("retried")
+        return True
+    conn.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+    _count("processed")
+    return True
+
+
+def _prune_dead(conn: sqlite3.Connection) -> int:
+    """Vazgeçildikten sonra `dead_retention_days` günden eski işlerin kayıtlarını siler."""
+    cutoff = time.time() - float(get_settings()["dead_retention_days"]) * 86400
+    cursor = conn.execute("DELETE FROM jobs WHERE status = 'dead' AND claimed_at < ?", (cutoff,))
+    return cursor.rowcount
+
+
+def _count(name: str):
+    with _counters_lock:
+        _counters[name] += 1
+
+
+def _worker_loop():
+    conn = _connect()
+    try:
+        _prune_dead(conn)
+    except sqlite3.Error as e:
+        print(f"Yazma kuyruğu hatası: {e}")
+    while True:
+        try:
+            if _process_one(conn):
+                continue
+        except sqlite3.Error as e:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            print(f"Yazma kuyruğu hatası: {e}")
+        _wakeup.wait(POLL_INTERVAL)
+        _wakeup.clear()
+
+
+def _ensure_workers():
+    """Arka plan işçilerini bu işlemde (process) bir kez başlatır."""
+    global _workers_started
+    if _workers_started:
+        return
+    with _start_lock:
+        if _workers_started:
+            return
+        for i in range(int(get_settings()["workers"])):
+            threading.Thread(target=_worker_loop, name=f"write-queue-{i}", daemon=True).start()
+        _workers_started = True
+
+
+def start_workers():
+    """
+    Kuyrukta bekleyen işleri işlemek için işçileri başlatır.
+
+    Uygulama yeniden başladığında, önceki çalışmadan kalan işlerin yeni bir
+    `enqueue` çağrısı beklemeden işlenmeye başlaması için kullanılır.
+    """
+    _ensure_workers()
+    _wakeup.set()
+
+
+def get_queue_stats() -> Dict[str, Any]:
+    """
+    Kuyruğun anlık durumunu döndürür.
+
+    Returns:
+        dict: `depth` (bekleyen + işlenen iş sayısı), `dead` (vazgeçilen iş
+        sayısı), `lag_seconds` (en eski bekleyen işin yaşı) ve bu işlemdeki
+        `processed`/`retried` sayaçları.
+    """
+    conn = _connect()
+    try:
+        depth, oldest = conn.execute(
+            "SELECT COUNT(*), MIN(enqueued_at) FROM jobs WHERE status != 'dead'"
+        ).fetchone()
+        (dead,) = conn.execute("SELECT COUNT(*) FROM jobs WHERE status = 'dead'").fetchone()
+    finally:
+        conn.close()
+    with _counters_lock:
+        counters = dict(_counters)
+    return {
+        "depth": depth,
+        "dead": dead,
+        "lag_seconds": time.time() - oldest if oldest else 0.0,
+        "processed": counters["processed"],
+        "retried": counters["retried"],
+    }
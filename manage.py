@@ -0,0 +1,225 @@
+# -*- coding: utf-8 -*-
+"""
+Yönetim Komutları (Management CLI).
+
+Bu dosya, uygulamanın veritabanı üzerinde tek seferlik bakım ve geçiş
+(migration) işlemleri yapan komutları içerir. Komutlar, uygulamayla aynı
+`secrets.toml` ayarlarını ve aynı `core` modüllerini kullanır.
+
+Tüm kullanıcılar üzerinde çalışan komutlar güvenlik kurallarının dışında
+erişim gerektirir. Bunun için `[firebase]` ayarlarına bir servis hesabı
+(`serviceAccount = "path/to/service-account.json"`) eklenmelidir; bu durumda
+Pyrebase istekleri yönetici yetkisiyle gönderir. Tek bir kullanıcı için
+çalıştırırken `--id-token` ile o kullanıcının token'ı da verilebilir.
+
+Kullanım:
+    python manage.py backfill-stats                 # Tüm kullanıcılar
+    python manage.py backfill-stats --user UID ...  # Belirli kullanıcılar
+    python manage.py build-goal-index               # Hedef indeksini oluşturur
+    python manage.py setup-memory-index             # Pinecone index'ini oluşturur
+    python manage.py migrate-memory-namespaces      # Hafızayı kullanıcı namespace'lerine taşır
+    python manage.py consolidate-memory --dry-run   # Eski sohbet kayıtlarını haftalık özetlere toplar
+    python manage.py reindex-memory                 # Günlük ve hedefleri hafızaya yeniden yazar
+    python manage.py import-journals ARŞİV --user UID  # Markdown/JSON günlük arşivini içe aktarır
+"""
+import argparse
+import os
+import sys
+
+from core import firebase_db
+
+
+def _user_ids(args) -> list:
+    return args.user or firebase_db.list_user_ids(args.id_token)
+
+
+def backfill_stats(args):
+    """Kullanıcıların günlük aktivite sayaçlarını mevcut verilerden yeniden hesaplar."""
+    for user_id in _user_ids(args):
+        stats = firebase_db.backfill_daily_stats(user_id, args.id_token)
+        print(f"{user_id}: {len(stats)} günün sayaçları yazıldı.")
+
+
+def build_goal_index(args):
+    """Kullanıcıların hedef indeksini (`goals_index`) mevcut hedeflerden yeniden oluşturur."""
+    for user_id in _user_ids(args):
+        index = firebase_db.build_goal_index(user_id, args.id_token)
+        total = sum(len(goals) for by_status in index.values()
+                    for by_date in by_status.values() for goals in by_date.values())
+        print(f"{user_id}: {total} hedef indekslendi.")
+
+
+def setup_memory_index(args):
+    """Yapay zeka hafızası için Pinecone index'ini (yoksa) oluşturur."""
+    from core import memory  # Pinecone ve Gemini ayarları sadece bu komut için gerekir.
+
+    if memory.ensure_index():
+        print(f"{memory.INDEX_NAME} index'i oluşturuldu.")
+    else:
+        print(f"{memory.INDEX_NAME} index'i zaten mevcut.")
+
+
+def migrate_memory_namespaces(args):
+    """Ortak namespace'teki hafıza vektörlerini kullanıcıların kendi namespace'lerine taşır."""
+    from core import memory, vector_stores
+
+    checkpoint = args.checkpoint or vector_stores.MIGRATION_CHECKPOINT
+    if args.reset and os.path.exists(checkpoint):
+        os.remove(checkpoint)
+    index = memory.get_index()
+
+    def on_progress(state):
+        print(f"{sum(state['copied'].values())} vektör, {len(state['copied'])} kullanıcı kopyalandı.")
+
+    state = vector_stores.migrate_legacy_namespace(index, checkpoint, on_progress=on_progress)
+    if state["skipped"]:
+        print(f"user_id metaverisi olmayan {state['skipped']} vektör atlandı.")
+
+    problems = vector_stores.verify_legacy_namespace(index, state)
+    if problems:
+        for problem in problems:
+            print(problem)
+        print("Doğrulama başarısız. Pinecone istatistikleri birkaç saniye geriden gelebilir; "
+              "komutu tekrar çalıştırmak sadece doğrulamayı tekrarlar.")
+        return 1
+    print("Sayılar doğrulandı.")
+    if args.delete_legacy:
+        index.delete(delete_all=True, namespace=vector_stores.LEGACY_NAMESPACE)
+        print("Ortak namespace silindi.")
+    print("`[vector_store]` ayarlarındaki `legacy_namespace = true` satırı kaldırılabilir.")
+    return 0
+
+
+def consolidate_memory(args):
+    """Eski sohbet hafızası vektörlerini haftalık özetlere dönüştürür (periyodik olarak çalıştırılır)."""
+    from core import memory_consolidation
+
+    totals = {"eligible": 0, "projected_savings": 0, "deleted": 0}
+    failed = False
+    for user_id in _user_ids(args):
+        report = memory_consolidation.consolidate_user_memory(
+            user_id, dry_run=args.dry_run, min_age_days=args.min_age_days, max_workers=args.workers)
+        for name in totals:
+            totals[name] += report[name]
+        line = (f"{user_id}: {report['chat']} sohbet vektörü, {report['weeks']} hafta, "
+                f"{report['eligible']} mesaj özetlenecek, {report['projected_savings']} vektör azalacak")
+        if report["undated"]:
+            line += f" ({report['undated']} tarihsiz vektör atlandı)"
+        if not args.dry_run:
+            line += f"; {report['deleted']} vektör silindi"
+        print(line + ".")
+        for error in report["errors"]:
+            failed = True
+            print(f"  Hata: {error}")
+    print(f"Toplam: {totals['eligible']} mesaj, {totals['projected_savings']} vektör tasarrufu"
+          + ("" if args.dry_run else f", {totals['deleted']} vektör silindi") + ".")
+    return 1 if failed else 0
+
+
+def reindex_memory(args):
+    """Günlük ve hedefleri Firebase'den okuyup yapay zeka hafızasına yeniden yazar (kaldığı yerden sürer)."""
+    from core import memory_reindex
+
+    checkpoint = args.checkpoint or memory_reindex.get_settings()["checkpoint"]
+    if args.reset:
+        # `--user` verildiyse sadece o kullanıcıların ilerlemesi silinir.
+        memory_reindex.reset_checkpoint(checkpoint, args.user)
+
+    def on_progress(progress):
+        print(f"{progress['user_id']} ({progress['node']}, {progress['date']} tarihine kadar): "
+              f"toplam {progress['items']} kayıt, {progress['items_per_second']:.1f} kayıt/sn")
+
+    result = memory_reindex.reindex_users(_user_ids(args), args.id_token, checkpoint_path=checkpoint,
+                                          requests_per_minute=args.rpm, on_progress=on_progress)
+    print(f"Toplam: {result['users']} kullanıcı, {result['items']} kayıt, {result['elapsed']:.0f} sn "
+          f"({result['items_per_second']:.1f} kayıt/sn).")
+    return 0
+
+
+def import_journals(args):
+    """Markdown veya JSON biçimindeki bir günlük arşivini bir kullanıcının hesabına aktarır."""
+    from core import journal_import
+
+    last = {"position": args.skip}
+
+    def on_progress(report):
+        last.update(report)
+        print(f"{report['position']} girdi işlendi, {report['imported']} aktarıldı "
+              f"({report['entries_per_second']:.1f} girdi/sn).")
+
+    try:
+        report = journal_import.import_entries(args.user, args.id_token, journal_import.iter_archive(args.path),
+                                               skip=args.skip, requests_per_minute=args.rpm,
+                                               on_progress=on_progress)
+    except Exception as e:
+        print(f"Hata: {e}")
+        print(f"Kaldığı yerden sürdürmek için: --skip {last['position']}")
+        print(f"Girdileri yazılıp hafızaya yüklenemeyen parça için: "
+              f"python manage.py reindex-memory --reset --user {args.user}")
+        return 1
+    if report["undated"]:
+        print(f"Tarihi belirlenemeyen {report['undated']} girdi atlandı.")
+    print(f"Toplam: {report['imported']} girdi, {report['elapsed']:.0f} sn.")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--id-token", default=None,
+                        help="İsteklerde kullanılacak kullanıcı token'ı (servis hesabı yoksa).")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    backfill = commands.add_parser("backfill-stats", help=backfill_stats.__doc__)
+    backfill.add_argument("--user", action="append", help="Sadece bu kullanıcı (birden fazla verilebilir).")
+    backfill.set_defaults(func=backfill_stats)
+
+    goal_index = commands.add_parser("build-goal-index", help=build_goal_index.__doc__)
+    goal_index.add_argument("--user", action="append", help="Sadece bu kullanıcı (birden fazla verilebilir).")
+    goal_index.set_defaults(func=build_goal_index)
+
+    memory_index = commands.add_parser("setup-memory-index", help=setup_memory_index.__doc__)
+    memory_index.set_defaults(func=setup_memory_index)
+
+    namespaces = commands.add_parser("migrate-memory-namespaces", help=migrate_memory_namespaces.__doc__)
+    namespaces.add_argument("--checkpoint", default=None,
+                            help="İlerlemenin kaydedildiği dosya; yarıda kalan geçiş buradan sürdürülür.")
+    namespaces.add_argument("--reset", action="store_true", help="Kayıtlı ilerlemeyi silip baştan başlar.")
+    namespaces.add_argument("--delete-legacy", action="store_true",
+                            help="Doğrulama başarılıysa ortak namespace'teki vektörleri siler.")
+    namespaces.set_defaults(func=migrate_memory_namespaces)
+
+    consolidate = commands.add_parser("consolidate-memory", help=consolidate_memory.__doc__)
+    consolidate.add_argument("--user", action="append", help="Sadece bu kullanıcı (birden fazla verilebilir).")
+    consolidate.add_argument("--dry-run", action="store_true",
+                             help="Hiçbir şey yazmadan, yapılacak işlemi ve vektör tasarrufunu raporlar.")
+    consolidate.add_argument("--min-age-days", type=int, default=None,
+                             help="Bu günden eski sohbet mesajları özetlenir (varsayılan: ayarlardaki değer).")
+    consolidate.add_argument("--workers", type=int, default=None,
+                             help="Aynı anda özetlenen en fazla hafta sayısı (varsayılan: ayarlardaki değer).")
+    consolidate.set_defaults(func=consolidate_memory)
+
+    reindex = commands.add_parser("reindex-memory", help=reindex_memory.__doc__)
+    reindex.add_argument("--user", action="append", help="Sadece bu kullanıcı (birden fazla verilebilir).")
+    reindex.add_argument("--checkpoint", default=None,
+                         help="İlerlemenin kaydedildiği dosya (varsayılan: ayarlardaki değer).")
+    reindex.add_argument("--reset", action="store_true",
+                         help="Kayıtlı ilerlemeyi silip baştan başlar (`--user` ile sadece o kullanıcılar için).")
+    reindex.add_argument("--rpm", type=float, default=None,
+                         help="Dakikadaki en fazla Gemini embedding isteği (varsayılan: ayarlardaki değer).")
+    reindex.set_defaults(func=reindex_memory)
+
+    importer = commands.add_parser("import-journals", help=import_journals.__doc__)
+    importer.add_argument("path", help="Markdown/JSON dosyası, bu dosyaları içeren bir klasör veya .zip arşivi.")
+    importer.add_argument("--user", required=True, help="Girdilerin aktarılacağı kullanıcı.")
+    importer.add_argument("--skip", type=int, default=0,
+                          help="Atlanacak ilk girdi sayısı (yarıda kalan bir aktarımı sürdürmek için).")
+    importer.add_argument("--rpm", type=float, default=None,
+                          help="Dakikadaki en fazla Gemini embedding isteği (varsayılan: ayarlardaki değer).")
+    importer.set_defaults(func=import_journals)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -10,11 +10,10 @@ hesap oluşturmaları için gerekli arayüzleri içerir. Streamlit'in `st.tabs`
 - Giriş: Kullanıcı e-posta ve şifresini girer, `firebase_auth.firebase_login`
   fonksiyonu çağrılır. Başarılı olursa Ana Sayfa'ya yönlendirilir.
 - Kayıt: Kullanıcı ad, e-posta, şifre ve saat dilimi bilgilerini girer.
-  Kayıt süreci üç adımdan oluşur:
-    1. `firebase_auth.firebase_register` ile kullanıcı Firebase Auth'a kaydedilir.
-    2. `firebase_auth.firebase_login` ile yeni kullanıcı adına hemen giriş yapılır
-       ve güvenli veritabanı işlemleri için bir `id_token` alınır.
-    3. Alınan `id_token` ile `firebase_db.save_user_details_from_dict` fonksiyonu
+  Kayıt süreci iki adımdan oluşur:
+    1. `firebase_auth.firebase_register` ile kullanıcı Firebase Auth'a kaydedilir
+       ve kayıt yanıtındaki `id_token` ile oturum hemen açılır.
+    2. Bu `id_token` ile `firebase_db.save_user_details_from_dict` fonksiyonu
        çağrılarak kullanıcının profil bilgileri Realtime Database'e kaydedilir.
 """
 import streamlit as st
@@ -99,27 +98,21 @@ with register_tab:
                 success, uid_or_error = auth.firebase_register(reg_email, reg_password)
                 if success:
                     uid = uid_or_error
-                    # 2. Kayıt sonrası otomatik giriş yap ve idToken al
-                    login_success, _ = auth.firebase_login(reg_email, reg_password)
-                    if login_success:
-                        id_token = st.session_state.get("user_id_token")
-                        
-                        # 3. Alınan idToken ile kullanıcı detaylarını DB'ye kaydet
-                        user_data = {
-                            "name": reg_name,
-                            "email": reg_email,
-                            "timezone": reg_timezone,
-                            "is_first_chat": True
-                        }
-                        firebase_db.save_user_details_from_dict(uid, user_data, id_token)
+                    # 2. Kayıt yanıtıyla açılan oturumun idToken'ı ile kullanıcı detaylarını DB'ye kaydet
+                    id_token = st.session_state.get("user_id_token")
+                    user_data = {
+                        "name": reg_name,
+                        "email": reg_email,
+                        "timezone": reg_timezone,
+                        "is_first_chat": True
+                    }
+                    firebase_db.save_user_details_from_dict(uid, user_data, id_token)
 
-                        # Oturum durumuna kullanıcının adını ekle
-                        st.session_state["user_name"] = reg_name
-                        
-                        st.success("Kayıt başarılı! Ana sayfaya yönlendiriliyorsunuz...")
-                        st.switch_page("pages/1_🏠_Ana_Sayfa.py")
-                    else:
-                        st.error("Kayıt başarılı ancak otomatik giriş yapılamadı. Lütfen manuel olarak giriş yapın.")
+                    # Oturum durumuna kullanıcının adını ekle
+                    st.session_state["user_name"] = reg_name
+
+                    st.success("Kayıt başarılı! Ana sayfaya yönlendiriliyorsunuz...")
+                    st.switch_page("pages/1_🏠_Ana_Sayfa.py")
                 else:
                     st.error(uid_or_error)
  
\ No newline at end of file
@@ -10,7 +10,8 @@ hızlı erişim sağlar.
 1.  **Oturum Kontrolü:** Sayfanın en başında kullanıcının oturum açıp açmadığı
     kontrol edilir. Oturum yoksa, kullanıcı giriş sayfasına yönlendirilir.
 2.  **Veri Çekme:** Kullanıcının haftalık özetini ve hızlı erişim kartlarındaki
-    önizlemeleri göstermek için Firebase'den günlük ve hedef verileri çekilir.
+    önizlemeleri göstermek için Firebase'den son 7 günün aktivite sayaçları,
+    bugünün hedefleri ve en son günlük girdisi çekilir.
 3.  **Kişisel Karşılama:** Kullanıcının ismini ve günün sözünü içeren bir
     karşılama bölümü gösterilir.
 4.  **Haftalık Özet:** Son 7 gün içinde yazılan günlük sayısı ve tamamlanan
@@ -50,9 +51,22 @@ if not id_token:
     st.error("Oturumunuz zaman aşımına uğradı. Lütfen tekrar giriş yapın.")
     st.stop()
 
-# Son günlüğü ve hedefleri çek (id_token ile)
-journals = firebase_db.get_journals(user_id, id_token)
-goals = firebase_db.get_goals(user_id, id_token)
+# Haftalık özet için son 7 günün aktivite sayaçlarını, önizlemeler için ise
+# sadece en son günlük yazılan günü ve bugünün hedeflerini çek. Günlük ve
+# hedef ağaçları taranmaz.
+today = date.today()
+last_week = today - timedelta(days=7)
+
+# Üç okuma birbirinden bağımsız olduğu için paralel olarak yapılır.
+bundle = firebase_db.fetch_user_bundle(
+    user_id, id_token,
+    parts=("daily_stats", "latest_journal", "goals"),
+    stats_range={"start": last_week.isoformat(), "end": today.isoformat()},
+    goal_range={"start": today.isoformat(), "end": today.isoformat()},
+)
+weekly_stats = bundle.daily_stats
+latest_journals = bundle.latest_journal
+goals = bundle.goals
 
 # --- Arayüz ---
 # Kullanıcı giriş yaptıysa kişisel karşılama
@@ -75,27 +89,9 @@ st.markdown(f"""
 
 
 # --- Haftalık Özet Hesaplama---
-today = date.today()
-last_week = today - timedelta(days=7)
-
-journal_count = 0
-if journals:
-    for a_date in journals.keys():
-        if last_week <= date.fromisoformat(a_date) <= today:
-            journal_count += len(journals[a_date])
-
-completed_goals_count = 0
-if goals:
-    for a_date_str, day_goals in goals.items():
-        # Tarih aralığını kontrol et
-        if last_week <= date.fromisoformat(a_date_str) <= today:
-            # "pending" klasörünün içine bak
-            pending_goals = day_goals.get("pending", {})
-            if pending_goals:
-                # Üzerinde "is_checked: True" etiketi olanları say
-                for goal_details in pending_goals.values():
-                    if isinstance(goal_details, dict) and goal_details.get("is_checked") is True:
-                        completed_goals_count += 1
+# Her gün için tek bir küçük sayaç düğümü okunduğu için sadece toplama yapılır.
+journal_count = sum(day["journals"] for day in weekly_stats.values())
+completed_goals_count = sum(day["goals_completed"] for day in weekly_stats.values())
 
 if journal_count > 0 or completed_goals_count > 0:
     summary_text = f"Bu hafta harika gidiyorsun! Şu ana kadar **{journal_count}** günlük yazdın ve **{completed_goals_count}** hedefini tamamladın. 💪"
@@ -137,9 +133,9 @@ with col2:
     st.markdown("### 📘 Günlüğüm")
     st.caption("Düşüncelerini, hislerini ve gün içinde yaşadıklarını güvenle kaydet. Kendini keşfet.")
     
-    if journals:
-        last_date = sorted(journals.keys(), reverse=True)[0]
-        last_entry = list(journals[last_date].values())[0]
+    if latest_journals:
+        last_date = sorted(latest_journals.keys(), reverse=True)[0]
+        last_entry = list(latest_journals[last_date].values())[0]
         preview_text = last_entry['text'][:50] + "..." if len(last_entry['text']) > 50 else last_entry['text']
         st.markdown(f'<div style="background-color:#E0F2F1; padding:10px; border-radius:8px; color:#004D40; margin-bottom:10px;">Son girdin: <i>"{preview_text}"</i></div>', unsafe_allow_html=True)
     else:
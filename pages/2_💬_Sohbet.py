@@ -25,13 +25,12 @@ Ana Bileşenler:
 import streamlit as st
 from datetime import date, datetime, timedelta
 import pytz
-import google.generativeai as genai
 
 from components.sidebar_info import render_sidebar_user_info
 from core.analysis_engine import generate_character_report
-from core.memory import delete_user_memory, save_to_memory, search_memory
+from core.memory import delete_user_memory, enqueue_save_to_memory, start_chat_turn
 from core import firebase_db
-from ai.gemini_client import get_gemini_response
+from ai.gemini_client import get_chat_response, get_gemini_response
 from utils.style import inject_sidebar_styles
 
 
@@ -116,7 +115,15 @@ if not id_token:
     st.switch_page("pages/0_🔐_Kullanıcı_Girişi.py")
     st.stop()
 
-user_details = firebase_db.get_user_details(user_id, id_token) if user_id else {}
+# Profil ve bugünkü açık günlük hedefler birbirinden bağımsız olduğu için
+# paralel olarak çekilir. Hedefler, hedef indeksinden tek bir okumayla gelir.
+bundle = firebase_db.fetch_user_bundle(
+    user_id, id_token,
+    parts=("profile", "open_goals"),
+    open_goals_filter={"goal_type": "daily", "date": date.today().isoformat()},
+)
+user_details = bundle.profile
+today_goals = bundle.open_goals
 is_first_chat = user_details.get("is_first_chat", False)
 
 # --- 3. Akıllı Tetikleyici: Periyodik Karakter Analizi ---
@@ -141,14 +148,14 @@ if user_id:
 
 
 # --- 4. Kapsamlı Sistem Talimatı Oluşturma ---
-def get_comprehensive_system_prompt(uid, uname, u_details, token, latest_user_prompt: str):
+def get_comprehensive_system_prompt(uid, uname, u_details, goals_data, relevant_memories: list):
     """
     AI'ın kişiliğini, kurallarını ve dinamik olarak anlamsal arama ile
     bulunan ilgili anıları içeren sistem talimatını oluşturur.
     """
-    # 1. Hafızadan İlgili Anıları Arama (YENİ EKLENDİ)
-    # Kullanıcının son mesajına anlamsal olarak en yakın anıları (günlük, hedef, sohbet) çek.
-    relevant_memories = search_memory(user_id=uid, query=latest_user_prompt, top_k=5)
+    # 1. Hafızadan İlgili Anılar
+    # `relevant_memories`, kullanıcının son mesajına anlamsal olarak en yakın
+    # anılardır (günlük, hedef, sohbet); `start_chat_turn` ile aranır.
     memory_lines = []
     if relevant_memories:
         for mem in relevant_memories:
@@ -174,15 +181,8 @@ def get_comprehensive_system_prompt(uid, uname, u_details, token, latest_user_pr
 
     # GÜVENLİK AĞI: Bugünkü tamamlanmamış hedefleri doğrudan veritabanından ekle.
     # Bu, anlamsal aramanın gözden kaçırabileceği güncel ve önemli görevlerin her zaman bağlamda olmasını sağlar.
-    goals_data = firebase_db.get_goals(uid, token)
-    today_str = date.today().isoformat()
-    daily_goals = []
-    if goals_data and today_str in goals_data:
-        pending = goals_data[today_str].get("pending", {})
-        for g in pending.values():
-            if isinstance(g, dict) and g.get("type") == "daily" and not g.get("is_checked"):
-                daily_goals.append(g.get("goal", ""))
-    goal_lines = [f"- {g}" for g in daily_goals if g]
+    # `goals_data`, sayfa yüklenirken indeksten çekilen, bugünün açık günlük hedefleridir.
+    goal_lines = [f"- {g['goal']}" for g in goals_data or [] if g.get("goal")]
     
     if goal_lines:
         memory_block += "### KULLANICININ BUGÜNKÜ TAMAMLANMAMIŞ GÜNLÜK HEDEFLERİ\n"
@@ -329,8 +329,8 @@ def generate_proactive_greeting(is_first, name, system_prompt_context, user_time
 
 # Eğer sohbet geçmişi boşsa, proaktif bir karşılama mesajı oluştur.
 if user_id and not st.session_state.chat_history:
-    # Karşılama mesajı için hafıza araması yapmaya gerek yok, boş prompt gönder.
-    full_prompt_for_greeting = get_comprehensive_system_prompt(user_id, user_name, user_details, id_token, "")
+    # Karşılama mesajı için hafıza araması yapmaya gerek yok, boş anı listesi gönder.
+    full_prompt_for_greeting = get_comprehensive_system_prompt(user_id, user_name, user_details, today_goals, [])
     user_tz = user_details.get("timezone", "UTC") # Kullanıcının saat dilimini al
     greeting = generate_proactive_greeting(is_first_chat, user_name, full_prompt_for_greeting, user_tz)
     st.session_state.chat_history.append({"role": "ai", "content": greeting})
@@ -347,8 +347,15 @@ if prompt := st.chat_input("Bana bir şeyler anlat..."):
         st.write(prompt)
 
     with st.spinner("Yazıyor..."):
-        # Sistem talimatını, kullanıcının son mesajını içerecek şekilde oluştur.
-        system_prompt = get_comprehensive_system_prompt(user_id, user_name, user_details, id_token, prompt)
+        # Mesajla ilgili anıları ara ve mesajı uzun süreli hafızaya kaydetmeye başla.
+        # Arama ve kayıt embedding'leri tek bir istekle alınır; kayıt, yanıt
+        # üretilirken arka plandaki yazma kuyruğunda yüklenir.
+        # Tarih ve zaman, eski sohbet kayıtlarının haftalık özetlere toplanması için tutulur.
+        chat_metadata = {"date": date.today().isoformat(), "timestamp": datetime.now().isoformat(timespec="seconds")}
+        relevant_memories = start_chat_turn(user_id, prompt, {"role": "user", **chat_metadata})
+
+        # Sistem talimatını, son mesajla ilgili anıları içerecek şekilde oluştur.
+        system_prompt = get_comprehensive_system_prompt(user_id, user_name, user_details, today_goals, relevant_memories)
         
         # Geçmiş sohbeti Gemini formatına hazırla
         # Her mesaj bir sözlük, anahtarlar "role" ve "parts".
@@ -357,21 +364,21 @@ if prompt := st.chat_input("Bana bir şeyler anlat..."):
             role = "user" if msg["role"] == "user" else "model"
             history_for_gemini.append({"role": role, "parts": [msg["content"]]})
             
-        # Sistem talimatını başa ekle
-        # Bu şekilde daha doğru bir kullanım olur.
-        model_with_history = genai.GenerativeModel(
-            model_name="models/gemini-1.5-pro-latest",
-            system_instruction=system_prompt
-        )
-        chat = model_with_history.start_chat(history=history_for_gemini)
-        
-        # Yanıtı tek seferde al ve ekrana yazdır.
-        response = chat.send_message(prompt)
-        full_reply = response.text
+        # Yanıtı, sistem talimatı ve geçmişle birlikte tek seferde al. İstek zaman
+        # aşımı ve tekrar deneme politikasıyla gönderilir (bkz. `core.resilience`);
+        # Gemini yanıt vermezse sayfa kilitlenmez, kullanıcı mesajı tekrar gönderebilir.
+        try:
+            full_reply = get_chat_response(history_for_gemini, prompt, system_prompt)
+        except Exception as e:
+            st.session_state.chat_history.pop()
+            st.error(f"Şu anda yanıt veremiyorum ({e}). Lütfen birazdan tekrar dene.")
+            st.stop()
         
-        # Hem kullanıcının mesajını hem de AI'ın yanıtını uzun süreli hafızaya kaydet.
-        save_to_memory(user_id, prompt, {"role": "user"})
-        save_to_memory(user_id, full_reply, {"role": "ai"})
+        # AI'ın yanıtını da uzun süreli hafızaya kaydet. Kayıt arka plandaki yazma
+        # kuyruğunda yapılır; yanıt beklemeden gösterilir. Kısa veya tekrar eden
+        # yanıtlar kabul filtresine takılır ve kaydedilmez.
+        chat_metadata["timestamp"] = datetime.now().isoformat(timespec="seconds")
+        enqueue_save_to_memory(user_id, full_reply, {"role": "ai", **chat_metadata}, admission=True)
         
         # AI'ın yanıtını session'a ekle ve ekranı yenile.
         st.session_state.chat_history.append({"role": "ai", "content": full_reply})
@@ -7,22 +7,24 @@ görüntülemesine olanak tanır.
 
 İşleyiş:
 1.  **Oturum Kontrolü:** Sayfaya sadece giriş yapmış kullanıcılar erişebilir.
-2.  **Veri Çekme:** Sayfa yüklendiğinde, kullanıcının tüm geçmiş günlükleri
-    Firebase'den tek seferde çekilir.
+2.  **Veri Çekme:** Sayfa yüklendiğinde sadece günlük yazılan tarihler
+    (`firebase_db.list_journal_dates`) çekilir; günlük metinleri indirilmez.
 3.  **Filtreleme:** "Geçmiş Günlükler" başlığının altında bulunan "Yıl" ve "Ay"
-    seçme kutuları ile kullanıcı, geçmiş günlüklerini tarihe göre filtreleyebilir.
+    seçme kutuları bu tarihlerden oluşturulur. Varsayılan olarak en son ay
+    seçilidir ve sadece seçilen aralığın günlük metinleri Firebase'den çekilir.
 4.  **Yeni Girdi Formu:** Kullanıcının bir tarih seçip o tarihe yeni bir
     günlük metni kaydetmesini sağlayan bir form bulunur.
 5.  **Geçmiş Girdileri Listeleme:** Filtrelenmiş günlükler, en yeniden en
-    eskiye doğru sıralanır ve bir `st.expander` (açılır/kapanır) liste
-    içinde gösterilir.
+    eskiye doğru sayfa sayfa yüklenir (`firebase_db.get_journal_page`) ve bir
+    `st.expander` (açılır/kapanır) liste içinde gösterilir. "Daha fazla yükle"
+    butonu bir sonraki sayfayı getirir.
 """
 import streamlit as st
-from datetime import date, datetime
+from datetime import date
 
 from components.sidebar_info import render_sidebar_user_info
 from core import firebase_db
-from core.memory import save_to_memory  # AI hafıza fonksiyonunu içeri aktar
+from core.memory import enqueue_save_many_to_memory  # AI hafıza fonksiyonunu içeri aktar
 from utils.style import inject_sidebar_styles
 
 
@@ -42,9 +44,8 @@ user_id = st.session_state.get("user_id")
 id_token = st.session_state.get("user_id_token")
 
 # --- Veri Çekme ---
-# Sayfa yüklendiğinde bir kereye mahsus tüm günlükleri çek
-with st.spinner("Günlükleriniz yükleniyor..."):
-    journals = firebase_db.get_journals(user_id, id_token)
+# Filtreleri oluşturmak için sadece günlük yazılan tarihleri (metinler olmadan) çek.
+journal_dates = firebase_db.list_journal_dates(user_id, id_token)
 
 # --- Arayüz ---
 
@@ -74,13 +75,16 @@ with st.form(key="journal_form", clear_on_submit=True):
             new_journal_id = firebase_db.save_journal(user_id, date_key, journal_text, id_token)
             
             if new_journal_id:
-                # 2. Aynı günlüğü AI'ın uzun süreli hafızasına da kaydet (Firebase ID'si ile)
+                # 2. Aynı günlüğü AI'ın uzun süreli hafızasına da kaydet (Firebase ID'si ile).
+                # Embedding ve Pinecone kaydı arka plandaki yazma kuyruğunda yapılır.
                 metadata = {
                     "type": "journal_entry", 
                     "date": date_key,
                     "source": "Günlüğüm Sayfası"
                 }
-                save_to_memory(user_id, journal_text, metadata, vector_id=new_journal_id)
+                enqueue_save_many_to_memory(user_id, [{"text": journal_text, "metadata": metadata, "vector_id": new_journal_id}])
+                # Yeni girdinin geçmişte görünmesi için yüklenmiş sayfaları sıfırla.
+                st.session_state.pop("journal_history", None)
 
                 st.success("Günlüğünüz başarıyla kaydedildi ve AI arkadaşınızın hafızasına eklendi!")
                 st.rerun() # Sayfayı yenilemek, formu ve state'i doğal olarak sıfırlar
@@ -91,44 +95,34 @@ with st.form(key="journal_form", clear_on_submit=True):
 
 # --- Geçmiş Günlükler ve Filtreleme Mantığı ---
 
-if not journals:
+if not journal_dates:
     st.markdown("---")
     st.info("Henüz günlük eklemedin.", icon="✍️")
 else:
-    # 1. Tüm girdileri tek bir listeye topla ve sırala
-    all_entries = []
-    for date_str, daily_entries in journals.items():
-        if isinstance(daily_entries, dict):
-            for entry_id, entry_data in daily_entries.items():
-                if isinstance(entry_data, dict):
-                    # Tarih string'ini datetime nesnesine çevir
-                    entry_date = datetime.strptime(date_str, "%Y-%m-%d")
-                    all_entries.append({
-                        "id": entry_id,
-                        "date_obj": entry_date,
-                        "date_str": date_str,
-                        "timestamp": entry_data.get("timestamp", ""),
-                        "text": entry_data.get("text", "")
-                    })
-    all_entries.sort(key=lambda x: (x["date_obj"], x["timestamp"]), reverse=True)
-
     st.markdown("---")
     st.markdown("<h3 style='font-size: 1.2rem; margin-bottom: 1rem;'>Geçmiş Günlükler</h3>", unsafe_allow_html=True)
-    
-    # 2. Filtreleme seçeneklerini oluştur ve ana ekranda göster
-    available_years = sorted(list(set(entry['date_obj'].year for entry in all_entries)), reverse=True)
+
+    # 1. Filtreleme seçeneklerini sadece tarih anahtarlarından oluştur.
+    # Anahtarlar `YYYY-MM-DD` formatında olduğu için yıl ve ay doğrudan okunabilir.
+    available_years = sorted({int(d[:4]) for d in journal_dates}, reverse=True)
     month_map = {1: "Ocak", 2: "Şubat", 3: "Mart", 4: "Nisan", 5: "Mayıs", 6: "Haziran", 
                  7: "Temmuz", 8: "Ağustos", 9: "Eylül", 10: "Ekim", 11: "Kasım", 12: "Aralık"}
 
     col1, col2 = st.columns(2)
     with col1:
-        selected_year = st.selectbox("Yıl Filtresi", ["Tümü"] + available_years)
+        # Varsayılan olarak en son yıl seçilir; "Tümü" tüm geçmişi yükler.
+        selected_year = st.selectbox("Yıl Filtresi", ["Tümü"] + available_years, index=1)
     
     with col2:
         if selected_year != "Tümü":
-            months_in_year = sorted(list(set(entry['date_obj'].month for entry in all_entries if entry['date_obj'].year == selected_year)))
+            months_in_year = sorted({int(d[5:7]) for d in journal_dates if d.startswith(f"{selected_year}-")})
             month_options_display = {month: month_map[month] for month in months_in_year}
-            selected_month_name = st.selectbox("Ay Filtresi", ["Tümü"] + list(month_options_display.values()))
+            # Varsayılan olarak seçili yılın en son ayı seçilir.
+            selected_month_name = st.selectbox(
+                "Ay Filtresi",
+                ["Tümü"] + list(month_options_display.values()),
+                index=len(month_options_display),
+            )
             
             selected_month = "Tümü"
             if selected_month_name != "Tümü":
@@ -141,15 +135,48 @@ else:
             selected_month = "Tümü"
             st.selectbox("Ay Filtresi", ["Tümü"], disabled=True)
 
-    # 3. Girdileri seçilen filtrelere göre filtrele
-    filtered_entries = all_entries
+    # 2. Seçilen yıl/ay aralığının günlüklerini sayfa sayfa yükle. Yüklenen
+    # sayfalar ve bir sonraki sayfanın imleci session state'te tutulur; filtre
+    # değiştiğinde sıfırlanır. Böylece her yeniden çalıştırmada sadece ekranda
+    # olan sayfalar çizilir, tüm geçmiş değil.
+    range_start, range_end = None, None
     if selected_year != "Tümü":
-        filtered_entries = [entry for entry in filtered_entries if entry['date_obj'].year == selected_year]
-    if selected_month != "Tümü":
-        filtered_entries = [entry for entry in filtered_entries if entry['date_obj'].month == selected_month]
-
-    # 4. Filtrelenmiş sonuçları göster
-    st.markdown(f"**Filtrelenen Sonuçlar ({len(filtered_entries)} adet)**")
+        if selected_month != "Tümü":
+            range_start, range_end = f"{selected_year}-{selected_month:02d}-01", f"{selected_year}-{selected_month:02d}-31"
+        else:
+            range_start, range_end = f"{selected_year}-01-01", f"{selected_year}-12-31"
+
+    history = st.session_state.get("journal_history")
+    if not history or history["filter"] != (range_start, range_end):
+        with st.spinner("Günlükleriniz yükleniyor..."):
+            page, cursor = firebase_db.get_journal_page(user_id, id_token, start=range_start, end=range_end)
+        history = {"filter": (range_start, range_end), "journals": dict(page), "cursor": cursor}
+        st.session_state["journal_history"] = history
+
+    def load_more_journals():
+        """'Daha fazla yükle' butonuna basıldığında bir sonraki (daha eski) sayfayı ekler."""
+        state = st.session_state["journal_history"]
+        page, cursor = firebase_db.get_journal_page(
+            user_id, id_token, before=state["cursor"], start=state["filter"][0], end=state["filter"][1]
+        )
+        state["journals"] = {**state["journals"], **page}
+        state["cursor"] = cursor
+
+    filtered_entries = []
+    for date_str, daily_entries in history["journals"].items():
+        entry_date = date.fromisoformat(date_str)
+        for entry_id, entry_data in daily_entries.items():
+            filtered_entries.append({
+                "id": entry_id,
+                "date_obj": entry_date,
+                "date_str": date_str,
+                "timestamp": entry_data.get("timestamp", ""),
+                "text": entry_data.get("text", "")
+            })
+    filtered_entries.sort(key=lambda x: (x["date_obj"], x["timestamp"]), reverse=True)
+
+    # 3. Yüklenen sonuçları göster
+    st.markdown(f"**Gösterilen Sonuçlar ({len(filtered_entries)} adet)**")
     
     if not filtered_entries:
         st.warning("Seçtiğiniz filtreye uygun günlük bulunamadı.")
@@ -163,4 +190,7 @@ else:
             display_date = f"{day} {month_tr} {year}"
             
             with st.expander(f"{display_date} - {entry.get('timestamp', '')}"):
-                st.write(entry["text"])
\ No newline at end of file
+                st.write(entry["text"])
+
+        if history["cursor"]:
+            st.button("Daha fazla yükle", key="journal_load_more", on_click=load_more_journals, use_container_width=True)
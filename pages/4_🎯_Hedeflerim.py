@@ -7,8 +7,8 @@ oluşturmasına, takip etmesine, tamamlamasına ve silmesine olanak tanır.
 
 İşleyiş:
 1.  **Oturum Kontrolü ve Veri Çekme:** Sayfaya sadece giriş yapmış kullanıcılar
-    erişebilir. Sayfa yüklendiğinde, kullanıcının tüm hedef verileri
-    Firebase'den tek seferde çekilir.
+    erişebilir. Seçili günün hedefleri Firebase'den tarih aralığı sorgusuyla,
+    sadece o güne ait düğüm indirilerek çekilir.
 2.  **Tarih Seçici:** Kullanıcı, `st.date_input` ile belirli bir günün
     hedeflerini görüntülemek için bir tarih seçebilir. Varsayılan olarak
     bugünün tarihi seçilidir.
@@ -21,18 +21,19 @@ oluşturmasına, takip etmesine, tamamlamasına ve silmesine olanak tanır.
     başlık altında listelenir.
 5.  **Uzun Vadeli Hedefler:** Sayfanın altında, tarih seçicisinden bağımsız
     olarak, henüz tamamlanmamış tüm uzun vadeli hedefler ayrı bir bölümde
-    gösterilir.
+    gösterilir. Bu hedefler, tüm günleri taramak yerine hedef indeksinden
+    tek bir okumayla çekilir.
 6.  **İnteraktif Butonlar:** Her hedefin yanında "Tamamla" ve "Sil" butonları
     bulunur, bu butonlar ilgili Firebase fonksiyonlarını tetikleyerek
-    veritabanını günceller.
+    veritabanını günceller. "Tümünü Tamamla" butonu, seçili günün tüm bekleyen
+    hedeflerini tek bir istekle tamamlar.
 """
 import streamlit as st
-import time
 from datetime import date
 
 from components.sidebar_info import render_sidebar_user_info
 from core import firebase_db
-from core.memory import save_to_memory, delete_memory_by_id 
+from core.memory import enqueue_save_to_memory, enqueue_delete_memories
 from utils.style import inject_sidebar_styles
 
 
@@ -59,14 +60,15 @@ selected_date_obj = st.date_input("Hedeflerini görüntülemek için bir tarih s
 selected_date_str = selected_date_obj.isoformat()
 
 # --- Veri Çekme ---
+# Seçili günün hedefleri için sadece o günün düğümü çekilir.
 with st.spinner("Hedefler yükleniyor..."):
-    all_goals_data = firebase_db.get_goals(user_id, id_token)
+    selected_day_goals = firebase_db.get_goals(user_id, id_token, start=selected_date_str, end=selected_date_str)
 
 # --- Veri İşleme (Seçili Güne Göre Filtreleme) ---
 pending_today = []
 completed_today = []
-if all_goals_data and selected_date_str in all_goals_data:
-    day_goals = all_goals_data[selected_date_str].get("pending", {})
+if selected_day_goals and selected_date_str in selected_day_goals:
+    day_goals = selected_day_goals[selected_date_str].get("pending", {})
     for goal_id, goal_details in day_goals.items():
         # Sadece "günlük" hedefleri bu bölümde göster
         if isinstance(goal_details, dict) and goal_details.get("type") == "daily":
@@ -93,17 +95,18 @@ with st.form("add_goal_form", clear_on_submit=True):
         new_goal_id = firebase_db.save_goal(user_id, date_to_save, goal_text.strip(), goal_type, id_token)
         
         if new_goal_id:
-            # 2. Aynı hedefi AI'ın uzun süreli hafızasına da kaydet (Firebase ID'si ile)
+            # 2. Aynı hedefi AI'ın uzun süreli hafızasına da kaydet (Firebase ID'si ile).
+            # Embedding ve Pinecone kaydı arka plandaki yazma kuyruğunda yapılır.
             metadata = {
                 "type": "goal",
                 "goal_type": goal_type,
                 "date": date_to_save,
                 "source": "Hedeflerim Sayfası"
             }
-            save_to_memory(user_id, goal_text.strip(), metadata, vector_id=new_goal_id)
+            enqueue_save_to_memory(user_id, goal_text.strip(), metadata, vector_id=new_goal_id)
 
-            st.success(f"'{goal_type_tr}' hedefin başarıyla eklendi ve AI arkadaşının hafızasına not edildi!")
-            time.sleep(1)
+            # Toast bildirimi sayfa yenilendikten sonra da görünür kalır.
+            st.toast(f"'{goal_type_tr}' hedefin başarıyla eklendi ve AI arkadaşının hafızasına not edildi!", icon="✅")
             st.rerun()
         else:
             st.error("Hedefiniz kaydedilirken bir hata oluştu. Lütfen tekrar deneyin.")
@@ -125,18 +128,26 @@ else:
         with col2:
             if st.button("✅", key=f"done_{goal['id']}", use_container_width=True):
                 # 1. Firebase'de hedefi güncelle
-                firebase_db.update_goal_check(user_id, goal['id'], selected_date_str, True, id_token)
+                firebase_db.update_goal_check(user_id, goal['id'], selected_date_str, True, id_token, goal)
                 # 2. AI hafızasından bu hedefi sil
-                delete_memory_by_id(goal['id'])
+                enqueue_delete_memories([goal['id']], user_id)
                 st.rerun()
         with col3:
             if st.button("🗑️", key=f"delete_daily_{goal['id']}", use_container_width=True):
                 # 1. Firebase'den hedefi sil
                 firebase_db.delete_goal_by_id(user_id, goal['id'], selected_date_str, id_token)
                 # 2. AI hafızasından da bu hedefi sil
-                delete_memory_by_id(goal['id'])
+                enqueue_delete_memories([goal['id']], user_id)
                 st.rerun()
 
+    if len(pending_today) > 1:
+        if st.button("✅ Tümünü Tamamla", key="complete_all_daily", use_container_width=True):
+            # 1. Tüm bekleyen hedefleri Firebase'de tek bir atomik istekle güncelle
+            firebase_db.complete_goals(user_id, [(goal['id'], selected_date_str, goal) for goal in pending_today], id_token)
+            # 2. AI hafızasından bu hedefleri tek bir istekle sil
+            enqueue_delete_memories([goal['id'] for goal in pending_today], user_id)
+            st.rerun()
+
 # Tamamlananlar
 st.markdown("#### Tamamlanan Hedefler")
 if not completed_today:
@@ -149,16 +160,9 @@ else:
 st.markdown("---")
 st.subheader("🏁 Uzun Vadeli Hedefler")
 
-long_term_goals = []
-if all_goals_data:
-    for date_key, day_goals_data in all_goals_data.items():
-        # 'pending' anahtarı her zaman olmayabilir, kontrol et
-        if "pending" in day_goals_data:
-            for goal_id, goal_details in day_goals_data["pending"].items():
-                if isinstance(goal_details, dict) and goal_details.get("type") == "longterm":
-                    # ÖNEMLİ DÜZELTME: Tamamlanmış uzun vadeli hedefler burada listelenmez.
-                    if not goal_details.get("is_checked"):
-                         long_term_goals.append({"id": goal_id, "date": date_key, **goal_details})
+# Açık uzun vadeli hedefler, hedef indeksinden tek bir okumayla çekilir;
+# tamamlanmış olanlar indeksin ayrı bir bölümünde tutulduğu için burada gelmez.
+long_term_goals = firebase_db.get_open_goals(user_id, id_token, "longterm")
 
 if not long_term_goals:
     st.success("Henüz eklenmiş bir uzun vadeli hedefin yok.", icon="🏁")
@@ -170,14 +174,14 @@ else:
         with col2:
             if st.button("🏁", key=f"done_longterm_{goal['id']}", use_container_width=True):
                 # 1. Firebase'de hedefi güncelle
-                firebase_db.update_goal_check(user_id, goal['id'], goal['date'], True, id_token)
+                firebase_db.update_goal_check(user_id, goal['id'], goal['date'], True, id_token, goal)
                 # 2. AI hafızasından bu hedefi sil
-                delete_memory_by_id(goal['id'])
+                enqueue_delete_memories([goal['id']], user_id)
                 st.rerun()
         with col3:
             if st.button("🗑️", key=f"delete_longterm_{goal['id']}", use_container_width=True):
                 # 1. Firebase'den hedefi sil
                 firebase_db.delete_goal_by_id(user_id, goal['id'], goal['date'], id_token)
                 # 2. AI hafızasından da bu hedefi sil
-                delete_memory_by_id(goal['id'])
+                enqueue_delete_memories([goal['id']], user_id)
                 st.rerun()
\ No newline at end of file
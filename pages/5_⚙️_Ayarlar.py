@@ -11,23 +11,29 @@ hassas işlemleri gerçekleştirmelerine olanak tanır.
     -   Kullanıcı adını güncelleme.
     -   Kullanıcının saat dilimini güncelleme. Bu, proaktif karşılamaların
         doğru zamanda yapılmasını sağlar.
-3.  **Veri Yönetimi (Tehlikeli İşlemler):**
+3.  **Günlük Arşivi İçe Aktarma:** Başka bir uygulamadan dışa aktarılmış
+    Markdown veya JSON günlükler (ya da bunları içeren bir `.zip`) yüklenir
+    ve `journal_import` ile toplu olarak günlüğe ve AI hafızasına aktarılır.
+    Yarıda kalan bir aktarım, aynı dosya tekrar yüklendiğinde kaldığı yerden
+    sürer.
+4.  **Veri Yönetimi (Tehlikeli İşlemler):**
     -   **Yapay Zeka Hafızasını Sıfırlama:** Kullanıcıya ait tüm vektörleri
         Pinecone'dan siler. Bu işlem, ek bir onay mekanizması ile korunur.
     -   **Hesabı Kalıcı Olarak Silme:** Bu en tehlikeli işlemdir ve bir
         `st.expander` içinde bulunur. Kullanıcının "sil" yazarak onaylaması
-        gerekir. Onaylandığında:
-        a. `firebase_db.delete_all_user_data` ile kullanıcının tüm profil,
-           günlük ve hedef verileri Firebase'den silinir.
-        b. `memory.delete_user_memory` ile kullanıcının AI hafızası
-           Pinecone'dan silinir.
-        c. Kullanıcının oturumu sonlandırılır (`st.session_state.clear()`).
+        gerekir. Onaylandığında `account_purge.start_purge` ile arka planda:
+        a. Kullanıcının tüm profil, günlük ve hedef verileri Firebase'den,
+        b. Kullanıcının AI hafızası Pinecone'dan,
+        c. Kullanıcının hesabı Firebase Authentication'dan silinir.
+        Sayfa, adımların ilerlemesini gösterir; silme tamamlanınca kullanıcının
+        oturumu sonlandırılır (`st.session_state.clear()`). Yarıda kalan bir
+        silme, kaldığı yerden sürdürülebilir.
 """
 import streamlit as st
 import pytz
 import time
 
-from core import firebase_db, memory
+from core import account_purge, firebase_db, journal_import, memory
 from components.sidebar_info import render_sidebar_user_info
 from utils.style import inject_sidebar_styles
 
@@ -100,6 +106,40 @@ if st.button("Saat Dilimini Güncelle", key="update_tz_btn"):
         time.sleep(1)
         st.rerun()
 
+st.markdown("---")
+st.subheader("Günlük Arşivini İçe Aktar")
+archive = st.file_uploader(
+    "Markdown veya JSON günlük dosyası ya da bunları içeren bir .zip arşivi",
+    type=journal_import.UPLOAD_TYPES,
+    help="Markdown dosyalarında tarih dosya adından (örn. 2024-01-05.md) veya tarihli başlıklardan alınır.",
+    key="journal_archive_uploader"
+)
+if archive is not None and st.button("İçe Aktar", key="import_journals_btn"):
+    # Yarıda kalan bir aktarım, aynı dosya tekrar yüklendiğinde kaldığı yerden sürer.
+    resume_key = f"{archive.name}:{archive.size}"
+    positions = st.session_state.setdefault("journal_import_positions", {})
+
+    with st.status("Günlükler içe aktarılıyor...", expanded=True) as import_status:
+        progress_text = st.empty()
+
+        def on_import_progress(report):
+            positions[resume_key] = report["position"]
+            progress_text.write(f"{report['imported']} girdi aktarıldı "
+                                f"({report['entries_per_second']:.1f} girdi/sn).")
+
+        try:
+            result = journal_import.import_entries(
+                user_id, id_token, journal_import.iter_upload(archive.name, archive),
+                skip=positions.get(resume_key, 0), on_progress=on_import_progress)
+        except Exception as e:
+            import_status.update(label="İçe aktarma tamamlanamadı.", state="error")
+            st.error(f"Hata: {e}. Aynı dosyayı tekrar yükleyerek kaldığı yerden devam edebilirsiniz.")
+        else:
+            positions.pop(resume_key, None)
+            import_status.update(label=f"{result['imported']} günlük girdisi içe aktarıldı.", state="complete")
+            if result["undated"]:
+                st.warning(f"Tarihi belirlenemeyen {result['undated']} girdi atlandı.")
+
 st.markdown("---")
 st.subheader("Veri Yönetimi")
 
@@ -128,19 +168,52 @@ if st.session_state.get("confirm_delete_memory"):
 st.markdown("---")
 # --- Hesabı Silme ---
 st.error("🚨 DİKKAT: BU İŞLEM GERİ ALINAMAZ!", icon="⚠️")
-with st.expander("🚨 Hesabı Kalıcı Olarak Sil"):
-    st.warning("DİKKAT: Bu işlem geri alınamaz! Tüm günlükleriniz, hedefleriniz ve sohbet geçmişiniz kalıcı olarak silinecektir.")
-    confirm_text = st.text_input("Silme işlemini onaylamak için 'sil' yazın.")
-    if st.button("Hesabımı Kalıcı Olarak Sil", type="primary"):
-        if confirm_text.lower() == "sil":
-            with st.spinner("Hesabınız ve tüm verileriniz siliniyor..."):
-                # 1. Firebase DB'den tüm kullanıcı verilerini sil
-                firebase_db.delete_all_user_data(user_id, id_token)
-                
-                # 2. Pinecone'dan vektörleri sil
-                memory.delete_user_memory(user_id)
-                st.success("Hesabınız ve tüm verileriniz başarıyla silindi. Hoşça kalın!")
-                st.session_state.clear()
-                st.rerun()
+PURGE_STEP_LABELS = {
+    "database": "Günlükler, hedefler ve profil",
+    "memory": "Yapay zeka hafızası",
+    "auth": "Kullanıcı hesabı",
+}
+PURGE_STATUS_LABELS = {"pending": "Bekliyor", "running": "Siliniyor", "done": "Silindi", "failed": "Başarısız"}
+
+# Uygulama yeniden başladıysa yarıda kalan silme, yeniden giriş gerektiren bir
+# hata olarak gösterilir; kullanıcı aşağıdaki düğmeyle kaldığı yerden sürdürür.
+account_purge.recover_interrupted(user_id)
+purge_status = account_purge.get_purge_status(user_id)
+if purge_status and (not purge_status["finished"] or st.session_state.get("purge_started")):
+    # Silme arka planda sürüyor; ilerlemeyi göster ve bitene kadar sayfayı yenile.
+    st.markdown("**Hesabınız ve tüm verileriniz siliniyor...**")
+    for step, info in purge_status["steps"].items():
+        if info["status"] == "done":
+            fraction = 1.0
         else:
-            st.warning("Hesap silme işlemi iptal edildi.")
+            fraction = min(info["done"] / info["total"], 1.0) if info["total"] else 0.0
+        st.progress(fraction, text=f"{PURGE_STEP_LABELS[step]}: {PURGE_STATUS_LABELS[info['status']]}")
+
+    if purge_status["finished"]:
+        st.success("Hesabınız ve tüm verileriniz başarıyla silindi. Hoşça kalın!")
+        st.session_state.clear()
+        st.rerun()
+    elif purge_status["failed"]:
+        if purge_status["needs_login"]:
+            st.error("Silme işlemine devam etmek için oturumunuzun yenilenmesi gerekiyor. "
+                     "Lütfen çıkış yapıp tekrar giriş yaptıktan sonra silme işlemini yeniden başlatın.")
+        else:
+            st.error("Silme işleminin bazı adımları tamamlanamadı.")
+        if st.button("Silmeye Devam Et", type="primary"):
+            account_purge.start_purge(user_id, id_token)
+            st.rerun()
+    else:
+        time.sleep(1)
+        st.rerun()
+else:
+    with st.expander("🚨 Hesabı Kalıcı Olarak Sil"):
+        st.warning("DİKKAT: Bu işlem geri alınamaz! Tüm günlükleriniz, hedefleriniz ve sohbet geçmişiniz kalıcı olarak silinecektir.")
+        confirm_text = st.text_input("Silme işlemini onaylamak için 'sil' yazın.")
+        if st.button("Hesabımı Kalıcı Olarak Sil", type="primary"):
+            if confirm_text.lower() == "sil":
+                # Veritabanı, hafıza ve Auth hesabı arka planda silinir; ilerleme yukarıda gösterilir.
+                account_purge.start_purge(user_id, id_token)
+                st.session_state["purge_started"] = True
+                st.rerun()
+            else:
+                st.warning("Hesap silme işlemi iptal edildi.")